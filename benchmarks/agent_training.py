@@ -0,0 +1,39 @@
+"""
+Trains ml.agent.TabularAgent on a batch of tables and reports how fast it learns and how close it gets to the solver's basic strategy, then plays the learned policy through sim.engine next to the chart.
+
+    python -m benchmarks.agent_training [steps]
+"""
+import sys
+import time
+
+from blackjack.analysis import strategy
+from blackjack.core.casino import TraditionalRules
+from blackjack.core.io.StrategyInput import StrategyInput
+from blackjack.ml.agent import Progress, TabularAgent
+from blackjack.ml.env import BlackjackEnv
+from blackjack.sim import engine
+
+TABLES = 4096
+
+def _report(progress : Progress):
+    print(f"{progress.steps:>7} steps  ev {progress.ev:+.4f}  agreement {progress.agreement:.3f}  weighted {progress.weighted_agreement:.3f}")
+
+def main(steps : int):
+    reference = strategy.solve_table(TraditionalRules)
+    agent = TabularAgent(seed=0)
+    env = BlackjackEnv(TABLES, seed=0)
+
+    start = time.perf_counter()
+    # explore a lot, then settle down
+    agent.train(env, steps * 3 // 4, epsilon=0.2, check_every=steps // 8, reference=reference, report=_report)
+    agent.train(env, steps // 4, epsilon=0.05, check_every=steps // 8, reference=reference, report=_report)
+    elapsed = time.perf_counter() - start
+    print(f"{TABLES * steps / elapsed:,.0f} training steps/s, checks included")
+
+    rounds = 200_000
+    learned = engine.simulate(rounds, agent.input_provider(bet=2), seed=1)
+    chart = engine.simulate(rounds, StrategyInput(reference, bet=2), seed=1)
+    print(f"learned policy ev {learned.ev_per_unit():+.4f}, chart {chart.ev_per_unit():+.4f}, over the same {rounds:,} rounds")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 8000)
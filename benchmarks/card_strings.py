@@ -0,0 +1,34 @@
+"""
+Rendering hands the way BareOutput used to, str() of the Card list going through the Enum reprs, against cards.render_hand() joining from CARD_STRINGS, and parsing the result back with cards.parse_hand().
+
+    python -m benchmarks.card_strings [hands]
+"""
+import random
+import sys
+import time
+
+from blackjack.core import cards
+
+def _best(fn, repeat : int=5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main(num_hands : int):
+    rseed = random.Random(0)
+    hands = [[rseed.choice(cards.CARDS) for _ in range(rseed.randint(2, 5))] for _ in range(num_hands)]
+    rendered = [cards.render_hand(hand) for hand in hands]
+
+    timings = [
+        ("str(hand)", _best(lambda: [str(hand) for hand in hands])),
+        ("render_hand", _best(lambda: [cards.render_hand(hand) for hand in hands])),
+        ("parse_hand", _best(lambda: [cards.parse_hand(string) for string in rendered])),
+    ]
+    for name, elapsed in timings:
+        print(f"{name:>12}: {elapsed / num_hands * 1e6:>6.2f} us per hand")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
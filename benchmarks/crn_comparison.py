@@ -0,0 +1,43 @@
+"""
+Rounds needed to resolve an EV difference with and without common random numbers, for two comparisons: basic strategy against mimicking the dealer, and 3:2 naturals against 1:1 naturals with the same strategy.
+
+Independent rounds needed is estimated from the variance of each candidate alone: the rounds at which the half width of the difference would reach the target.
+
+    python -m benchmarks.crn_comparison [half width]
+"""
+import sys
+
+from typing import Tuple
+
+from blackjack.analysis.strategy import solve_table
+from blackjack.core.PayoutOdds import PayoutOdds
+from blackjack.core.casino import TraditionalRules
+from blackjack.core.io.DealerMimicInput import DealerMimicInput
+from blackjack.core.io.StrategyInput import StrategyInput
+from blackjack.sim.compare import Candidate, compare
+from blackjack.sim.stats import Converged
+
+class _EvenMoneyRules(TraditionalRules):
+    @staticmethod
+    def payout_ratio(odds : PayoutOdds) -> Tuple[int, int]:
+        if odds == PayoutOdds.THREE_TWO:
+            return 1, 1
+        return TraditionalRules.payout_ratio(odds)
+
+def main(half_width : float):
+    basic = StrategyInput(solve_table(), bet=10)
+    comparisons = [
+        ("basic vs mimic", Candidate(basic), Candidate(DealerMimicInput(10))),
+        ("3:2 vs 1:1 naturals", Candidate(basic), Candidate(basic, _EvenMoneyRules)),
+    ]
+
+    for name, a, b in comparisons:
+        result = compare(10 ** 8, a, b, seed=0, stop=Converged(half_width, min_rounds=10_000), check_every=1000)
+        independent = result.rounds * result.variance_reduction()
+        print(
+            f"{name:>20}: {result.ev_difference():+.4f} +- {half_width} in {result.rounds:>9,} paired rounds, "
+            f"~{independent:>12,.0f} independent ({result.variance_reduction():.1f}x), {result.elapsed:.1f}s"
+        )
+
+if __name__ == "__main__":
+    main(float(sys.argv[1]) if len(sys.argv) > 1 else 0.005)
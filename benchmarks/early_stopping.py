@@ -0,0 +1,30 @@
+"""
+What convergence checking costs and saves: engine.simulate with and without RoundStats fed every round, and how many rounds a stats.Converged run needs against a fixed budget.
+
+    python -m benchmarks.early_stopping [half width] [budget]
+"""
+import sys
+
+from blackjack.analysis.strategy import solve_table
+from blackjack.core.io.StrategyInput import StrategyInput
+from blackjack.sim import engine
+from blackjack.sim.stats import Converged, RoundStats
+
+def main(half_width : float, budget : int):
+    inputs = StrategyInput(solve_table())
+
+    bare = min(engine.simulate(200_000, inputs, seed=0).elapsed for _ in range(3))
+    fed = min(engine.simulate(200_000, inputs, seed=0, stats=RoundStats()).elapsed for _ in range(3))
+    print(f"stats every round: {fed / bare - 1:+.1%} time")
+
+    stats = RoundStats()
+    result = engine.simulate(budget, inputs, seed=0, stats=stats, stop=Converged(half_width))
+    low, high = stats.interval()
+    print(f"converged to +-{half_width} after {result.rounds:,} of {budget:,} rounds ({1 - result.rounds / budget:.0%} saved)")
+    print(f"EV per unit {stats.ev_per_unit():+.4f}, 95% interval [{low:+.4f}, {high:+.4f}]")
+
+if __name__ == "__main__":
+    main(
+        float(sys.argv[1]) if len(sys.argv) > 1 else 0.01,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 10 ** 7,
+    )
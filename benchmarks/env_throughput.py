@@ -0,0 +1,41 @@
+"""
+Steps per second of ml.env.BlackjackEnv over a range of table counts, playing like the dealer, against the rounds per second of engine.simulate() with DealerMimicInput.
+
+    python -m benchmarks.env_throughput [steps]
+"""
+import sys
+import time
+
+import numpy as np
+
+from blackjack.core import constants
+from blackjack.core.io.DealerMimicInput import DealerMimicInput
+from blackjack.core.state import PlayerAction
+from blackjack.ml.env import BlackjackEnv
+from blackjack.sim import engine
+
+def _best(fn, repeat : int=3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def _play(env : BlackjackEnv, steps : int):
+    obs = env.reset()
+    for _ in range(steps):
+        obs = env.step(np.where(obs.total < constants.DEALER_STOP, PlayerAction.HIT.value, PlayerAction.STAY.value)).observation
+
+def main(steps : int):
+    rounds = 50_000
+    scalar = _best(lambda: engine.simulate(rounds, DealerMimicInput(bet=2), seed=0))
+    print(f"engine.simulate: {rounds / scalar:>12,.0f} rounds/s")
+
+    for num_tables in (64, 512, 4096, 16384):
+        env = BlackjackEnv(num_tables, seed=0)
+        elapsed = _best(lambda: _play(env, steps))
+        print(f"{num_tables:>6} tables:  {num_tables * steps / elapsed:>12,.0f} steps/s  {env.rounds.sum() / elapsed:>12,.0f} rounds/s")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
@@ -0,0 +1,40 @@
+"""
+What logging a hand history costs a simulation: engine.simulate with and without a HandHistoryWriter, best of `repeat` runs each, and the bytes written per round.
+
+The history goes to a temporary file, once through the usual buffer and once written and flushed after every round, which is what logging without the buffer would cost.
+
+    python -m benchmarks.history_overhead [rounds] [repeat]
+"""
+import sys
+import tempfile
+
+from blackjack.core.history import DEFAULT_BUFFER_SIZE, HandHistoryWriter
+from blackjack.core.io.DealerMimicInput import DealerMimicInput
+from blackjack.sim import engine
+
+def _best(rounds : int, repeat : int, buffer_size : int):
+    # buffer_size None for no history at all
+    best = None
+    size = 0
+    for _ in range(repeat):
+        with tempfile.TemporaryFile() as sink:
+            writer = None if buffer_size is None else HandHistoryWriter(sink, buffer_size)
+            result = engine.simulate(rounds, DealerMimicInput(10), seed=0, history=writer)
+            size = sink.tell()
+        if best is None or result.elapsed < best:
+            best = result.elapsed
+    return best, size
+
+def main(rounds : int, repeat : int):
+    bare, _ = _best(rounds, repeat, None)
+    print(f"       without history: {rounds / bare:>10,.0f} rounds/s")
+
+    for name, buffer_size in [("buffered", DEFAULT_BUFFER_SIZE), ("flushed every round", 1)]:
+        elapsed, size = _best(rounds, repeat, buffer_size)
+        print(f"{name:>22}: {rounds / elapsed:>10,.0f} rounds/s  {elapsed / bare - 1:>+7.1%} time  {size / rounds:.1f} bytes per round")
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 200_000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 3,
+    )
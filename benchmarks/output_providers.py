@@ -0,0 +1,61 @@
+"""
+Time per round and writer calls per round of driver.transition_logic with each output provider: BareOutput formatting and writing every line as it happens, BufferedOutput deferring both to the end of the round, and NullOutput doing neither.
+
+Decisions come from DealerMimicInput, which writes no prompts, so this is headless play where nobody reads the output. Every provider plays the same shoes.
+
+    python -m benchmarks.output_providers [rounds]
+"""
+import sys
+import time
+
+from blackjack.core import driver
+from blackjack.core.io.BareOutput import BareOutput
+from blackjack.core.io.BufferedOutput import BufferedOutput
+from blackjack.core.io.DealerMimicInput import DealerMimicInput
+from blackjack.core.io.NullOutput import NullOutput
+from blackjack.core.state import GameState, GameStage
+from blackjack.sim import engine
+from blackjack.sim.shoes import ShoeBatch
+
+class _CountingWriter:
+    def __init__(self):
+        self.calls = 0
+
+    def write(self, line : str):
+        self.calls += 1
+
+def _play(rounds : int, shoes : ShoeBatch, make_strings):
+    inputs = DealerMimicInput(10)
+    counter = _CountingWriter()
+    strings, writer = make_strings(counter.write)
+
+    shoes = iter(shoes)
+    state = GameState(GameStage.ASK_BET, next(shoes), engine.UNLIMITED_BANK, None, None, None, None)
+    completed = 0
+    start = time.perf_counter()
+    while completed < rounds:
+        driver.transition_logic(state, inputs, strings, None, writer, True)
+        if state.stage == GameStage.COMPLETE:
+            completed += 1
+            if state.deck.is_cut():
+                state.deck = next(shoes)
+    return time.perf_counter() - start, counter.calls
+
+def _buffered(write):
+    strings = BufferedOutput(BareOutput, write)
+    return strings, strings.write
+
+PROVIDERS = [
+    ("BareOutput", lambda write: (BareOutput, write)),
+    ("BufferedOutput", _buffered),
+    ("NullOutput", lambda write: (NullOutput, write)),
+]
+
+def main(rounds : int, repeat : int=3):
+    shoes = ShoeBatch(rounds // 10 + 1, 6, 0, 0.75)
+    for name, make_strings in PROVIDERS:
+        elapsed, calls = min(_play(rounds, shoes, make_strings) for _ in range(repeat))
+        print(f"{name:>14}: {elapsed / rounds * 1e6:>6.2f} us per round  {calls / rounds:>5.2f} writes per round")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50_000)
@@ -0,0 +1,24 @@
+"""
+How sim.parallel scales: the same seeded run with more and more workers. Every line must show the same net, since chunking doesn't depend on the worker count.
+
+    python -m benchmarks.parallel_scaling [rounds] [max workers]
+"""
+import os
+import sys
+
+from blackjack.core.io.DealerMimicInput import DealerMimicInput
+from blackjack.sim import parallel
+
+def main(rounds : int, max_workers : int):
+    single = None
+    workers = 1
+    while workers <= max_workers:
+        run = parallel.simulate_parallel(rounds, DealerMimicInput(10), seed=0, workers=workers)
+        single = single or run.result.rounds_per_second()
+        print(f"workers {workers:>3}: {run.result.rounds_per_second():>10.0f} rounds/s  efficiency {run.efficiency(single):>5.0%}  concurrency {run.concurrency():>5.2f}  net {run.result.net}")
+        workers *= 2
+
+if __name__ == "__main__":
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    max_workers = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count() or 1
+    main(rounds, max_workers)
@@ -0,0 +1,31 @@
+"""
+Rounds replayed per minute from a hand history on disk, through sim.engine.play_round and through driver.transition_logic.
+
+The log is recorded first with the solved basic strategy, so splits and doubles are in it, then replayed from a memory map.
+
+    python -m benchmarks.replay_throughput [rounds]
+"""
+import os
+import sys
+import tempfile
+
+from blackjack.analysis.strategy import solve_table
+from blackjack.core.history import HandHistoryWriter
+from blackjack.core.io.StrategyInput import StrategyInput
+from blackjack.sim import engine, replay
+
+def main(rounds : int):
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "bench.bjhh")
+        with open(path, "wb") as sink, HandHistoryWriter(sink) as writer:
+            engine.simulate(rounds, StrategyInput(solve_table()), seed=0, history=writer)
+        print(f"{rounds:,} rounds, {os.path.getsize(path) / 2 ** 20:.1f} MB")
+
+        for name, exact in [("play_round", False), ("transition_logic", True)]:
+            result = replay.replay_file(path, exact=exact)
+            if result.mismatched:
+                raise SystemExit(f"{result.mismatched} rounds replayed differently, the first: {result.mismatches[0]}")
+            print(f"{name:>16}: {result.rounds_per_second() * 60:>12,.0f} rounds/min")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
@@ -0,0 +1,50 @@
+"""
+Reshuffling a six deck shoe in place against making a new one with cards.make_seeded_shoe(): time per shuffle, and the memory each allocates at its peak, measured with tracemalloc.
+
+    python -m benchmarks.reshuffle [shuffles]
+"""
+import sys
+import time
+import tracemalloc
+
+from blackjack.core import cards
+
+def _new(shoe : cards.Shoe, seed : int) -> cards.Shoe:
+    return cards.make_seeded_shoe(seed, 6, 0.75)
+
+def _in_place(shoe : cards.Shoe, seed : int) -> cards.Shoe:
+    shoe.reshuffle(seed)
+    return shoe
+
+def _measure(shuffle, shuffles : int, traced : bool) -> float:
+    shoe = cards.make_seeded_shoe(0, 6, 0.75)
+    # the first reshuffle allocates the buffer every later one reuses
+    shoe.reshuffle(0)
+
+    peaks = 0
+    start = time.perf_counter()
+    for seed in range(shuffles):
+        if traced:
+            before, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            shoe = shuffle(shoe, seed)
+            _, peak = tracemalloc.get_traced_memory()
+            peaks += peak - before
+        else:
+            shoe = shuffle(shoe, seed)
+    elapsed = time.perf_counter() - start
+
+    return (peaks if traced else elapsed) / shuffles
+
+def main(shuffles : int):
+    for name, shuffle in [("make_seeded_shoe", _new), ("reshuffle", _in_place)]:
+        per_shuffle = min(_measure(shuffle, shuffles, False) for _ in range(3))
+
+        tracemalloc.start()
+        peak = _measure(shuffle, shuffles, True)
+        tracemalloc.stop()
+
+        print(f"{name:>16}: {per_shuffle * 1e6:>7.1f} us per shuffle  {peak:>7.0f} bytes peak")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
@@ -0,0 +1,32 @@
+"""
+Risk of ruin for a basic strategy player over many bankrolls, and how long the vectorized trajectories take against playing every round through sim.engine.
+
+    python -m benchmarks.risk_of_ruin [trajectories] [rounds]
+"""
+import sys
+import time
+
+from blackjack.analysis import risk
+from blackjack.analysis.strategy import solve_table
+from blackjack.core.io.StrategyInput import StrategyInput
+from blackjack.sim import engine
+
+def main(trajectories : int, rounds : int):
+    inputs = StrategyInput(solve_table(), bet=10)
+    dist = risk.sample_outcomes(200_000, inputs)
+    print(f"{len(dist.values)} outcomes, EV {dist.mean():+.4f} per unit, variance {dist.variance():.3f}")
+
+    start = time.perf_counter()
+    result = risk.risk_of_ruin(dist, 500, 10, rounds, trajectories, seed=0)
+    elapsed = time.perf_counter() - start
+
+    per_round = engine.simulate(100_000, inputs).elapsed / 100_000
+    print(f"{trajectories:,} bankrolls of 500 x {rounds:,} rounds of 10: {elapsed:.1f}s, ~{per_round * trajectories * rounds:,.0f}s through the engine")
+    print(f"risk of ruin {result.risk_of_ruin():.2%}, doubled {result.double_probability():.2%} (median {result.time_to_double():,.0f} rounds)")
+    print("drawdown 50/90/99%: " + " / ".join(f"{q:,.0f}" for q in result.drawdown_quantiles()))
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 10_000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 20_000,
+    )
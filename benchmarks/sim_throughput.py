@@ -0,0 +1,77 @@
+"""
+Rounds per second of headless play (sim.engine) against driving driver.transition_logic the way the terminal does: BareInput parsing strings from a reader, BareOutput formatting strings for a writer.
+
+Both play the same seeded shoes with the same policy, so they must also end with the same bank. Shoes come from sim.shoes for both, so only the play itself is compared.
+
+    python -m benchmarks.sim_throughput [rounds]
+"""
+import sys
+import time
+
+from blackjack.core import constants, driver, rules
+from blackjack.core.casino import TraditionalRules
+from blackjack.core.io.BareInput import BareInput
+from blackjack.core.io.BareOutput import BareOutput
+from blackjack.core.io.DealerMimicInput import DealerMimicInput
+from blackjack.core.state import GameState, GameStage
+from blackjack.sim import engine
+from blackjack.sim.shoes import ShoeBatch
+
+BET = 10
+
+class _ScriptedTerminal:
+    """
+    A reader and writer pair standing in for a person at the terminal who plays like DealerMimicInput. The writer remembers the last prompt so the reader knows what's being asked.
+    """
+    def __init__(self, state : GameState):
+        self.state = state
+        self.prompt = None
+
+    def write(self, line : str):
+        self.prompt = line
+
+    def read(self, *args) -> str:
+        match self.prompt:
+            case "prompt_bet":
+                return str(min(BET, self.state.bank))
+            case "prompt_hit_stay" | "prompt_hit_stay_double":
+                hand = self.state.player[self.state.current_hand]
+                return "hit" if rules.hand_value(hand) < constants.DEALER_STOP else "stay"
+            case _:
+                return "no"
+
+def make_shoes(rounds : int, seed : int=0) -> ShoeBatch:
+    house = TraditionalRules
+    # a six deck shoe cut at 75% lasts about forty rounds, so this is plenty
+    return ShoeBatch(rounds // 10 + 1, house.num_decks(), seed, house.penetration())
+
+def play_strings(rounds : int, shoes : ShoeBatch) -> engine.SimResult:
+    shoes = iter(shoes)
+    state = GameState(GameStage.ASK_BET, next(shoes), engine.UNLIMITED_BANK, None, None, None, None)
+    terminal = _ScriptedTerminal(state)
+
+    completed = 0
+    start = time.perf_counter()
+    while completed < rounds:
+        driver.transition_logic(state, BareInput, BareOutput, terminal.read, terminal.write)
+        if state.stage == GameStage.COMPLETE:
+            completed += 1
+            if state.rules.shuffle_due(state):
+                state.deck = next(shoes)
+    elapsed = time.perf_counter() - start
+
+    return engine.SimResult(completed, completed * BET, state.bank - engine.UNLIMITED_BANK, 0, 0, elapsed)
+
+def main(rounds : int, repeat : int=5):
+    shoes = make_shoes(rounds)
+    # best of a few, like timeit, because anything else running only ever makes a run slower. the two take turns so that a slow spell of the machine can't land on only one of them.
+    runs = [(play_strings(rounds, shoes), engine.simulate(rounds, DealerMimicInput(BET), shoes=shoes)) for _ in range(repeat)]
+    strings = max((run[0] for run in runs), key=engine.SimResult.rounds_per_second)
+    headless = max((run[1] for run in runs), key=engine.SimResult.rounds_per_second)
+
+    print(f"strings:  {strings.rounds_per_second():>10.0f} rounds/s  net {strings.net}")
+    print(f"headless: {headless.rounds_per_second():>10.0f} rounds/s  net {headless.net}")
+    print(f"speed-up: {headless.rounds_per_second() / strings.rounds_per_second():.1f}x")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
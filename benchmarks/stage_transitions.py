@@ -0,0 +1,47 @@
+"""
+Calls to driver.transition_logic per round, and time per round, with and without skip_no_ops.
+
+    python -m benchmarks.stage_transitions [rounds]
+"""
+import sys
+import time
+
+from blackjack.core import driver
+from blackjack.core.casino import TraditionalRules
+from blackjack.core.io.DealerMimicInput import DealerMimicInput
+from blackjack.core.io.NullOutput import NullOutput
+from blackjack.core.state import GameState, GameStage
+from blackjack.sim import engine
+from blackjack.sim.shoes import ShoeBatch
+
+def play(rounds : int, skip_no_ops : bool):
+    house = TraditionalRules
+    shoes = iter(ShoeBatch(rounds // 10 + 1, house.num_decks(), 0, house.penetration()))
+    inputs = DealerMimicInput(10)
+    state = GameState(GameStage.ASK_BET, next(shoes), engine.UNLIMITED_BANK, None, None, None, None)
+
+    transitions = 0
+    completed = 0
+    start = time.perf_counter()
+    while completed < rounds:
+        driver.transition_logic(state, inputs, NullOutput, None, None, skip_no_ops)
+        transitions += 1
+        if state.stage == GameStage.ASK_BET:
+            completed += 1
+            if state.rules.shuffle_due(state):
+                state.deck = next(shoes)
+    elapsed = time.perf_counter() - start
+
+    return transitions / rounds, elapsed / rounds, state.bank
+
+def main(rounds : int):
+    results = {}
+    for skip_no_ops in (False, True):
+        per_round, seconds, bank = results[skip_no_ops] = play(rounds, skip_no_ops)
+        print(f"skip_no_ops={skip_no_ops!s:>5}: {per_round:.3f} transitions per round  {seconds * 1e6:>6.2f} us per round  bank {bank}")
+
+    before, after = results[False][0], results[True][0]
+    print(f"{1 - after / before:.1%} fewer transitions")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -0,0 +1,38 @@
+"""
+Playing out a batch of dealer hands one at a time with rules.dealer_play() on encoded hands, against dealer.play_dealers() doing the whole batch at once, under S17 and H17.
+
+    python -m benchmarks.vectorized_dealer [dealers]
+"""
+import sys
+import time
+from array import array
+
+from blackjack.core import cards, rules
+from blackjack.sim import dealer
+from blackjack.sim.shoes import make_shoes
+
+def _best(fn, repeat : int=3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def _scalar(shoes, hit_soft_17 : bool):
+    for row in shoes:
+        hand = array(cards.ENCODED_TYPECODE, row[:2].tobytes())
+        deck = array(cards.ENCODED_TYPECODE, row[:1:-1].tobytes())
+        rules.dealer_play(hand, deck, hit_soft_17)
+
+def main(num_dealers : int):
+    # a dealer never draws more than a dozen cards, so the rest of a deck is plenty
+    shoes = make_shoes(num_dealers, 1, seed=0)[:, :16]
+    for hit_soft_17, name in ((False, "S17"), (True, "H17")):
+        scalar = _best(lambda: _scalar(shoes, hit_soft_17))
+        vectorized = _best(lambda: dealer.play_dealers(*dealer.hand_state(shoes[:, :2]), shoes, 2, hit_soft_17))
+        print(f"{name}     scalar: {scalar / num_dealers * 1e9:>7.1f} ns per dealer")
+        print(f"{name} vectorized: {vectorized / num_dealers * 1e9:>7.1f} ns per dealer  ({scalar / vectorized:.0f}x)")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
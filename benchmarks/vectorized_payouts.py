@@ -0,0 +1,49 @@
+"""
+Settling a batch of rounds one at a time, the way engine.play_round does with HouseRules.win_payout(), against payouts.settle_rounds() doing the whole batch with numpy.
+
+    python -m benchmarks.vectorized_payouts [rounds]
+"""
+import sys
+import time
+
+import numpy as np
+
+from blackjack.core.casino import TraditionalRules
+from blackjack.core.PayoutOdds import PayoutOdds
+from blackjack.sim import engine, payouts
+
+def _best(fn, repeat : int=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+def _scalar(player, dealer, naturals, num_hands, bets):
+    total = []
+    for row, dealer_value, natural, hands, bet in zip(player.tolist(), dealer.tolist(), naturals.tolist(), num_hands.tolist(), bets.tolist()):
+        if hands == 1:
+            total.append(engine._settle(row[0], dealer_value, bet, PayoutOdds.THREE_TWO if natural else PayoutOdds.ONE_ONE, TraditionalRules))
+        else:
+            bet_splice = round(bet / hands)
+            total.append(sum(engine._settle(value, dealer_value, bet_splice, PayoutOdds.ONE_ONE, TraditionalRules) for value in row[:hands]))
+    return total
+
+def main(rounds : int):
+    rng = np.random.default_rng(0)
+    player = rng.integers(4, 27, size=(rounds, 2))
+    dealer = rng.integers(17, 27, size=rounds)
+    num_hands = np.where(rng.random(rounds) < 0.03, 2, 1)
+    naturals = (num_hands == 1) & (player[:, 0] == 21) & (rng.random(rounds) < 0.5)
+    bets = rng.integers(1, 100, size=rounds) * num_hands
+
+    scalar, expected = _best(lambda: _scalar(player, dealer, naturals, num_hands, bets))
+    vectorized, result = _best(lambda: payouts.settle_rounds(player, dealer, naturals, num_hands, bets))
+    assert result.tolist() == expected
+
+    print(f"    scalar: {scalar / rounds * 1e9:>7.1f} ns per round")
+    print(f"vectorized: {vectorized / rounds * 1e9:>7.1f} ns per round  ({scalar / vectorized:.0f}x)")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
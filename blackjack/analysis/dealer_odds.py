@@ -0,0 +1,147 @@
+"""
+Exact probabilities of how the dealer finishes, by recursing over the cards left in the shoe instead of playing hands out.
+
+The dealer follows rules.dealer_play(): draw while the hand value is below constants.DEALER_STOP, and on a soft 17 too for a house that hits it (DealerOdds(hit_soft_17=True)).
+"""
+from typing import Dict, Iterable, Tuple
+
+from blackjack.core import cards, constants, rules
+from blackjack.core.cards import Rank
+
+# a shoe composition is how many cards of each value remain, ace first: index v - 1 holds the count of cards worth v, with the ace worth one and every ten-valued rank pooled at index 9.
+Composition = Tuple[int, ...]
+NUM_VALUES = 10
+ACE = Rank.ACE.value[0]
+
+# a dealer distribution holds the probability of finishing on each of FINAL_TOTALS, in order, followed by the probability of busting.
+DealerDist = Tuple[float, ...]
+FINAL_TOTALS = tuple(range(constants.DEALER_STOP, constants.MAX_HAND_VALUE + 1))
+BUST = len(FINAL_TOTALS)
+
+def _value_index(card : cards.Card) -> int:
+    return min(cards.card_rank_ord(card), NUM_VALUES) - 1
+
+def composition(deck : Iterable[cards.Card]) -> Composition:
+    """
+    Counts the cards of a Deck (or any iterable of Cards) by value.
+
+    Complexity: O(n)
+    """
+    counts = [0] * NUM_VALUES
+    for card in deck:
+        counts[_value_index(card)] += 1
+    return tuple(counts)
+
+def shoe_composition(num_decks : int=1) -> Composition:
+    """
+    The composition of a full shoe of num_decks decks.
+
+    Complexity: O(1)
+    """
+    per_rank = num_decks * len(cards.Suit)
+    return (per_rank,) * (NUM_VALUES - 1) + (per_rank * (len(Rank) - NUM_VALUES + 1),)
+
+def remove(comp : Composition, value : int) -> Composition:
+    """
+    The composition left after a card worth `value` (ace is one) is dealt.
+
+    Complexity: O(1)
+    """
+    i = value - 1
+    if comp[i] <= 0:
+        raise ValueError(f"no card of value {value} left in {comp}")
+    return comp[:i] + (comp[i] - 1,) + comp[i + 1:]
+
+class DealerOdds:
+    """
+    A memoized dealer outcome engine. Keep one around for a whole simulation or solve: sub-problems are keyed on (hard total, soft flag, composition) so they are shared between upcards and between queries.
+
+    hits and misses count memo lookups since construction or the last clear().
+    """
+    def __init__(self, hit_soft_17 : bool=False):
+        self.hit_soft_17 = hit_soft_17
+        self._memo : Dict[Tuple[int, bool, Composition], DealerDist] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def clear(self):
+        self._memo.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def final_dist(self, upcard : int, comp : Composition) -> DealerDist:
+        """
+        The distribution of the dealer's final total given the upcard's value (ace is one) and the composition of the cards it could still draw, which should not include the upcard. The hole card is drawn from comp like any other card.
+
+        Complexity: O(1) when memoized, otherwise exponential in the number of cards the dealer can draw
+        """
+        return self._dist(upcard, upcard == ACE, comp)
+
+    def final_dist_deck(self, upcard : cards.Card, deck : Iterable[cards.Card]) -> DealerDist:
+        """
+        final_dist() for an upcard and the actual cards remaining in a Deck.
+
+        Complexity: O(n) plus final_dist()
+        """
+        return self.final_dist(_value_index(upcard) + 1, composition(deck))
+
+    def peeked_dist(self, upcard : int, comp : Composition) -> Tuple[DealerDist, float]:
+        """
+        final_dist() once the dealer has peeked and found no natural, and the probability that the peek would have found one.
+
+        Complexity: see final_dist()
+        """
+        remaining = sum(comp)
+        result = [0.0] * (BUST + 1)
+        p_natural = 0.0
+        for i, count in enumerate(comp):
+            if count == 0:
+                continue
+            p = count / remaining
+            hard = upcard + i + 1
+            soft = upcard == ACE or i + 1 == ACE
+            if rules.soft_total(hard, soft) == constants.MAX_HAND_VALUE:
+                p_natural += p
+                continue
+            sub = self._dist(hard, soft, comp[:i] + (count - 1,) + comp[i + 1:])
+            for j in range(BUST + 1):
+                result[j] += p * sub[j]
+
+        if p_natural < 1:
+            result = [p / (1 - p_natural) for p in result]
+        return tuple(result), p_natural
+
+    def _dist(self, hard : int, soft : bool, comp : Composition) -> DealerDist:
+        # soft means the hand holds an ace, which may or may not be counting as eleven right now. together with the hard total that's all dealer_play() can see.
+        key = (hard, soft, comp)
+        memo = self._memo.get(key)
+        if memo is not None:
+            self.hits += 1
+            return memo
+        self.misses += 1
+
+        value = rules.soft_total(hard, soft)
+
+        result = [0.0] * (BUST + 1)
+        if rules.is_bust(value):
+            result[BUST] = 1.0
+
+        elif not rules.dealer_hits(value, value != hard, self.hit_soft_17):
+            result[value - constants.DEALER_STOP] = 1.0
+
+        else:
+            remaining = sum(comp)
+            if remaining == 0:
+                raise ValueError(f"the dealer has {value} and needs a card but the shoe is empty")
+
+            for i, count in enumerate(comp):
+                if count == 0:
+                    continue
+                p = count / remaining
+                sub = self._dist(hard + i + 1, soft or i + 1 == ACE, comp[:i] + (count - 1,) + comp[i + 1:])
+                for j in range(BUST + 1):
+                    result[j] += p * sub[j]
+
+        dist = tuple(result)
+        self._memo[key] = dist
+        return dist
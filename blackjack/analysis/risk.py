@@ -0,0 +1,171 @@
+"""
+Risk of ruin by evolving many bankrolls at once, from the distribution of what one round does to a bank.
+
+Nothing here plays hands. A round is one draw from an OutcomeDist, the change in bank per unit of the initial bet, and every trajectory takes its draw at the same time as one numpy operation. The distribution comes from playing rounds once (sample_outcomes(), or OutcomeDist.from_counts() on anything else that counts them, like the deltas of a hand history), and then any number of bankrolls, bets and horizons can be tried on it.
+
+Banks follow driver.transition_logic: a bank below constants.MIN_BET can't place a bet and is ruined, and a bank below the bet bets what it has, like DealerMimicInput and StrategyInput. Winnings are floored to whole chips like HouseRules.win_payout(). The game never lets a double or split go unpaid, since it isn't offered without the bank to cover it. Sampled outcomes don't know that, so a loss bigger than the bank takes the bank to zero instead, which overstates the risk a little for small banks.
+"""
+from collections import Counter
+from typing import Mapping, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+from blackjack.core import constants
+from blackjack.core.casino import HouseRules, TraditionalRules
+from blackjack.core.io.InputProvider import InputProvider
+from blackjack.sim import engine
+from blackjack.sim.stats import RoundStats
+
+# rounds of random draws made at once, per trajectory. bounds the memory of a draw to this many times the number of trajectories.
+_DRAW_BLOCK = 256
+
+class OutcomeDist(NamedTuple):
+    # change in bank over a round per unit of the initial bet, sorted, and the probability of each
+    values : np.ndarray
+    probs : np.ndarray
+
+    @staticmethod
+    def from_counts(counts : Mapping[float, int]) -> "OutcomeDist":
+        """
+        Complexity: O(n log n)
+        """
+        if not counts or sum(counts.values()) <= 0:
+            raise ValueError("an outcome distribution needs at least one outcome")
+        values = np.array(sorted(counts), dtype=np.float64)
+        weights = np.array([counts[value] for value in sorted(counts)], dtype=np.float64)
+        return OutcomeDist(values, weights / weights.sum())
+
+    def mean(self) -> float:
+        """
+        EV per unit bet.
+
+        Complexity: O(n)
+        """
+        return float(self.values @ self.probs)
+
+    def variance(self) -> float:
+        """
+        Complexity: O(n)
+        """
+        return float(((self.values - self.mean()) ** 2) @ self.probs)
+
+class _OutcomeCounter(RoundStats):
+    # RoundStats that also counts each outcome, for simulate(stats=...)
+    def __init__(self):
+        super().__init__()
+        self.counts = Counter()
+
+    def add(self, net : int, bet : int):
+        super().add(net, bet)
+        self.counts[net / bet] += 1
+
+def sample_outcomes(rounds : int, inputs : InputProvider, house : HouseRules=TraditionalRules, seed : Optional[int]=0) -> OutcomeDist:
+    """
+    The distribution of outcomes of `rounds` rounds of engine.simulate(). Bet something the house's payouts divide evenly, or the floored 3:2 shows up as its own outcome.
+
+    Complexity: O(r)
+    """
+    counter = _OutcomeCounter()
+    engine.simulate(rounds, inputs, house, seed, stats=counter)
+    return OutcomeDist.from_counts(counter.counts)
+
+class RiskResult(NamedTuple):
+    bank : int
+    bet : int
+    rounds : int
+    # per trajectory. the round a bank was ruined or first reached the target, counting from one, or -1 if it never did.
+    ruined_at : np.ndarray
+    doubled_at : np.ndarray
+    # largest fall from a high point, in chips
+    max_drawdown : np.ndarray
+    final : np.ndarray
+
+    def risk_of_ruin(self) -> float:
+        """
+        The fraction of trajectories ruined within the horizon.
+
+        Complexity: O(t)
+        """
+        return float(np.mean(self.ruined_at >= 0))
+
+    def double_probability(self) -> float:
+        """
+        The fraction of trajectories that reached the target within the horizon.
+
+        Complexity: O(t)
+        """
+        return float(np.mean(self.doubled_at >= 0))
+
+    def time_to_double(self, q : float=0.5) -> float:
+        """
+        The q-quantile of rounds to reach the target, among the trajectories that did. NaN if none did.
+
+        Complexity: O(t log t)
+        """
+        reached = self.doubled_at[self.doubled_at >= 0]
+        return float(np.quantile(reached, q)) if len(reached) else float("nan")
+
+    def drawdown_quantiles(self, qs : Sequence[float]=(0.5, 0.9, 0.99)) -> np.ndarray:
+        """
+        Quantiles of the largest drawdown of each trajectory, in chips.
+
+        Complexity: O(t log t)
+        """
+        return np.quantile(self.max_drawdown, qs)
+
+def risk_of_ruin(
+    dist : OutcomeDist,
+    bank : int,
+    bet : int,
+    rounds : int,
+    trajectories : int=10_000,
+    target : Optional[int]=None,
+    seed : Optional[int]=None,
+) -> RiskResult:
+    """
+    Plays `trajectories` bankrolls of `bank` chips for `rounds` flat bets of `bet` each, drawing outcomes from `dist`.
+
+    @arg target The bank that counts as doubled. Defaults to twice `bank`. Reaching it doesn't stop the trajectory.
+    @arg seed Anything numpy.random.default_rng() accepts. Equal seeds give equal results.
+
+    Complexity: O(r * t)
+    """
+    if bet < constants.MIN_BET:
+        raise ValueError(f"bet below the minimum of {constants.MIN_BET}: {bet}")
+    if bank < 0 or rounds < 0 or trajectories < 1:
+        raise ValueError(f"need a bank, rounds and trajectories: {bank}, {rounds}, {trajectories}")
+
+    target = 2 * bank if target is None else target
+    rng = np.random.default_rng(seed)
+    cdf = np.cumsum(dist.probs)
+    # guard against the last cumulative probability landing just under one
+    cdf[-1] = 1.0
+
+    banks = np.full(trajectories, bank, dtype=np.int64)
+    peaks = banks.copy()
+    max_drawdown = np.zeros(trajectories, dtype=np.int64)
+    ruined_at = np.where(banks < constants.MIN_BET, 0, -1)
+    doubled_at = np.where(banks >= target, 0, -1)
+    alive = ruined_at < 0
+
+    for block_start in range(0, rounds, _DRAW_BLOCK):
+        block = min(_DRAW_BLOCK, rounds - block_start)
+        draws = dist.values[np.searchsorted(cdf, rng.random((block, trajectories)), side="right")]
+
+        for i in range(block):
+            # all in when the bank can't cover the bet
+            stake = np.minimum(banks, bet)
+            # the game rounds what it pays down, and what it takes too: losing half of an odd bet loses the smaller half. so toward zero either way.
+            change = np.trunc(draws[i] * stake).astype(np.int64)
+            banks += np.where(alive, np.maximum(change, -banks), 0)
+
+            np.maximum(peaks, banks, out=peaks)
+            np.maximum(max_drawdown, peaks - banks, out=max_drawdown)
+
+            played = block_start + i + 1
+            ruined = alive & (banks < constants.MIN_BET)
+            ruined_at[ruined] = played
+            alive &= ~ruined
+            doubled_at[(doubled_at < 0) & (banks >= target)] = played
+
+    return RiskResult(bank, bet, rounds, ruined_at, doubled_at, max_drawdown, banks)
@@ -0,0 +1,286 @@
+"""
+Basic strategy by computed expected value rather than by playing hands. The values are close, not exact: see the approximations below.
+
+Payouts and settlement follow this project's rules, not a textbook's: hands settle like rules.bet_hand() (so a player bust pushes when the dealer also busts), only a single unsplit natural gets the blackjack payout, a natural still pushes against any dealer 21, and a hand can be split once (see driver.transition_logic). The rest comes from the house (see casino.compile_rules): whether the dealer hits soft 17 or peeks, and which two card hands can double, after a split or not.
+
+The solve is total-dependent: for each upcard the dealer's outcomes are exact for the shoe minus that upcard (see dealer_odds). Everything else is an approximation, and the chart plays a slightly different game from the driver's:
+- The player's draws come from that same composition without removing the player's own cards, so depletion is only counted on the dealer's side.
+- A split hand that doubles is valued as doubling its own bet. The game doubles state.bet, which rules.winnings() then divides over both hands, so doubling either split hand doubles what both of them play for. Splits that double come out worth less here than in the game when the other hand wins, and more when it loses.
+"""
+from typing import Dict, NamedTuple, Optional, Tuple
+
+from blackjack.core import constants, rules
+from blackjack.core.cards import Rank
+from blackjack.core.PayoutOdds import PayoutOdds
+from blackjack.core.StrategyTable import StrategyTable
+from blackjack.core.casino import CompiledRules, HouseRules, TableRules, TraditionalRules, compile_rules
+from blackjack.core.state import PlayerAction
+from blackjack.analysis import dealer_odds
+from blackjack.analysis.dealer_odds import ACE, BUST, FINAL_TOTALS, NUM_VALUES, Composition, DealerDist, DealerOdds
+
+# win_payout() works in whole chips and floors, so ask it about a bet big enough that the floor doesn't matter.
+_UNIT_BET = 1_000_000
+
+# ten-valued cards are pooled by value but rules.can_split() needs equal ranks, so only some two ten-valued cards are a pair. depletion is ignored here like everywhere else in the player's draws.
+_TEN_RANKS = len(Rank) - NUM_VALUES + 1
+_P_SAME_TEN_RANK = 1 / _TEN_RANKS
+
+# upcards as card values, ace is one. charts print them in the usual 2..10, A order.
+UPCARDS = tuple(range(1, NUM_VALUES + 1))
+_CHART_UPCARDS = UPCARDS[1:] + UPCARDS[:1]
+
+# (total, soft, pair, upcard). total is the hand value, soft is rules.is_soft(), pair is the value of each card of a splittable pair or zero, upcard is the dealer's card value.
+ChartKey = Tuple[int, bool, int, int]
+
+class Decision(NamedTuple):
+    # the best play without splitting. never DOUBLE after the first two cards.
+    action : PlayerAction
+    # whether to split first. only ever True for pairs.
+    split : bool
+    # expected value of each play per unit of the original bet. None when the play isn't available.
+    stand : float
+    hit : float
+    double : Optional[float]
+    split_ev : Optional[float]
+
+    def ev(self) -> float:
+        return self.split_ev if self.split else max(ev for ev in (self.stand, self.hit, self.double) if ev is not None)
+
+class Chart(NamedTuple):
+    # decisions for the first two cards of a hand, where doubling (and for pairs splitting) is possible
+    initial : Dict[ChartKey, Decision]
+    # decisions once a hand has three or more cards. pair is always zero.
+    later : Dict[ChartKey, Decision]
+    # expected value of a round played with this chart, per unit bet
+    game_ev : float
+
+def payout_ratio(house : HouseRules, odds : PayoutOdds) -> float:
+    """
+    Winnings per unit bet for the odds under the house rules.
+
+    Complexity: O(1)
+    """
+    return house.win_payout(odds, _UNIT_BET) / _UNIT_BET
+
+def settle(total : int, dist : DealerDist, win : float) -> float:
+    """
+    Expected value per unit bet of standing on `total` (which may be a bust) against a dealer distribution, settled the way rules.bet_hand() does.
+
+    Complexity: O(1)
+    """
+    if rules.is_bust(total):
+        # both busting is a push, so only a dealer who stands takes the bet
+        return -(1 - dist[BUST])
+
+    ev = dist[BUST] * win
+    for i, dealer_total in enumerate(FINAL_TOTALS):
+        match rules.compare(total, dealer_total):
+            case rules.Ordinal.GT:
+                ev += dist[i] * win
+            case rules.Ordinal.LT:
+                ev -= dist[i]
+    return ev
+
+def _p_natural(comp : Composition) -> float:
+    # the player's two cards are drawn from comp without removing either, like every other player draw here
+    remaining = sum(comp)
+    return 2 * (comp[ACE - 1] / remaining) * (comp[NUM_VALUES - 1] / remaining)
+
+class _UpcardSolver:
+    """
+    Memoized player expected values against one upcard. States are (hard total, holds an ace), like the dealer's.
+    """
+    def __init__(self, dist : DealerDist, comp : Composition, win : float, table : CompiledRules):
+        self.table = table
+        remaining = sum(comp)
+        self.draws = [(value, count / remaining) for value, count in zip(UPCARDS, comp) if count]
+        self.stand_ev = [settle(total, dist, win) for total in range(constants.MAX_HAND_VALUE + 2)]
+        self.bust_ev = self.stand_ev[constants.MAX_HAND_VALUE + 1]
+        self._hit = {}
+
+    def stand(self, hard : int, soft : bool) -> float:
+        return self.stand_ev[rules.soft_total(hard, soft)]
+
+    def best_hit_stand(self, hard : int, soft : bool) -> float:
+        total = rules.soft_total(hard, soft)
+        if rules.is_bust(total):
+            return self.bust_ev
+        if rules.is_max(total):
+            # the driver ends the hand at 21
+            return self.stand_ev[total]
+        return max(self.stand_ev[total], self.hit(hard, soft))
+
+    def hit(self, hard : int, soft : bool) -> float:
+        key = (hard, soft)
+        ev = self._hit.get(key)
+        if ev is None:
+            ev = sum(p * self.best_hit_stand(hard + value, soft or value == ACE) for value, p in self.draws)
+            self._hit[key] = ev
+        return ev
+
+    def double(self, hard : int, soft : bool) -> float:
+        # one card, then stand, for twice the bet
+        return 2 * sum(p * self.stand_ev[min(rules.soft_total(hard + value, soft or value == ACE), constants.MAX_HAND_VALUE + 1)] for value, p in self.draws)
+
+    def can_double(self, hard : int, soft : bool, split : bool) -> bool:
+        return self.table.can_double(rules.soft_total(hard, soft), split)
+
+    def best_initial(self, hard : int, soft : bool, split : bool=False) -> float:
+        best = max(self.stand(hard, soft), self.hit(hard, soft))
+        if self.can_double(hard, soft, split):
+            best = max(best, self.double(hard, soft))
+        return best
+
+    def split(self, value : int) -> float:
+        # each hand starts from one card of the pair plus a fresh card, and can hit, or double if the house allows it after a split, but not split again. a double only counts against its own hand, which isn't how the game settles it (see the module docs).
+        hand = sum(p * self.best_initial(value + drawn, value == ACE or drawn == ACE, True) for drawn, p in self.draws)
+        return 2 * hand
+
+def _decide(stand : float, hit : float, double : Optional[float], split_ev : Optional[float]) -> Decision:
+    options = [(stand, PlayerAction.STAY), (hit, PlayerAction.HIT)]
+    if double is not None:
+        options.append((double, PlayerAction.DOUBLE))
+    best_ev, action = max(options, key=lambda option: option[0])
+    return Decision(action, split_ev is not None and split_ev > best_ev, stand, hit, double, split_ev)
+
+def solve(house : HouseRules=TraditionalRules, num_decks : Optional[int]=None, dealer : Optional[DealerOdds]=None) -> Chart:
+    """
+    Computes the expected value of every play for every two card hand and every later hit/stand decision, against every upcard, and the basic strategy chart that follows. When the dealer peeks, the values of plays are given that the peek found nothing, since that's the only time anything is played. game_ev counts the rounds the peek ends too.
+
+    @arg num_decks Defaults to house.num_decks()
+    @arg dealer Pass one in to share its memo between solves. It has to hit soft 17 the way the house does.
+
+    Complexity: O(u * t) for upcards u and player states t, plus the dealer engine
+    """
+    table = compile_rules(house)
+    num_decks = house.num_decks() if num_decks is None else num_decks
+    dealer = DealerOdds(table.hit_soft_17) if dealer is None else dealer
+    if dealer.hit_soft_17 != table.hit_soft_17:
+        raise ValueError(f"the dealer odds hit soft 17: {dealer.hit_soft_17}, the house: {table.hit_soft_17}")
+
+    win = payout_ratio(house, PayoutOdds.ONE_ONE)
+    natural_win = payout_ratio(house, PayoutOdds.THREE_TWO)
+
+    shoe = dealer_odds.shoe_composition(num_decks)
+    shoe_size = sum(shoe)
+
+    initial = {}
+    later = {}
+    game_ev = 0.0
+
+    for upcard in UPCARDS:
+        comp = dealer_odds.remove(shoe, upcard)
+        if table.dealer_peeks:
+            # a natural found by the peek takes the bet of every hand but a natural, which it pushes
+            dist, p_peeked = dealer.peeked_dist(upcard, comp)
+            game_ev -= shoe[upcard - 1] / shoe_size * p_peeked * (1 - _p_natural(comp))
+        else:
+            dist, p_peeked = dealer.final_dist(upcard, comp), 0.0
+        solver = _UpcardSolver(dist, comp, win, table)
+        # only rounds the peek doesn't end are played
+        p_upcard = shoe[upcard - 1] / shoe_size * (1 - p_peeked)
+
+        # hands of two cards
+        for first, p_first in solver.draws:
+            for second, p_second in solver.draws:
+                hard = first + second
+                soft = ACE in (first, second)
+                total = rules.soft_total(hard, soft)
+
+                if rules.is_max(total):
+                    # a natural. no decision to make.
+                    game_ev += p_upcard * p_first * p_second * (1 - dist[constants.MAX_HAND_VALUE - constants.DEALER_STOP]) * natural_win
+                    continue
+
+                if first != second:
+                    pairs = [(0, 1.0)]
+                elif first == NUM_VALUES:
+                    pairs = [(first, _P_SAME_TEN_RANK), (0, 1 - _P_SAME_TEN_RANK)]
+                else:
+                    pairs = [(first, 1.0)]
+
+                for pair, p_pair in pairs:
+                    key = (total, total != hard, pair, upcard)
+                    if key not in initial:
+                        initial[key] = _decide(
+                            solver.stand(hard, soft),
+                            solver.hit(hard, soft),
+                            solver.double(hard, soft) if solver.can_double(hard, soft, False) else None,
+                            solver.split(pair) if pair else None,
+                        )
+                    game_ev += p_upcard * p_first * p_second * p_pair * initial[key].ev()
+
+        # three or more cards. every hard total a hand can still act on, then every soft one.
+        for hard in range(constants.INITIAL_HAND_LEN * 2, constants.MAX_HAND_VALUE):
+            later[(hard, False, 0, upcard)] = _decide(solver.stand(hard, False), solver.hit(hard, False), None, None)
+        for hard in range(constants.INITIAL_HAND_LEN, constants.MAX_HAND_VALUE - rules.SOFT_ACE_BONUS):
+            total = rules.soft_total(hard, True)
+            later[(total, True, 0, upcard)] = _decide(solver.stand(hard, True), solver.hit(hard, True), None, None)
+
+    return Chart(initial, later, game_ev)
+
+def compile_table(chart : Chart, name : str="") -> StrategyTable:
+    """
+    Flattens a chart into a StrategyTable for io.StrategyInput.
+
+    Complexity: O(n)
+    """
+    table = StrategyTable(name=name)
+
+    for (total, soft, pair, upcard), decision in chart.initial.items():
+        table.set(False, soft, pair, upcard, total, decision.action, decision.split)
+
+    # a pair that wasn't split (or can't be, after a split) plays like any two cards of its total. A,A and 2,2 are the only way to two card soft 12 and hard 4, so those cells only come from here.
+    for (total, soft, pair, upcard), decision in chart.initial.items():
+        if pair and (total, soft, 0, upcard) not in chart.initial:
+            table.set(False, soft, 0, upcard, total, decision.action)
+
+    for (total, soft, _, upcard), decision in chart.later.items():
+        table.set(True, soft, 0, upcard, total, decision.action)
+
+    return table
+
+def solve_table(house : HouseRules=TraditionalRules) -> StrategyTable:
+    """
+    solve() then compile_table(), named after the house rules.
+
+    Complexity: see solve()
+    """
+    return compile_table(solve(house), house.name if isinstance(house, TableRules) else house.__name__)
+
+_ACTION_LETTERS = {
+    PlayerAction.STAY : "S",
+    PlayerAction.HIT : "H",
+    PlayerAction.DOUBLE : "D",
+}
+
+def format_chart(chart : Chart) -> str:
+    """
+    Renders the initial decisions as the familiar three tables: hard totals, soft totals and pairs. S stand, H hit, D double, P split.
+
+    Complexity: O(n)
+    """
+    def row(label, keys):
+        cells = []
+        for key in keys:
+            decision = chart.initial.get(key)
+            cells.append("-" if decision is None else "P" if decision.split else _ACTION_LETTERS[decision.action])
+        return f"{label:>5} " + " ".join(f"{cell:>2}" for cell in cells)
+
+    header = "      " + " ".join(f"{'A' if up == ACE else up:>2}" for up in _CHART_UPCARDS)
+    lines = ["hard", header]
+    for total in range(5, constants.MAX_HAND_VALUE):
+        lines.append(row(total, [(total, False, 0, up) for up in _CHART_UPCARDS]))
+
+    lines += ["soft", header]
+    for total in range(constants.INITIAL_HAND_LEN + rules.SOFT_ACE_BONUS + 1, constants.MAX_HAND_VALUE):
+        lines.append(row(f"A{total - ACE - rules.SOFT_ACE_BONUS}", [(total, True, 0, up) for up in _CHART_UPCARDS]))
+
+    lines += ["pairs", header]
+    for value in _CHART_UPCARDS:
+        hard = 2 * value
+        total = rules.soft_total(hard, value == ACE)
+        label = "A,A" if value == ACE else f"{value},{value}"
+        lines.append(row(label, [(total, value == ACE, value, up) for up in _CHART_UPCARDS]))
+
+    return "\n".join(lines)
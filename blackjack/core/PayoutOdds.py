@@ -6,3 +6,6 @@ class PayoutOdds(Enum):
     ONE_ONE = 1,
     THREE_TWO = 2,
     TWO_ONE = 3
+
+    # odds key the payouts of casino.CompiledRules, looked up on every win. see cards.Rank.__hash__
+    __hash__ = object.__hash__
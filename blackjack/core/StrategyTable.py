@@ -0,0 +1,129 @@
+"""
+A basic strategy as one flat table of bytes, so that answering a decision is arithmetic and one index instead of anything to do with strings or charts.
+
+Cells are indexed by (later, soft, pair, upcard, total): whether the hand is past its first two cards, rules.is_soft(), the value of each card of a splittable pair or zero, the dealer's upcard value with ace as one, and rules.hand_value(). Each cell holds a PlayerAction value, plus SPLIT_FLAG when a pair should be split.
+
+The file format is a short header followed by the cells exactly as they sit in memory:
+
+    magic       4 bytes     b"BJST"
+    version     1 byte
+    insurance   1 byte      whether to take insurance
+    name        1 byte length, then that much ASCII. the house rules the table was made for.
+    cells       TABLE_SIZE bytes
+"""
+from typing import Union
+from os import PathLike
+
+from blackjack.core import cards, constants
+from blackjack.core.cards import Card
+from blackjack.core.state import PlayerAction
+
+MAGIC = b"BJST"
+VERSION = 1
+
+# dimensions. totals and upcards are used as indices directly, so index zero of each goes unused. a few wasted bytes beat an offset on every lookup.
+TOTALS = constants.MAX_HAND_VALUE + 1
+UPCARDS = 11
+PAIRS = UPCARDS
+SOFTS = 2
+STAGES = 2
+TABLE_SIZE = STAGES * SOFTS * PAIRS * UPCARDS * TOTALS
+
+SPLIT_FLAG = 0x10
+_ACTION_MASK = 0x0f
+
+# decoding a cell, by action value
+_ACTIONS = tuple(sorted(PlayerAction, key=lambda action: action.value))
+
+# card value with ace as one, for upcards and pairs. keyed by Card so a lookup never touches the Enum.
+_CARD_INDEX = {card : min(cards.card_rank_ord(card), UPCARDS - 1) for card in cards.CARDS}
+
+def card_index(card : Card) -> int:
+    """
+    The value of a card as this table counts it: ace is one and every ten-valued card is ten.
+
+    Complexity: O(1)
+    """
+    return _CARD_INDEX[card]
+
+def index(later : bool, soft : bool, pair : int, upcard : int, total : int) -> int:
+    """
+    Where a cell sits in the table.
+
+    Complexity: O(1)
+    """
+    return (((later * SOFTS + soft) * PAIRS + pair) * UPCARDS + upcard) * TOTALS + total
+
+class StrategyTable:
+    """
+    Every cell starts as STAY, which is also the answer for hands no chart asks about, like a soft 21 after a split.
+    """
+
+    def __init__(self, cells : bytes=None, insurance : bool=False, name : str=""):
+        if cells is None:
+            cells = bytes([PlayerAction.STAY.value]) * TABLE_SIZE
+        if len(cells) != TABLE_SIZE:
+            raise ValueError(f"a strategy table has {TABLE_SIZE} cells, not {len(cells)}")
+
+        self.cells = bytearray(cells)
+        self.insurance = insurance
+        self.name = name
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, StrategyTable) and (self.cells, self.insurance, self.name) == (other.cells, other.insurance, other.name)
+
+    def set(self, later : bool, soft : bool, pair : int, upcard : int, total : int, action : PlayerAction, split : bool=False):
+        """
+        Impure
+        """
+        self.cells[index(later, soft, pair, upcard, total)] = action.value | (SPLIT_FLAG if split else 0)
+
+    def action(self, later : bool, soft : bool, pair : int, upcard : int, total : int) -> PlayerAction:
+        """
+        Complexity: O(1)
+        """
+        return _ACTIONS[self.cells[index(later, soft, pair, upcard, total)] & _ACTION_MASK]
+
+    def split(self, soft : bool, pair : int, upcard : int, total : int) -> bool:
+        """
+        Complexity: O(1)
+        """
+        return bool(self.cells[index(False, soft, pair, upcard, total)] & SPLIT_FLAG)
+
+    def to_bytes(self) -> bytes:
+        """
+        Complexity: O(n)
+        """
+        name = self.name.encode("ascii")
+        return MAGIC + bytes([VERSION, self.insurance, len(name)]) + name + bytes(self.cells)
+
+    @staticmethod
+    def from_bytes(data : bytes) -> "StrategyTable":
+        """
+        Complexity: O(n)
+        """
+        if data[:len(MAGIC)] != MAGIC:
+            raise ValueError("not a strategy table")
+
+        version, insurance, name_len = data[len(MAGIC):len(MAGIC) + 3]
+        if version != VERSION:
+            raise ValueError(f"unsupported strategy table version {version}")
+
+        start = len(MAGIC) + 3
+        name = data[start:start + name_len].decode("ascii")
+        return StrategyTable(data[start + name_len:], bool(insurance), name)
+
+    def save(self, path : Union[str, PathLike]):
+        """
+        Impure
+        """
+        with open(path, "wb") as f:
+            f.write(self.to_bytes())
+
+    @staticmethod
+    def load(path : Union[str, PathLike]) -> "StrategyTable":
+        """
+        Impure
+        """
+        with open(path, "rb") as f:
+            return StrategyTable.from_bytes(f.read())
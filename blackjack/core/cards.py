@@ -1,7 +1,9 @@
-from typing import NamedTuple, List, Deque
+from typing import NamedTuple, List, Deque, Optional
 from collections import deque
+from array import array
 from enum import Enum
 from random import Random
+from functools import lru_cache
 import re
 from blackjack.core import constants
 
@@ -21,6 +23,9 @@ class Rank(Enum):
     QUEEN = (12,10)
     KING = (13,10)
 
+    # Enum hashes members by name in Python code, which shows up in profiles because ranks are dictionary keys on every deal. members are singletons compared by identity, so identity hashing is equivalent and happens in C.
+    __hash__ = object.__hash__
+
 class Suit(Enum):
     # In blackjack suits don't have an inherent rank but they need one for enum. I've used alphabetical.
     CLUB = 1
@@ -28,6 +33,9 @@ class Suit(Enum):
     HEART = 3
     SPADE = 4
 
+    # see Rank.__hash__
+    __hash__ = object.__hash__
+
 class Card(NamedTuple):
     rank: Rank
     suit: Suit
@@ -36,49 +44,183 @@ class Card(NamedTuple):
 Hand = List[Card]
 Deck = Deque[Card] # deletions are more important than random access and linear traversal and we are likely using a random order of elements. A deque fits this use case better than a list.
 
+# Compact encoding for simulations. An encoded card is its index in make_deck_ordered(), so suit-major then rank: 0 is the ace of clubs, 12 the king of clubs and 51 the king of spades. A hand or deck of encoded cards is an array('b'), which is one byte per card and doesn't allocate anything when a card moves between them.
+EncodedCard = int
+EncodedHand = array
+EncodedDeck = array
+ENCODED_TYPECODE = 'b'
+
+NUM_RANKS = len(Rank)
+
+# Every Card that can exist, in encoded order. Decoding is an index into this so we never build the same Card twice.
+CARDS = tuple(Card(rank, suit) for suit in Suit for rank in Rank)
+
+# indexed by rank index (encoded card % NUM_RANKS). these mirror Rank.value so the encoded functions never touch an Enum.
+RANK_ORDS = tuple(rank.value[0] for rank in Rank)
+RANK_VALUES = tuple(rank.value[1] for rank in Rank)
+
+# indexed by encoded card
+CARD_VALUES = tuple(RANK_VALUES[i % NUM_RANKS] for i in range(len(CARDS)))
+
+# the reverse of CARDS. plain (rank, suit) tuples hash the same as Card so they work as keys too.
+_CARD_CODES = {card : i for i, card in enumerate(CARDS)}
+
 def make_deck_ordered() -> Deck:
     """
     Creates a standard deck of cards.
 
     Complexity: O(sr)
     """
-    deck = deque()
-    for suit in Suit:
-        for rank in Rank:
-            deck.append(Card(rank,suit))
-    return deck
+    return deque(CARDS)
 
-def make_deck_unordered(rseed : Random) -> Deck:
+def make_deck_unordered(rseed : Random, num_decks : int=1) -> Deck:
     """
-    Creates a shuffled deck of cards.
+    Creates a shuffled deck of cards. With num_decks > 1 this is a shoe of that many decks shuffled together in one pass.
 
     @arg rseed The generator for random shuffling. Required to maintain pure interface.
+    @arg num_decks How many standard decks go into the result.
 
-    Complexity: O(sr log sr)
+    Complexity: O(dsr log dsr)
     """
     # I had an idea inspired by hash maps where you attempt random insertion while below a load factor, then swap to a more linear mechanism when that factor is exceeded. This would be more scalable but there are only 52 cards in a deck so not worth it.
 
-    indices = [i for i in range(constants.DECK_SIZE)]
+    # CARDS is the ordered deck so shuffling the indices into it gives the same order as shuffling a freshly built deck, without building one. Index i of a shoe is card i % DECK_SIZE, which keeps a single deck identical to what this function has always produced for a seed.
+    return deque(CARDS[i % constants.DECK_SIZE] for i in _shuffled_indices(rseed, num_decks))
+
+def _shuffled_indices(rseed : Random, num_decks : int=1) -> List[int]:
+    if num_decks < 1:
+        raise ValueError(f"a shoe needs at least one deck: {num_decks}")
+    indices = [i for i in range(constants.DECK_SIZE * num_decks)]
     rseed.shuffle(indices)
+    return indices
+
+class Shoe(deque):
+    """
+    A shuffled deck (usually several) with a cut card. Everything that works on a Deck works on a Shoe.
+
+    Cards are taken from the right, so the cut card sits `cut` cards in from the left. Once that many or fewer cards remain the cut card has come out and the shoe is due for a shuffle at the end of the round.
+    """
+    def __init__(self, cards=(), cut : int=0, seed : Optional[int]=None):
+        super().__init__(cards)
+        self.cut = cut
+        # what make_seeded_shoe() or reshuffle() made it from, for the record. None when it wasn't made from a seed of its own.
+        self.seed = seed
+        # cards in the full shoe, which reshuffle() puts back
+        self.size = len(self)
+        # the shuffled order of the last reshuffle() and the generator that shuffled it, kept so the next one doesn't allocate them again
+        self._indices = None
+        self._rseed = None
+
+    def __copy__(self) -> "Shoe":
+        """
+        A shoe of the same type holding the same cards, with the same cut card, seed and whatever else a subclass keeps (a CountingShoe's count, say). deque's own copy would make one from the cards alone.
+
+        Complexity: O(n)
+        """
+        shoe = type(self).__new__(type(self))
+        deque.__init__(shoe, self)
+        shoe.__dict__.update(self.__dict__)
+        # reshuffle()'s scratch is its own
+        shoe._indices = None
+        shoe._rseed = None
+        return shoe
+
+    def reshuffle(self, seed : int):
+        """
+        Puts every card back and shuffles the shoe in place, into exactly the order make_seeded_shoe(seed) would make. The cut card stays where it is. No cards, lists or shoes are made.
+
+        Complexity: O(dsr log dsr)
+
+        Impure
+        """
+        num_decks, rest = divmod(self.size, constants.DECK_SIZE)
+        if rest or not num_decks:
+            raise ValueError(f"only a shoe of whole decks can be reshuffled, not {self.size} cards")
+
+        indices = self._indices
+        if indices is None:
+            indices = self._indices = list(range(self.size))
+            self._rseed = Random()
+        else:
+            # a permutation sorts back into range(size) without a temporary list
+            indices.sort()
+        # seeding an existing generator is the same as making one with that seed
+        self._rseed.seed(seed)
+        self._rseed.shuffle(indices)
+
+        self.clear()
+        self.extend(map(_shoe_cards(num_decks).__getitem__, indices))
+        self.seed = seed
+
+    def cards_before_cut(self) -> int:
+        """
+        How many more cards can be dealt before the cut card comes out.
+
+        Complexity: O(1)
+        """
+        return max(0, len(self) - self.cut)
 
-    # make ordered deck as list to base the random deck off of. The card chosen is a placeholder because None is apparently unpolymorphic to named tuples.
-    ord_deck = [Card(Rank.TWO,Suit.CLUB)] * constants.DECK_SIZE
-    i = 0
-    for suit in Suit:
-        for rank in Rank:
-            ord_deck[i] = Card(rank,suit)
-            i += 1
-    
-    unord_deck = deque()
+    def is_cut(self) -> bool:
+        """
+        Whether the cut card has come out.
 
-    for i in indices:
-        unord_deck.append(ord_deck[i])
+        Complexity: O(1)
+        """
+        return len(self) <= self.cut
 
-    return unord_deck
+def is_low(deck : Deck) -> bool:
+    """
+    Whether fewer cards are left than one round can take (constants.MAX_ROUND_LEN), so that the next round could run the deck dry. Any shoe is due for a shuffle by then, wherever its cut card is, which matters at a penetration of 1 and for small shoes.
+
+    Complexity: O(1)
+    """
+    return len(deck) < constants.MAX_ROUND_LEN
+
+@lru_cache(maxsize=None)
+def _shoe_cards(num_decks : int) -> tuple:
+    # card i of an unshuffled shoe, the same layout make_deck_unordered() shuffles
+    return CARDS * num_decks
+
+def make_shoe(rseed : Random, num_decks : int=1, penetration : float=1.0) -> Shoe:
+    """
+    Creates a shuffled shoe of num_decks decks with the cut card placed after `penetration` of the shoe. For example 6 decks at 0.75 penetration deals 234 cards and leaves 78 behind the cut card.
+
+    Complexity: O(dsr log dsr)
+    """
+    if not 0 < penetration <= 1:
+        raise ValueError(f"penetration must be within (0, 1]: {penetration}")
+    deck = make_deck_unordered(rseed, num_decks)
+    return Shoe(deck, round(len(deck) * (1 - penetration)))
+
+def make_seeded_shoe(seed : int, num_decks : int=1, penetration : float=1.0) -> Shoe:
+    """
+    make_shoe() from a seed of its own, which the shoe keeps so that it can be made again.
+
+    Complexity: O(dsr log dsr)
+    """
+    shoe = make_shoe(Random(seed), num_decks, penetration)
+    shoe.seed = seed
+    return shoe
+
+def make_encoded_deck_ordered() -> EncodedDeck:
+    """
+    Creates a standard deck of encoded cards, in the same order as make_deck_ordered().
+
+    Complexity: O(sr)
+    """
+    return array(ENCODED_TYPECODE, range(constants.DECK_SIZE))
+
+def make_encoded_deck_unordered(rseed : Random, num_decks : int=1) -> EncodedDeck:
+    """
+    Creates a shuffled deck (or shoe) of encoded cards. Given equal seeds this decodes to the same cards as make_deck_unordered().
+
+    Complexity: O(dsr log dsr)
+    """
+    return array(ENCODED_TYPECODE, (i % constants.DECK_SIZE for i in _shuffled_indices(rseed, num_decks)))
 
 def take_card(hand : Hand, deck : Deck):
     """
-    Moves a card from the deck into a hand.
+    Moves a card from the deck into a hand. Works for Card and encoded hands/decks alike.
 
     Complexity: O(1)
 
@@ -86,37 +228,50 @@ def take_card(hand : Hand, deck : Deck):
     """
     hand.append(deck.pop())
 
-def parse_hand(hs : str, fmt : str=r'([2-9]|10|J|Q|K|A)([CDHS])') -> Hand:
-    """
-    Converts a string representation into usable format.
-
-    Complexity: O(n), probably
-    """
-    # TODO these should respect the fmt string.
-    # performance really isn't a concern in this function. you probably shouldn't mention specific cards in blackjack. the motive for this function is to make testing a breeze. the reason this function isn't in tests/ is because there might be a use case (user input) later on where this function is needed.
-    suit_map = {
-        'C' : Suit.CLUB,
-        'D' : Suit.DIAMOND,
-        'H' : Suit.HEART,
-        'S' : Suit.SPADE,
-    }
-    rank_map = {
-        'A' : Rank.ACE,
-        '2' : Rank.TWO,
-        '3' : Rank.THREE,
-        '4' : Rank.FOUR,
-        '5' : Rank.FIVE,
-        '6' : Rank.SIX,
-        '7' : Rank.SEVEN,
-        '8' : Rank.EIGHT,
-        '9' : Rank.NINE,
-        '10' : Rank.TEN,
-        'J' : Rank.JACK,
-        'Q' : Rank.QUEEN,
-        'K' : Rank.KING,
-    }
-    matches = re.findall(fmt, hs)
-    return [ Card(rank_map[r], suit_map[s]) for r,s in matches ]
+# the short form of every card, rank then suit like 10H or AS, which is the form parse_hand() reads. indexed by encoded card like CARDS.
+RANK_STRINGS = ('A', '2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K')
+SUIT_STRINGS = ('C', 'D', 'H', 'S')
+CARD_STRINGS = tuple(RANK_STRINGS[i % NUM_RANKS] + SUIT_STRINGS[i // NUM_RANKS] for i in range(len(CARDS)))
+
+# the reverse of CARD_STRINGS, keyed by Card like _CARD_CODES. plain (rank, suit) tuples work too.
+_CARD_STRING_OF = {card : string for card, string in zip(CARDS, CARD_STRINGS)}
+# the reverse again, for parsing. lowercase too, so a fmt that accepts it doesn't need its own table.
+_STRING_CARDS = {string : card for card, string in zip(CARDS, CARD_STRINGS)}
+_STRING_CARDS.update({string.lower() : card for string, card in list(_STRING_CARDS.items())})
+
+DEFAULT_HAND_FORMAT = r'([2-9]|10|J|Q|K|A)([CDHS])'
+
+def card_string(card : Card) -> str:
+    """
+    The short form of a card, like 10H.
+
+    Complexity: O(1)
+    """
+    return _CARD_STRING_OF[card]
+
+def render_hand(hand : Hand, sep : str=" ") -> str:
+    """
+    A hand (or deck) in short form, like "AS 10H". parse_hand() reads it back into the same cards.
+
+    Complexity: O(n)
+    """
+    return sep.join(map(_CARD_STRING_OF.__getitem__, hand))
+
+def parse_hand(hs : str, fmt : str=DEFAULT_HAND_FORMAT) -> Hand:
+    """
+    Converts a string representation into usable format. Every match of the regular expression `fmt` is a card, and whatever isn't matched is ignored, so any delimiter works. With groups the card is the groups joined, so `fmt` is free to match around them, and without any it's the whole match. Either way the card has to come out in short form (see CARD_STRINGS), upper or lower case.
+
+    Complexity: O(n)
+    """
+    # performance was never the point of this function, it makes testing a breeze and might read user input some day. it's fast now anyway since the cards come out of a table, and re caches the compiled fmt.
+    pattern = re.compile(fmt)
+    matches = pattern.findall(hs)
+    if pattern.groups > 1:
+        matches = map("".join, matches)
+    try:
+        return list(map(_STRING_CARDS.__getitem__, matches))
+    except KeyError as e:
+        raise ValueError(f"not a card: {e.args[0]!r}") from None
 
 def card_rank_ord(card : Card) -> int:
     """
@@ -133,3 +288,51 @@ def card_value(card : Card) -> int:
     Complexity: O(1)
     """
     return card[0].value[1]
+
+def encode_card(card : Card) -> EncodedCard:
+    """
+    Returns the compact integer form of a card.
+
+    Complexity: O(1)
+    """
+    return _CARD_CODES[card]
+
+def decode_card(code : EncodedCard) -> Card:
+    """
+    Returns the Card for an encoded card. The Card is shared, not copied.
+
+    Complexity: O(1)
+    """
+    return CARDS[code]
+
+def encode_hand(hand : Hand) -> EncodedHand:
+    """
+    Converts a hand (or deck) of Cards into its encoded form, preserving order.
+
+    Complexity: O(n)
+    """
+    return array(ENCODED_TYPECODE, (_CARD_CODES[card] for card in hand))
+
+def decode_hand(hand : EncodedHand) -> Hand:
+    """
+    Converts an encoded hand (or deck) back into a list of Cards, preserving order.
+
+    Complexity: O(n)
+    """
+    return [CARDS[code] for code in hand]
+
+def encoded_rank_ord(code : EncodedCard) -> int:
+    """
+    Same as card_rank_ord() for an encoded card.
+
+    Complexity: O(1)
+    """
+    return RANK_ORDS[code % NUM_RANKS]
+
+def encoded_value(code : EncodedCard) -> int:
+    """
+    Same as card_value() for an encoded card.
+
+    Complexity: O(1)
+    """
+    return CARD_VALUES[code]
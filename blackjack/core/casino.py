@@ -1,81 +1,337 @@
-from math import floor
 from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable, Dict, FrozenSet, NamedTuple, Optional, Tuple
 
+from blackjack.core import cards, constants
 from blackjack.core.PayoutOdds import PayoutOdds
 from blackjack.core.exception.StupidProgrammerException import StupidProgrammerException
 
 class HouseRules(ABC):
+    """
+    Everything a table decides. The game itself doesn't ask these while it plays: compile_rules() asks them once and the state carries the answers, see CompiledRules.
+    """
     @staticmethod
     @abstractmethod
     def win_payout(odds : PayoutOdds, bet : int) -> int:
         pass
 
-    # TODO implement
-
-    #@staticmethod
-    #@abstractmethod
-    #def allow_surrender() -> bool:
-    #    pass
-
-    #@staticmethod
-    #@abstractmethod
-    #def allow_double() -> bool:
-    #    pass
-
-    #@staticmethod
-    #@abstractmethod
-    #def allow_insurance() -> bool:
-    #    pass
-
-    #@staticmethod
-    #@abstractmethod
-    #def allow_double_after_split() -> bool:
-    #    pass
-
-    #@staticmethod
-    #@abstractmethod
-    #def allow_recursive_split() -> bool:
-    #    pass
-
-    #@staticmethod
-    #@abstractmethod
-    #def num_decks() -> int:
-    #    pass
-
-    #@staticmethod
-    #@abstractmethod
-    #def shuffle_pred(state, *args) -> bool:
-    #    pass
-
-    #@staticmethod
-    #@abstractmethod
-    #def allow_dealer_hit_soft_17() -> bool:
-    #    pass
-
-    
-class TraditionalRules(HouseRules):
     @staticmethod
-    def win_payout(odds : PayoutOdds, bet : int) -> int:
+    @abstractmethod
+    def insurance_side_bet(bet : int) -> int:
+        # the insurance side bet on `bet`, see insurance_ratio()
+        pass
+
+    @staticmethod
+    @abstractmethod
+    def payout_ratio(odds : PayoutOdds) -> Tuple[int, int]:
+        # winnings per bet as (numerator, denominator). win_payout() has to agree with it, see sim.payouts
+        pass
+
+    @staticmethod
+    @abstractmethod
+    def allow_double(value : int) -> bool:
+        # whether two cards of this hand value can double
+        pass
+
+    @staticmethod
+    @abstractmethod
+    def allow_double_after_split() -> bool:
+        pass
+
+    @staticmethod
+    @abstractmethod
+    def allow_insurance() -> bool:
+        pass
+
+    @staticmethod
+    @abstractmethod
+    def insurance_ratio() -> Tuple[int, int]:
+        # the insurance side bet as a fraction of the bet, (numerator, denominator). rounded like round()
+        pass
+
+    @staticmethod
+    @abstractmethod
+    def dealer_peeks() -> bool:
+        # whether the dealer checks for a natural before the player acts. one found ends the round, so doubles and splits can't lose to it.
+        pass
+
+    @staticmethod
+    @abstractmethod
+    def num_decks() -> int:
+        pass
+
+    @staticmethod
+    @abstractmethod
+    def penetration() -> float:
+        # the fraction of the shoe dealt before the cut card. see cards.make_shoe
+        pass
+
+    @staticmethod
+    @abstractmethod
+    def shuffle_pred(state, *args) -> bool:
+        # asked between rounds. True means the shoe gets replaced before the next bet.
+        pass
+
+    @staticmethod
+    @abstractmethod
+    def allow_dealer_hit_soft_17() -> bool:
+        # H17 when True, S17 when False. see rules.dealer_play
+        pass
+
+def _floored_payout(ratio : Tuple[int, int], bet : int) -> int:
+    if bet < 0:
+        # this is a defensive measure to prevent a pre-exsting bug from spiraling into something worse
+        raise ValueError(f"negative bet in rules.win_payout(): {bet}")
+    # integer division floors, them casinos wouldn't generously let you round up! exact for any bet, unlike going through a float.
+    return bet * ratio[0] // ratio[1]
+
+def _side_bet(ratio : Tuple[int, int], bet : int) -> int:
+    return round(bet * ratio[0] / ratio[1])
+
+class TraditionalRules(HouseRules):
+    @classmethod
+    def win_payout(cls, odds : PayoutOdds, bet : int) -> int:
         """
         Returns positive winnings relative to the bet, according to the win_payout.
-    
+
+        Complexity: O(1)
+        """
+        return _floored_payout(cls.payout_ratio(odds), bet)
+
+    @staticmethod
+    def payout_ratio(odds : PayoutOdds) -> Tuple[int, int]:
+        """
         Complexity: O(1)
         """
-        if bet < 0:
-            # this is a defensive measure to prevent a pre-exsting bug from spiraling into something worse
-            raise ValueError(f"negative bet in rules.win_payout(): {bet}")
-    
         match odds:
             case PayoutOdds.ONE_ONE:
-                return bet
+                return 1, 1
             case PayoutOdds.THREE_TWO:
-                return floor(1.5 * bet) # them casinos wouldn't generously let you round up!
+                return 3, 2
             case PayoutOdds.TWO_ONE:
-                return 2 * bet
+                return 2, 1
             case _:
-                raise StupidProgrammerException("Missing win_payout pattern match in blackjack.win_payout()")
+                raise StupidProgrammerException("Missing payout_ratio pattern match in TraditionalRules.payout_ratio()")
+
+    @classmethod
+    def insurance_side_bet(cls, bet : int) -> int:
+        """
+        Complexity: O(1)
+        """
+        return _side_bet(cls.insurance_ratio(), bet)
+
+    @staticmethod
+    def allow_double(value : int) -> bool:
+        # any two cards
+        return True
+
+    @staticmethod
+    def allow_double_after_split() -> bool:
+        return True
+
+    @staticmethod
+    def allow_insurance() -> bool:
+        return True
+
+    @staticmethod
+    def insurance_ratio() -> Tuple[int, int]:
+        return 1, 2
+
+    @staticmethod
+    def dealer_peeks() -> bool:
+        # the dealer's hole card stays down until the player is done
+        return False
+
+    @staticmethod
+    def num_decks() -> int:
+        return 6
+
+    @staticmethod
+    def penetration() -> float:
+        return 0.75
+
+    @staticmethod
+    def shuffle_pred(state, *args) -> bool:
+        """
+        Shuffles once the cut card has come out of the shoe (see cards.Shoe), or sooner if what's left might not last a round (see cards.is_low()).
+
+        Complexity: O(1)
+        """
+        return state.deck.is_cut() or cards.is_low(state.deck)
+
+    @staticmethod
+    def allow_dealer_hit_soft_17() -> bool:
+        return False
+
+class SixFiveRules(TraditionalRules):
+    """
+    TraditionalRules with naturals paying 6:5 instead of 3:2.
+    """
+    @staticmethod
+    def payout_ratio(odds : PayoutOdds) -> Tuple[int, int]:
+        """
+        Complexity: O(1)
+        """
+        if odds == PayoutOdds.THREE_TWO:
+            return 6, 5
+        return TraditionalRules.payout_ratio(odds)
+
+class HitSoft17Rules(TraditionalRules):
+    """
+    TraditionalRules with the dealer hitting a soft 17.
+    """
+    @staticmethod
+    def allow_dealer_hit_soft_17() -> bool:
+        return True
+
+@dataclass(frozen=True)
+class TableRules(HouseRules):
+    """
+    House rules as values rather than a class, so a table is one line. Works anywhere a HouseRules class does. Anything left out is what TraditionalRules does.
+    """
+    name : str
+    decks : int = 6
+    deck_penetration : float = 0.75
+    natural_payout : Tuple[int, int] = (3, 2)
+    hit_soft_17 : bool = False
+    peek : bool = False
+    insurance : bool = True
+    insurance_bet : Tuple[int, int] = (1, 2)
+    # hand values two cards can double on. None is any two cards.
+    double_on : Optional[FrozenSet[int]] = None
+    double_after_split : bool = True
+
+    def __post_init__(self):
+        if self.decks < 1:
+            raise ValueError(f"a table needs at least one deck: {self.decks}")
+        # a cut card at the very bottom never comes out, and make_shoe() can't place one above the top
+        if not 0 < self.deck_penetration < 1:
+            raise ValueError(f"penetration must be within (0, 1): {self.deck_penetration}")
+
+    def win_payout(self, odds : PayoutOdds, bet : int) -> int:
+        """
+        Complexity: O(1)
+        """
+        return _floored_payout(self.payout_ratio(odds), bet)
+
+    def payout_ratio(self, odds : PayoutOdds) -> Tuple[int, int]:
+        """
+        Complexity: O(1)
+        """
+        if odds == PayoutOdds.THREE_TWO:
+            return self.natural_payout
+        return TraditionalRules.payout_ratio(odds)
+
+    def insurance_side_bet(self, bet : int) -> int:
+        """
+        Complexity: O(1)
+        """
+        return _side_bet(self.insurance_bet, bet)
+
+    def allow_double(self, value : int) -> bool:
+        return self.double_on is None or value in self.double_on
+
+    def allow_double_after_split(self) -> bool:
+        return self.double_after_split
+
+    def allow_insurance(self) -> bool:
+        return self.insurance
+
+    def insurance_ratio(self) -> Tuple[int, int]:
+        return self.insurance_bet
+
+    def dealer_peeks(self) -> bool:
+        return self.peek
+
+    def num_decks(self) -> int:
+        return self.decks
+
+    def penetration(self) -> float:
+        return self.deck_penetration
+
+    def shuffle_pred(self, state, *args) -> bool:
+        return TraditionalRules.shuffle_pred(state, *args)
+
+    def allow_dealer_hit_soft_17(self) -> bool:
+        return self.hit_soft_17
+
+# presets. all three offer surrender in some form and let a pair split again, neither of which this game has, so they play without.
+VEGAS_STRIP = TableRules("Vegas Strip", decks=6, peek=True)
+ATLANTIC_CITY = TableRules("Atlantic City", decks=8, peek=True)
+# the dealer takes no hole card until the player is done. this game always deals the dealer two cards up front, but without a peek nobody sees the second one early, so the only difference is which card out of the shoe it is.
+EUROPEAN = TableRules("European no-hole-card", decks=6, double_on=frozenset((9, 10, 11)), double_after_split=False)
+
+class CompiledRules(NamedTuple):
+    """
+    A house's rules asked once and kept as plain values, which is what the game reads while it plays (GameState.rules). Has win_payout() and insurance_side_bet() like a house, so the rules functions take it as one, and shuffle_due() for the loops that play round after round.
+    """
+    house : HouseRules
+    payouts : Dict[PayoutOdds, Tuple[int, int]]
+    hit_soft_17 : bool
+    dealer_peeks : bool
+    insurance : bool
+    insurance_ratio : Tuple[int, int]
+    # indexed by the value of a two card hand
+    double : Tuple[bool, ...]
+    double_after_split : bool
+    # the house's shuffle_pred(), None when it's the cut card of TraditionalRules, which shuffle_due() checks itself
+    shuffle_pred : Optional[Callable[..., bool]]
+
+    def win_payout(self, odds : PayoutOdds, bet : int) -> int:
+        """
+        Complexity: O(1)
+        """
+        return _floored_payout(self.payouts[odds], bet)
+
+    def insurance_side_bet(self, bet : int) -> int:
+        """
+        Complexity: O(1)
+        """
+        return _side_bet(self.insurance_ratio, bet)
+
+    def can_double(self, value : int, split : bool) -> bool:
+        """
+        Whether two cards of this value can double, on a hand that came from a split or not.
+
+        Complexity: O(1)
+        """
+        return self.double[value] and (self.double_after_split or not split)
+
+    def shuffle_due(self, state) -> bool:
+        """
+        Whether the house shuffles before the next round, without asking it when it goes by the cut card.
+
+        Complexity: O(1)
+        """
+        if self.shuffle_pred is not None:
+            return self.shuffle_pred(state)
+        # TraditionalRules.shuffle_pred() inlined
+        deck = state.deck
+        return len(deck) <= deck.cut or len(deck) < constants.MAX_ROUND_LEN
+
+def _cut_card_shuffle(house : HouseRules) -> bool:
+    # whether the house shuffles the way TraditionalRules does, a class of its own or not
+    owner = house if isinstance(house, type) else type(house)
+    return owner.shuffle_pred in (TraditionalRules.shuffle_pred, TableRules.shuffle_pred)
+
+@lru_cache(maxsize=None)
+def compile_rules(house : HouseRules) -> CompiledRules:
+    """
+    Asks a house everything once. The same house always gives back the same CompiledRules.
 
-    #@staticmethod
-    #def allow_surrender() -> bool:
-    #    return False
+    Complexity: O(1)
+    """
+    return CompiledRules(
+        house,
+        {odds : house.payout_ratio(odds) for odds in PayoutOdds},
+        bool(house.allow_dealer_hit_soft_17()),
+        bool(house.dealer_peeks()),
+        bool(house.allow_insurance()),
+        house.insurance_ratio(),
+        tuple(bool(house.allow_double(value)) for value in range(constants.MAX_HAND_VALUE + 1)),
+        bool(house.allow_double_after_split()),
+        None if _cut_card_shuffle(house) else house.shuffle_pred,
+    )
 
+TRADITIONAL = compile_rules(TraditionalRules)
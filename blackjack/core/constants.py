@@ -3,4 +3,5 @@ MAX_HAND_VALUE = 21
 INITIAL_HAND_LEN = 2
 DEALER_STOP = 17
 MAX_HAND_LEN = 12 # derived from AC AD AH AS 2C 2D 2H 2S 3C 3H 3D, of length 11, which equals 21. plus one so that we are more certain about catching errors.
+MAX_ROUND_LEN = 3 * MAX_HAND_LEN # the most cards one round can take: two split hands (state.MAX_HANDS) and the dealer's, each as long as a hand can be.
 MIN_BET = 1
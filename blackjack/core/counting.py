@@ -0,0 +1,160 @@
+"""
+Card counting kept up as cards come out of the shoe, so a policy can read the count at any decision in O(1) instead of recounting what's left of state.deck.
+
+A count system is a weight per rank. The CountingShoe adds the weight of every card it gives out to its running count. Everything in the game takes cards with deck.pop() (cards.take_card(), rules.init_split(), sim.engine), so wrapping the shoes is all it takes:
+
+    engine.simulate(rounds, inputs, shoes=counting.counted(ShoeBatch(...), counting.HI_LO))
+
+and the policy reads state.deck.running_count or state.deck.true_count().
+
+The dealer's second card is dealt face down, so the game takes it back out of the count as it's dealt (hide_hole_card()) and puts it in when the dealer plays (reveal_hole_card()). A count read at a decision is only ever of cards the player has seen, like ml.env's.
+"""
+from typing import Dict, Iterable, Iterator, NamedTuple, Optional
+
+from blackjack.core import constants
+from blackjack.core.cards import CARDS, Card, Deck, Rank, Shoe
+
+class CountSystem(NamedTuple):
+    name : str
+    weights : Dict[Rank, int]
+    # balanced systems sum to zero over a deck and start from zero. unbalanced ones start below zero so that they reach their pivot near the end of the shoe, and aren't meant to be divided into a true count.
+    balanced : bool
+
+    def initial_count(self, num_decks : int) -> int:
+        """
+        The running count of a fresh shoe. For an unbalanced system this is the usual 4 - 4 * decks, which KO gets from its +4 per deck imbalance.
+
+        Complexity: O(sr)
+        """
+        if self.balanced:
+            return 0
+        return -sum(self.weights[card[0]] for card in CARDS) * (num_decks - 1)
+
+def _weights(plus_two=(), plus_one=(), minus_one=(), minus_two=()) -> Dict[Rank, int]:
+    weights = {rank : 0 for rank in Rank}
+    for ranks, weight in ((plus_two, 2), (plus_one, 1), (minus_one, -1), (minus_two, -2)):
+        for rank in ranks:
+            weights[rank] = weight
+    return weights
+
+_TENS = (Rank.TEN, Rank.JACK, Rank.QUEEN, Rank.KING)
+
+HI_LO = CountSystem(
+    "Hi-Lo",
+    _weights(plus_one=(Rank.TWO, Rank.THREE, Rank.FOUR, Rank.FIVE, Rank.SIX), minus_one=(Rank.ACE,) + _TENS),
+    True,
+)
+
+KO = CountSystem(
+    "KO",
+    _weights(plus_one=(Rank.TWO, Rank.THREE, Rank.FOUR, Rank.FIVE, Rank.SIX, Rank.SEVEN), minus_one=(Rank.ACE,) + _TENS),
+    False,
+)
+
+OMEGA_II = CountSystem(
+    "Omega II",
+    _weights(plus_two=(Rank.FOUR, Rank.FIVE, Rank.SIX), plus_one=(Rank.TWO, Rank.THREE, Rank.SEVEN), minus_one=(Rank.NINE,), minus_two=_TENS),
+    True,
+)
+
+class CountingShoe(Shoe):
+    """
+    A Shoe that counts the cards it gives out with pop(). Anything else that takes cards out of it goes uncounted, and a card hide() holds back stays out of the count until reveal().
+    """
+    def __init__(self, cards=(), cut : int=0, system : CountSystem=HI_LO, num_decks : Optional[int]=None, seed : Optional[int]=None):
+        super().__init__(cards, cut, seed)
+        self.system = system
+        self.num_decks = round(len(self) / constants.DECK_SIZE) if num_decks is None else num_decks
+        self.running_count = system.initial_count(self.num_decks)
+        self.cards_dealt = 0
+        # the weight of the cards hide() took back out of the count
+        self.hidden = 0
+        # keyed by Card so counting a card never touches the Enum
+        self._card_weights = {card : system.weights[card[0]] for card in CARDS}
+
+    def pop(self):
+        card = Shoe.pop(self)
+        self.running_count += self._card_weights[card]
+        self.cards_dealt += 1
+        return card
+
+    def hide(self, card : Card):
+        """
+        Takes a card that's been dealt face down back out of the running count, until reveal().
+
+        Complexity: O(1)
+
+        Impure
+        """
+        weight = self._card_weights[card]
+        self.running_count -= weight
+        self.hidden += weight
+
+    def reveal(self):
+        """
+        Counts every card hide() held back.
+
+        Complexity: O(1)
+
+        Impure
+        """
+        self.running_count += self.hidden
+        self.hidden = 0
+
+    def reshuffle(self, seed : int):
+        """
+        Shoe.reshuffle(), and the count starts over.
+
+        Impure
+        """
+        super().reshuffle(seed)
+        self.running_count = self.system.initial_count(self.num_decks)
+        self.cards_dealt = 0
+        self.hidden = 0
+
+    def decks_remaining(self) -> float:
+        """
+        Decks left to deal, cut card and all, as a fraction. Never less than half a deck so a true count can't blow up at the bottom of the shoe.
+
+        Complexity: O(1)
+        """
+        return max(len(self), constants.DECK_SIZE // 2) / constants.DECK_SIZE
+
+    def true_count(self) -> float:
+        """
+        The running count per remaining deck. Only meaningful for a balanced system.
+
+        Complexity: O(1)
+        """
+        return self.running_count / self.decks_remaining()
+
+def counted(shoes : Iterable[Deck], system : CountSystem=HI_LO) -> Iterator[CountingShoe]:
+    """
+    Each shoe as a CountingShoe, lazily. Keeps the cut card and seed of shoes that have them.
+
+    Complexity: O(n) per shoe
+    """
+    for shoe in shoes:
+        yield CountingShoe(shoe, getattr(shoe, "cut", 0), system, seed=getattr(shoe, "seed", None))
+
+def hide_hole_card(state):
+    """
+    Called once the dealer's two cards are dealt: a CountingShoe leaves the second, face down, out of its count. Does nothing for any other deck.
+
+    Complexity: O(1)
+
+    Impure
+    """
+    if isinstance(state.deck, CountingShoe):
+        state.deck.hide(state.dealer[1])
+
+def reveal_hole_card(state):
+    """
+    Called when the dealer turns the hole card over to play: hide_hole_card() undone.
+
+    Complexity: O(1)
+
+    Impure
+    """
+    if isinstance(state.deck, CountingShoe):
+        state.deck.reveal()
@@ -1,12 +1,14 @@
 import threading
-import time
 import random
 
-from typing import Callable
-from dataclasses import fields
+from typing import Callable, Iterable, Optional
 
-from blackjack.core import constants, rules, cards
+from blackjack.core import constants, counting, rules, cards
 from blackjack.core.PayoutOdds import PayoutOdds
+from blackjack.core.casino import HouseRules, TraditionalRules, compile_rules
+from blackjack.core.counting import CountSystem
+from blackjack.core.history import HandHistoryWriter
+from blackjack.core.shuffle import ShufflePolicy
 
 from blackjack.core.exception.StupidProgrammerException import StupidProgrammerException
 
@@ -15,165 +17,222 @@ from blackjack.core.io.OutputProvider import OutputProvider
 
 from blackjack.core.state import GameState, GameStage, PlayerAction
 
-def transition_logic(state : GameState, inputs : InputProvider, strings : OutputProvider, reader : Callable[..., str], writer : Callable[[str], None]):
-    """
-    Given a GameStage and related state, returns the updated state according to blackjack logic and user input. Implemented as a state machine/pattern matching.
-
-    Impure, but you can wrap it in a function that encapsulates state changes and returns a new GameState
-
-    @arg state A GameState representing a snapshot of the working state
-    """
-    match state.stage:
-        case GameStage.ASK_BET:
-            state.bet = inputs.input_bet(state, reader, writer)
+# stage handlers. each is one step of transition_logic() for the stage it's named after.
+
+def _ask_bet(state : GameState, inputs : InputProvider, strings : OutputProvider, reader : Callable[..., str], writer : Callable[[str], None]):
+    state.bet = inputs.input_bet(state, reader, writer)
+    state.bank -= state.bet
+    state.stage = GameStage.INIT_DEAL
+
+def _init_deal(state : GameState, inputs : InputProvider, strings : OutputProvider, reader : Callable[..., str], writer : Callable[[str], None]):
+    # deal the player and dealer
+    # the state's own hands are dealt into so that a round allocates nothing. see GameState.reset
+    state.player = state.fresh_player()
+    state.player.append(rules.init_hand_into(state.fresh_hand(0), state.deck))
+    state.current_hand = 0
+    state.dealer = rules.init_hand_into(state.fresh_dealer(), state.deck)
+    counting.hide_hole_card(state)
+    state.stage = GameStage.ASK_INSURANCE
+
+    strings.show_player_hand(state, writer)
+    strings.show_dealer_hand_down(state, writer)
+
+def _ask_insurance(state : GameState, inputs : InputProvider, strings : OutputProvider, reader : Callable[..., str], writer : Callable[[str], None]):
+    # default case for if we don't diverge because of insurance or blackjacks
+    state.stage = GameStage.ASK_SPLIT
+
+    # check and handle insurance
+    # I'm partial to walrus operator but its lazy nature is very useful here.
+    if (state.rules.insurance and
+        rules.is_insurable(state.dealer) and
+        0 <= state.bank - (side_bet := rules.insurance_make_side_bet(state.bet, state.rules)) and
+        inputs.input_want_insurance(state, reader, writer)):
+
+        state.bank -= side_bet
+
+        insurance_success, win_payout = rules.insure(
+            state.dealer,
+            side_bet,
+            state.rules
+        )
+
+        if insurance_success:
+            state.bank += win_payout
+            strings.show_insurance_success(state, writer)
+        else:
+            strings.show_insurance_fail(state, writer)
+
+    _check_natural(state)
+
+def _ask_split(state : GameState, inputs : InputProvider, strings : OutputProvider, reader : Callable[..., str], writer : Callable[[str], None]):
+    # note that although I put state.current_hand in the following, it means zero. It's for consistency and development flexibility.
+    if (rules.can_split(state.player[state.current_hand]) and
+        state.bank - state.bet >= 0 and
+        inputs.input_want_split(state, reader, writer)):
+
+        # rules.init_split_into :: [Hand] -> [Hand, Hand], in place
+        # because 0 -> 0 state.current_hand doesn't change
+        second = state.fresh_hand(1)
+        rules.init_split_into(state.player[state.current_hand], second, state.deck)
+        state.player.append(second)
+
+        state.stage = GameStage.PLAYER_ACTIONS
+        state.bank -= state.bet
+        state.bet *= 2
+
+        strings.show_player_hand(state, writer)
+
+    else:
+        state.stage=GameStage.PLAYER_ACTIONS
+
+def _player_actions(state : GameState, inputs : InputProvider, strings : OutputProvider, reader : Callable[..., str], writer : Callable[[str], None]):
+    # this is more granular than "for split in splits", being every hit/stay prompt. I think being less granular isn't as true to the state machine model
+
+    # for control flow of stays and busts
+    hand_completed = False
+
+    # player decision. Using None because we can tell quickly when something's wrong
+    hit_stay_double = None
+
+    # check if double is possible by asking if initial hand (also sufficient funds to make the double) and whether the house allows it on this hand
+    hand = state.player[state.current_hand]
+    if (len(hand) == constants.INITIAL_HAND_LEN and
+        state.bank - state.bet >= 0 and
+        state.rules.can_double(rules.hand_value(hand), len(state.player) > 1)):
+
+        hit_stay_double = inputs.input_hit_stay_double(state, reader, writer)
+        if hit_stay_double == PlayerAction.DOUBLE:
             state.bank -= state.bet
-            state.stage = GameStage.INIT_DEAL
-
-        case GameStage.INIT_DEAL:
-            # deal the player and dealer
-            state.player = [rules.init_hand(state.deck)]
-            state.current_hand = 0
-            state.dealer = rules.init_hand(state.deck)
-            state.stage = GameStage.ASK_INSURANCE
-
-            strings.show_player_hand(state, writer)
-            strings.show_dealer_hand_down(state, writer)
-
-        case GameStage.ASK_INSURANCE:
-
-            # default case for if we don't diverge because of insurance or blackjacks
-            state.stage = GameStage.ASK_SPLIT
-
-            # check and handle insurance
-            # I'm partial to walrus operator but its lazy nature is very useful here.
-            if (rules.is_insurable(state.dealer) and
-                0 <= state.bank - (side_bet := rules.insurance_make_side_bet(state.bet)) and
-                inputs.input_want_insurance(state, reader, writer)):
-
-                state.bank -= side_bet
-
-                insurance_success, win_payout = rules.insure(
-                    state.dealer,
-                    side_bet
-                )
-
-                if insurance_success:
-                    state.bank += win_payout
-                    strings.show_insurance_success(state, writer)
-                else:
-                    strings.show_insurance_fail(state, writer)
-
-            if rules.is_natural(state.player[state.current_hand]):
-                state.stage = GameStage.PLAYER_DONE
-                state.current_hand += 1
-
-        case GameStage.ASK_SPLIT:
-            # note that although I put state.current_hand in the following, it means zero. It's for consistency and development flexibility.
-            if (rules.can_split(state.player[state.current_hand]) and
-                state.bank - state.bet >= 0 and
-                inputs.input_want_split(state, reader, writer)):
-
-                # rules.init_split :: [[Hand]] -> [[Hand], [Hand]]
-                # because 0 -> 0 state.current_hand doesn't change
-                state.player = rules.init_split(state.player[state.current_hand], state.deck)
-
-                state.stage = GameStage.PLAYER_ACTIONS
-                state.bank -= state.bet
-                state.bet *= 2
-
-                strings.show_player_hand(state, writer)
-
-            else:
-                state.stage=GameStage.PLAYER_ACTIONS
-
-        case GameStage.PLAYER_ACTIONS: # this is more granular than "for split in splits", being every hit/stay prompt. I think being less granular isn't as true to the state machine model
+            state.bet *= 2
+            hand_completed = True
 
-            # for control flow of stays and busts
-            hand_completed = False
+    # this hand isn't initial
+    else:
+        hit_stay_double = inputs.input_hit(state, reader, writer)
 
-            # player decision. Using None because we can tell quickly when something's wrong
-            hit_stay_double = None
+    # handle hits and doubles.
+    # in the case of doubles, the following logic is the same but hand_completed is overridden to be True, because the next card is their last regardless of result.
+    if hit_stay_double == PlayerAction.HIT or hit_stay_double == PlayerAction.DOUBLE:
+        cards.take_card(state.player[state.current_hand], state.deck)
 
-            # check if double is possible by asking if initial hand (also sufficient funds to make the double)
-            if len(state.player[state.current_hand]) == constants.INITIAL_HAND_LEN and state.bank - state.bet >= 0:
+        # compute hand value up front so the following two functions don't compute it twice
+        hand_value = rules.hand_value(state.player[state.current_hand])
 
-                hit_stay_double = inputs.input_hit_stay_double(state, reader, writer)
-                if hit_stay_double == PlayerAction.DOUBLE:
-                    state.bank -= state.bet
-                    state.bet *= 2
-                    hand_completed = True
+        # busting won't happen on first deal but remember this state is for later hit/stay actions, unlike INIT_DEAL. 
+        if rules.is_bust(hand_value):
+            strings.show_player_bust(state, writer)
+            hand_completed = True
 
-            # this hand isn't initial
-            else:
-                hit_stay_double = inputs.input_hit(state, reader, writer)
+        elif rules.is_max(hand_value):
+            strings.show_max_hand(state, writer)
+            hand_completed = True
 
-            # handle hits and doubles.
-            # in the case of doubles, the following logic is the same but hand_completed is overridden to be True, because the next card is their last regardless of result.
-            if hit_stay_double == PlayerAction.HIT or hit_stay_double == PlayerAction.DOUBLE:
-                cards.take_card(state.player[state.current_hand], state.deck)
-
-                # compute hand value up front so the following two functions don't compute it twice
-                hand_value = rules.hand_value(state.player[state.current_hand])
-
-                # busting won't happen on first deal but remember this state is for later hit/stay actions, unlike INIT_DEAL. 
-                if rules.is_bust(hand_value):
-                    strings.show_player_bust(state, writer)
-                    hand_completed = True
-
-                elif rules.is_max(hand_value):
-                    strings.show_max_hand(state, writer)
-                    hand_completed = True
-
-                else:
-                    strings.show_player_hand(state, writer)
-
-            elif hit_stay_double == PlayerAction.STAY:
-                hand_completed = True
-
-            else:
-                raise StupidProgrammerException("missed hit/stay/double implementation")
-
-            if hand_completed:
-                state.current_hand += 1
-                if len(state.player) == state.current_hand:
-                    state.stage = GameStage.PLAYER_DONE
-
-        case GameStage.PLAYER_DONE:
-            rules.dealer_play(state.dealer, state.deck)
-            state.stage = GameStage.UPDATE_BANK
-
-            # if the dealer busted then report it.
-            if rules.is_bust(state.dealer):
-                strings.show_dealer_bust(state, writer)
-            else:
-                strings.show_dealer_hand_up(state, writer)
-
-        case GameStage.UPDATE_BANK:
+        else:
+            strings.show_player_hand(state, writer)
 
-            # winning logic specifically for naturals has not yet been applied. When we transitioned from a blackjack, the code didn't compute winnings. We now compute winnings.
-            if len(state.player) == 1 and rules.is_natural(state.player[0]):
-                # importantly notice that state.player[0]. Easy to miss if refactoring.
-                state.bank += rules.bet_hand(state.player[0], state.dealer, state.bet, win_odds=PayoutOdds.THREE_TWO)
+    elif hit_stay_double == PlayerAction.STAY:
+        hand_completed = True
+
+    else:
+        raise StupidProgrammerException("missed hit/stay/double implementation")
+
+    if hand_completed:
+        state.current_hand += 1
+        if len(state.player) == state.current_hand:
+            state.stage = GameStage.PLAYER_DONE
+
+def _player_done(state : GameState, inputs : InputProvider, strings : OutputProvider, reader : Callable[..., str], writer : Callable[[str], None]):
+    counting.reveal_hole_card(state)
+    rules.dealer_play(state.dealer, state.deck, state.rules.hit_soft_17)
+    state.stage = GameStage.UPDATE_BANK
+
+    # if the dealer busted then report it.
+    if rules.is_bust(state.dealer):
+        strings.show_dealer_bust(state, writer)
+    else:
+        strings.show_dealer_hand_up(state, writer)
+
+def _update_bank(state : GameState, inputs : InputProvider, strings : OutputProvider, reader : Callable[..., str], writer : Callable[[str], None]):
+    # winning logic specifically for naturals has not yet been applied. When we transitioned from a blackjack, the code didn't compute winnings. We now compute winnings.
+    if len(state.player) == 1 and rules.is_natural(state.player[0]):
+        # importantly notice that state.player[0]. Easy to miss if refactoring.
+        state.bank += rules.bet_hand(state.player[0], state.dealer, state.bet, win_odds=PayoutOdds.THREE_TWO, house=state.rules)
+
+    else:
+        state.bank += rules.winnings(state.player, state.dealer, state.bet, state.rules)
+
+    state.bet = 0
+    state.stage = GameStage.COMPLETE
+    strings.show_bank(state, writer)
+
+def _complete(state : GameState, inputs : InputProvider, strings : OutputProvider, reader : Callable[..., str], writer : Callable[[str], None]):
+    # tear down the state so that we can notice unexpected behavior with None if we start over. only bank and deck persist between rounds.
+    state.reset()
+
+def _check_natural(state : GameState):
+    # a natural has nothing to decide, so it goes straight to the dealer
+    if rules.is_natural(state.player[state.current_hand]):
+        state.stage = GameStage.PLAYER_DONE
+        state.current_hand += 1
+
+    # so does a hand against a dealer who peeks and finds one. the round is over before anything more is bet.
+    elif state.rules.dealer_peeks and rules.is_natural(state.dealer):
+        state.stage = GameStage.PLAYER_DONE
+        state.current_hand = len(state.player)
+
+def _skip_no_ops(state : GameState):
+    # moves past ASK_INSURANCE and ASK_SPLIT when they have nothing to ask, doing what they'd have done without asking. they show nothing in that case either, so skipping them can't be told apart from stepping through them.
+    if (state.stage == GameStage.ASK_INSURANCE and
+        not (state.rules.insurance and rules.is_insurable(state.dealer) and 0 <= state.bank - rules.insurance_make_side_bet(state.bet, state.rules))):
+
+        state.stage = GameStage.ASK_SPLIT
+        _check_natural(state)
+
+    if (state.stage == GameStage.ASK_SPLIT and
+        not (rules.can_split(state.player[state.current_hand]) and state.bank - state.bet >= 0)):
+
+        state.stage = GameStage.PLAYER_ACTIONS
+
+_SKIPPABLE = frozenset((GameStage.ASK_INSURANCE, GameStage.ASK_SPLIT))
+
+STAGE_HANDLERS = {
+    GameStage.ASK_BET : _ask_bet,
+    GameStage.INIT_DEAL : _init_deal,
+    GameStage.ASK_INSURANCE : _ask_insurance,
+    GameStage.ASK_SPLIT : _ask_split,
+    GameStage.PLAYER_ACTIONS : _player_actions,
+    GameStage.PLAYER_DONE : _player_done,
+    GameStage.UPDATE_BANK : _update_bank,
+    GameStage.COMPLETE : _complete,
+}
+
+def transition_logic(state : GameState, inputs : InputProvider, strings : OutputProvider, reader : Callable[..., str], writer : Callable[[str], None], skip_no_ops : bool=False, history : Optional[HandHistoryWriter]=None):
+    """
+    Given a GameStage and related state, returns the updated state according to blackjack logic and user input. Implemented as a state machine: STAGE_HANDLERS maps each stage to the function that handles it.
 
-            else:
-                state.bank += rules.winnings(state.player, state.dealer, state.bet)
+    Impure, but you can wrap it in a function that encapsulates state changes and returns a new GameState
 
-            state.bet = 0
-            state.stage = GameStage.COMPLETE
-            strings.show_bank(state, writer)
+    @arg state A GameState representing a snapshot of the working state
+    @arg skip_no_ops Go straight past ASK_INSURANCE when the dealer shows no ace (or the bank can't cover the side bet) and past ASK_SPLIT when the hand isn't a pair (or the bank can't cover it). Without it every stage takes a call of its own.
+    @arg history Logs every round to this hand history: its shoe and bank at ASK_BET, every answer from `inputs`, and the hands once the bank is updated.
+    """
+    handler = STAGE_HANDLERS.get(state.stage)
+    if handler is None:
+        raise StupidProgrammerException(f"missed case {state.stage} in driver.transition_logic")
 
-        case GameStage.COMPLETE:
+    if history is not None:
+        inputs = history.recording(inputs)
+        if state.stage == GameStage.ASK_BET:
+            history.begin_round(state)
 
-            # tear down the state so that we can notice unexpected behavior with None if we start over
-            for field in fields(state):
-                # the attributes in the list are those allowed to persist between rounds
-                if field.name not in ['bank', 'deck']:
-                    setattr(state, str(field.name), None)
+    handler(state, inputs, strings, reader, writer)
 
-            state.stage = GameStage.ASK_BET
+    if skip_no_ops and state.stage in _SKIPPABLE:
+        _skip_no_ops(state)
 
-        case _:
-            raise StupidProgrammerException(f"missed case {state.stage} in driver.transition_logic")
+    # the round is over once the bank is updated. the hands are still there until COMPLETE tears them down.
+    if history is not None and state.stage == GameStage.COMPLETE:
+        history.end_round(state)
 
 def driver_io(
     ext_stop_pred : threading.Event,
@@ -181,35 +240,65 @@ def driver_io(
     strings : OutputProvider,
     reader : Callable[..., str]=input,
     writer : Callable[[str], None]=print,
+    house : HouseRules=TraditionalRules,
+    shoes : Optional[Iterable[cards.Deck]]=None,
+    seed : Optional[int]=None,
+    count : Optional[CountSystem]=None,
+    skip_no_ops : bool=True,
+    history : Optional[HandHistoryWriter]=None,
+    shuffle : Optional[ShufflePolicy]=None,
 ):
     """
     Sort of like main() or a rules.loop. It's the highest level driver of program logic and it creates the I/O side effects concerning user input and display.
+
+    @arg house The rules of the table. Also decides the size of the shoe and, without a `shuffle` policy, when it gets reshuffled.
+    @arg shoes Where to take each new shoe from, for example a sim.shoes.ShoeBatch. When absent one shoe is made and reshuffled in place for the whole session.
+    @arg seed Seeds every shuffle of a shoe made here, so a session can be played again. Fresh entropy from the OS when absent.
+    @arg count Keeps this count in every shoe (see counting.CountingShoe), for inputs that read it from state.deck.
+    @arg skip_no_ops See transition_logic. Nothing shown or asked changes either way.
+    @arg history Logs every round to this hand history, see transition_logic. Flushed when the session ends, but left open.
+    @arg shuffle When to shuffle, see core.shuffle. The house's shuffle_pred() when absent, through its CompiledRules.
     """
 
-    def make_deck_epoch():
-        def _epoch_time_ms():
-            return round(time.time() * 1000)
-    
-        epoch = _epoch_time_ms()
-        seed = random.Random(epoch)
-        return cards.make_deck_unordered(seed) 
+    # one stream for the whole session. the epoch milliseconds this used to seed every shoe with could repeat between shoes made in the same millisecond, and couldn't be replayed on purpose.
+    rseed = random.Random(seed)
 
-    try:
-        state = GameState(GameStage.ASK_BET, make_deck_epoch(), inputs.input_bank(reader, writer), None, None, None, None)
-        completed_rounds = 0
+    # every shuffle gets a seed of its own from the session's stream so a hand history can say which shoe it was
+    reuse = shoes is None
+    if reuse:
+        shoes = [cards.make_seeded_shoe(rseed.getrandbits(64), house.num_decks(), house.penetration())]
+    if count is not None:
+        shoes = counting.counted(shoes, count)
 
-        while not ext_stop_pred.is_set():
-            if state.stage == GameStage.COMPLETE: 
-                completed_rounds += 1
+    next_shoe = iter(shoes).__next__
 
-            if completed_rounds >= 3: # I know this is magic number. don't care for now.
-                completed_rounds = 0
-                state.deck = make_deck_epoch()
+    try:
+        state = GameState(GameStage.ASK_BET, next_shoe(), inputs.input_bank(reader, writer), None, None, None, None, compile_rules(house))
+        # rounds since the last shuffle
+        rounds = 0
 
-                strings.show_shuffling(state, writer)
+        while not ext_stop_pred.is_set():
+            # only ever reshuffle between rounds. the cut card coming out mid-round just means this round is the last one of the shoe.
+            if state.stage == GameStage.COMPLETE:
+                rounds += 1
+                due = state.rules.shuffle_due(state) if shuffle is None else shuffle.due(state, rounds)
+                # whatever decided, a shoe that might not last another round is shuffled. see cards.is_low()
+                if due or cards.is_low(state.deck):
+                    if reuse:
+                        # the same cards go back in the shuffler. the seed comes from the same stream in the same order as when every shoe was made anew, so a seed still plays the same session.
+                        state.deck.reshuffle(rseed.getrandbits(64))
+                    else:
+                        state.deck = next_shoe()
+                    rounds = 0
+
+                    strings.show_shuffling(state, writer)
             #writer(str(state.stage))
 
-            transition_logic(state, inputs, strings, reader, writer)
+            transition_logic(state, inputs, strings, reader, writer, skip_no_ops, history)
 
     except KeyboardInterrupt:
         strings.show_keyboard_interrupt(state, writer)
+
+    finally:
+        if history is not None:
+            history.flush()
@@ -0,0 +1,355 @@
+"""
+Hand history: an append-only binary log of every round played, for auditing and replay.
+
+A log is a header followed by one record per round, each prefixed with its length so a reader can step over records without decoding them. Money is a varint (zigzag for anything that can be negative) and every card is one byte, its cards.encode_card() code.
+
+    header      b"BJHH", version byte
+    record      varint length, then:
+        flags           byte. bit 0: a shoe seed follows
+        seed            varint, if flagged. see cards.make_seeded_shoe
+        remaining       varint. cards left in the shoe when the round started
+        bank            zigzag varint. the bank before the bet
+        bet             varint. the bet placed at ASK_BET
+        delta           zigzag varint. the bank after the round minus the bank before
+        decisions       varint count, then one byte each. see the decision codes below
+        player          byte count of hands, then for each hand a byte count of cards and the cards
+        dealer          byte count of cards and the cards
+
+Writing goes through a buffer that's handed to the sink in large blocks, so logging costs little more than encoding.
+"""
+import mmap
+import os
+
+from os import PathLike
+from typing import BinaryIO, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+from blackjack.core import cards
+from blackjack.core.cards import Card, Hand
+from blackjack.core.exception.StupidProgrammerException import StupidProgrammerException
+from blackjack.core.io.InputProvider import InputProvider
+from blackjack.core.io.RecordingInput import RecordingInput
+from blackjack.core.state import GameState, PlayerAction
+
+MAGIC = b"BJHH"
+VERSION = 1
+HEADER = MAGIC + bytes([VERSION])
+
+_FLAG_SEED = 0x01
+
+# decision codes. hit, stay and double are their PlayerAction values.
+STAY = PlayerAction.STAY.value
+HIT = PlayerAction.HIT.value
+DOUBLE = PlayerAction.DOUBLE.value
+SPLIT = 3
+NO_SPLIT = 4
+INSURANCE = 5
+NO_INSURANCE = 6
+
+# a few MB of records per write
+DEFAULT_BUFFER_SIZE = 1 << 22
+
+class RoundRecord(NamedTuple):
+    seed : Optional[int]
+    remaining : int
+    bank : int
+    bet : int
+    delta : int
+    decisions : bytes
+    player : Tuple[Tuple[Card, ...], ...]
+    dealer : Tuple[Card, ...]
+
+def zigzag(n : int) -> int:
+    """
+    Maps signed to unsigned so small negatives stay small: 0, -1, 1, -2 ... becomes 0, 1, 2, 3 ...
+
+    Complexity: O(1)
+    """
+    return n * 2 if n >= 0 else -n * 2 - 1
+
+def unzigzag(n : int) -> int:
+    """
+    Complexity: O(1)
+    """
+    return n // 2 if n % 2 == 0 else -(n + 1) // 2
+
+def write_varint(buf : bytearray, n : int):
+    """
+    Appends an unsigned integer, seven bits per byte, low bits first.
+
+    Complexity: O(log n)
+
+    Impure
+    """
+    if n < 0:
+        raise ValueError(f"varints are unsigned, zigzag it first: {n}")
+    while n >= 0x80:
+        buf.append((n & 0x7f) | 0x80)
+        n >>= 7
+    buf.append(n)
+
+def read_varint(data : bytes, pos : int) -> Tuple[int, int]:
+    """
+    Reads a varint at pos. Returns it and the position after it.
+
+    Complexity: O(log n)
+    """
+    n = 0
+    shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        n |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return n, pos
+        shift += 7
+
+# cards.encode_card() as a bound method, so encoding a hand is one C-level map
+_CODE_OF = {card : cards.encode_card(card) for card in cards.CARDS}.__getitem__
+
+def _write_hand(buf : bytearray, hand : Hand):
+    buf.append(len(hand))
+    buf += bytes(map(_CODE_OF, hand))
+
+def _read_hand(data : bytes, pos : int) -> Tuple[Tuple[Card, ...], int]:
+    length = data[pos]
+    pos += 1
+    return tuple(cards.CARDS[code] for code in data[pos:pos + length]), pos + length
+
+def _encode(buf : bytearray, seed : Optional[int], remaining : int, bank : int, bet : int, delta : int, decisions : bytes, player : Iterable[Hand], dealer : Hand):
+    # encode_round() without the RoundRecord, for the writer. nearly every field fits in one byte, so those skip write_varint().
+    body = bytearray()
+    append = body.append
+    if seed is None:
+        append(0)
+    else:
+        append(_FLAG_SEED)
+        write_varint(body, seed)
+    for n in (remaining, zigzag(bank), bet, zigzag(delta), len(decisions)):
+        if n < 0x80:
+            append(n)
+        else:
+            write_varint(body, n)
+    body += decisions
+    append(len(player))
+    for hand in player:
+        _write_hand(body, hand)
+    _write_hand(body, dealer)
+
+    if len(body) < 0x80:
+        buf.append(len(body))
+    else:
+        write_varint(buf, len(body))
+    buf += body
+
+def encode_round(buf : bytearray, record : RoundRecord):
+    """
+    Appends one record, length and all.
+
+    Complexity: O(n) for cards and decisions
+
+    Impure
+    """
+    _encode(buf, *record)
+
+def decode_round(data : bytes, pos : int) -> Tuple[RoundRecord, int]:
+    """
+    Reads the record at pos. Returns it and the position of the next one.
+
+    Complexity: O(n) for cards and decisions
+    """
+    length, pos = read_varint(data, pos)
+    end = pos + length
+
+    flags = data[pos]
+    pos += 1
+    seed = None
+    if flags & _FLAG_SEED:
+        seed, pos = read_varint(data, pos)
+    remaining, pos = read_varint(data, pos)
+    bank, pos = read_varint(data, pos)
+    bet, pos = read_varint(data, pos)
+    delta, pos = read_varint(data, pos)
+    num_decisions, pos = read_varint(data, pos)
+    decisions = bytes(data[pos:pos + num_decisions])
+    pos += num_decisions
+
+    num_hands = data[pos]
+    pos += 1
+    player = []
+    for _ in range(num_hands):
+        hand, pos = _read_hand(data, pos)
+        player.append(hand)
+    dealer, pos = _read_hand(data, pos)
+
+    if pos != end:
+        raise ValueError(f"hand history record ends at {pos}, its length says {end}")
+
+    return RoundRecord(seed, remaining, unzigzag(bank), bet, unzigzag(delta), decisions, tuple(player), dealer), end
+
+def _at_start(sink : BinaryIO) -> bool:
+    # a pipe or socket can't tell where it is, so it's taken to be a new log
+    try:
+        return sink.tell() == 0
+    except (OSError, AttributeError):
+        return True
+
+class HandHistoryWriter:
+    """
+    Collects each round as it's played and appends its record to a buffer, which goes to `sink` whenever it passes `buffer_size` bytes and on flush() or close().
+
+    A round is begin_round() at ASK_BET, placed_bet() after it, decide() for every answer (recording() wraps an InputProvider to do that), and end_round() once the bank is updated. driver.transition_logic and sim.engine.play_round do all of this when given a history.
+    """
+
+    def __init__(self, sink : BinaryIO, buffer_size : int=DEFAULT_BUFFER_SIZE):
+        self.sink = sink
+        self.buffer_size = buffer_size
+        # a sink opened with "ab" on an existing log carries on after its records, under the header it already has
+        self.buffer = bytearray(HEADER if _at_start(sink) else b"")
+        self.rounds = 0
+
+        self._decisions = bytearray()
+        self._seed = None
+        self._remaining = 0
+        self._bank = 0
+        self._bet = 0
+
+        # the last inputs wrapped by recording(), so a caller can ask every step without allocating
+        self._wrapped = None
+        self._recording = None
+
+    def __enter__(self) -> "HandHistoryWriter":
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def recording(self, inputs : InputProvider) -> RecordingInput:
+        """
+        `inputs` wrapped so that every answer is also passed to decide(). Asking again with the same inputs gives the same wrapper.
+
+        Complexity: O(1)
+        """
+        if inputs is not self._wrapped:
+            self._wrapped = inputs
+            self._recording = RecordingInput(inputs, self)
+        return self._recording
+
+    def begin_round(self, state : GameState):
+        """
+        Impure
+        """
+        self._decisions.clear()
+        self._seed = getattr(state.deck, "seed", None)
+        self._remaining = len(state.deck)
+        self._bank = state.bank
+
+    def placed_bet(self, bet : int):
+        """
+        Impure
+        """
+        self._bet = bet
+
+    def decide(self, code : int):
+        """
+        Impure
+        """
+        self._decisions.append(code)
+
+    def decide_split(self, split : bool):
+        """
+        Impure
+        """
+        self._decisions.append(SPLIT if split else NO_SPLIT)
+
+    def decide_insurance(self, insurance : bool):
+        """
+        Impure
+        """
+        self._decisions.append(INSURANCE if insurance else NO_INSURANCE)
+
+    def round_record(self, state : GameState) -> RoundRecord:
+        """
+        The record end_round() would write for this round, as a RoundRecord, without writing it.
+
+        Complexity: O(n) for cards and decisions
+        """
+        return RoundRecord(
+            self._seed, self._remaining, self._bank, self._bet, state.bank - self._bank, bytes(self._decisions),
+            tuple(map(tuple, state.player)), tuple(state.dealer),
+        )
+
+    def end_round(self, state : GameState):
+        """
+        Encodes the round into the buffer, flushing it if it's full.
+
+        Complexity: O(n) for cards and decisions
+
+        Impure
+        """
+        if state.player is None or state.dealer is None:
+            raise StupidProgrammerException("hand history asked to end a round that has no hands")
+
+        _encode(self.buffer, self._seed, self._remaining, self._bank, self._bet, state.bank - self._bank, self._decisions, state.player, state.dealer)
+        self.rounds += 1
+
+        if len(self.buffer) >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        """
+        Impure
+        """
+        if self.buffer:
+            self.sink.write(self.buffer)
+            self.buffer.clear()
+        self.sink.flush()
+
+    def close(self):
+        """
+        Flushes. The sink stays open, it belongs to the caller.
+
+        Impure
+        """
+        self.flush()
+
+def _check_header(data : bytes):
+    if data[:len(MAGIC)] != MAGIC:
+        raise ValueError("not a hand history")
+    if data[len(MAGIC)] != VERSION:
+        raise ValueError(f"unsupported hand history version {data[len(MAGIC)]}")
+
+def iter_records(data : bytes) -> Iterator[RoundRecord]:
+    """
+    Every record of a log, lazily. `data` is anything that slices like bytes, a memory map included.
+
+    Complexity: O(n)
+    """
+    _check_header(data)
+    pos = len(HEADER)
+    end = len(data)
+    while pos < end:
+        record, pos = decode_round(data, pos)
+        yield record
+
+def read_history(data : bytes) -> List[RoundRecord]:
+    """
+    Every record of a whole log held in memory.
+
+    Complexity: O(n)
+    """
+    return list(iter_records(data))
+
+def iter_history(path : Union[str, PathLike]) -> Iterator[RoundRecord]:
+    """
+    Every record of the log at `path`, lazily, none for an empty file. The file is memory mapped rather than read, so the log can be far bigger than memory: only the pages being decoded need to be resident.
+
+    Complexity: O(n)
+
+    Impure
+    """
+    with open(path, "rb") as f:
+        # an empty file can't be mapped, and holds no rounds
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            yield from iter_records(data)
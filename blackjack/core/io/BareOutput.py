@@ -1,36 +1,37 @@
 from functools import singledispatch
 from typing import Callable
 
+from blackjack.core.cards import card_string, render_hand
 from blackjack.core.io.OutputProvider import OutputProvider
 from blackjack.core.state import GameState, Hand
 from blackjack.core.rules import hand_value
 
 class BareOutput(OutputProvider):
     """
-    Not pretty but usable contextual strings.
+    Not pretty but usable contextual strings. Cards are in short form, see cards.render_hand().
     """
 
 # show methods -- text that shows without requiring further action
 
     @staticmethod
     def show_player_hand(state : GameState, writer : Callable[[str], None]):
-        writer(f"player:{state.player[state.current_hand]}")
+        writer("player:" + render_hand(state.player[state.current_hand]))
 
     @staticmethod
     def show_dealer_hand_down(state : GameState, writer : Callable[[str], None]):
-        writer("dealer:" + str(state.dealer[0]))
+        writer("dealer:" + card_string(state.dealer[0]))
 
     @staticmethod
     def show_dealer_hand_up(state : GameState, writer : Callable[[str], None]):
-        writer("dealer:" + str(state.dealer))
+        writer("dealer:" + render_hand(state.dealer))
 
     @staticmethod
     def show_player_bust(state : GameState, writer : Callable[[str], None]):
-        writer(f"show_player_bust: {state.player[state.current_hand]}")
+        writer("show_player_bust: " + render_hand(state.player[state.current_hand]))
 
     @staticmethod
     def show_dealer_bust(state : GameState, writer : Callable[[str], None]):
-        writer(f"show_bust: {state.dealer}")
+        writer("show_bust: " + render_hand(state.dealer))
 
     @staticmethod
     def show_insurance_success(state : GameState, writer : Callable[[str], None]):
@@ -0,0 +1,126 @@
+from typing import Callable, List, Optional, Tuple
+
+from blackjack.core.cards import Card
+from blackjack.core.io.BareOutput import BareOutput
+from blackjack.core.io.OutputProvider import OutputProvider
+from blackjack.core.state import GameState, GameStage
+
+# (show method of the wrapped provider, bank, current player hand, dealer hand). a line written straight through write() is (None, line, None, None).
+Event = Tuple[Optional[Callable], object, Optional[Tuple[Card, ...]], Optional[Tuple[Card, ...]]]
+
+class BufferedOutput(OutputProvider):
+    """
+    Shows what `strings` would, but later: every show call only records an event, a copy of what it needs from the state and no strings, and the whole lot is formatted and handed to `writer` as one string at the end of the round (show_bank) or on flush().
+
+    Prompts written by an InputProvider have to come out after whatever was shown before them and before the player answers, so pass write() as the writer and reading() around the reader:
+
+        out = BufferedOutput(BareOutput)
+        driver.driver_io(Event(), BareInput, out, out.reading(input), out.write)
+
+    That's one call to `writer` per question and one at the end of the round, instead of one per line. Headless play that asks nothing gets one per round. A round cut short by stopping the driver stays in the buffer until flush().
+    """
+
+    def __init__(self, strings : OutputProvider=BareOutput, writer : Callable[[str], None]=print):
+        self.strings = strings
+        self.writer = writer
+        self.events : List[Event] = []
+        # the state the events are shown from when they're formatted, reused for every event
+        self._scratch = GameState(GameStage.COMPLETE, None, 0, None, None, None, None)
+
+    def write(self, line : str):
+        """
+        A writer for everything that isn't a show call, like an InputProvider's prompts. Buffered in order with the rest.
+
+        Impure
+        """
+        self.events.append((None, line, None, None))
+
+    def reading(self, reader : Callable[..., str]) -> Callable[..., str]:
+        """
+        `reader`, flushing everything buffered before every read.
+
+        Complexity: O(1)
+        """
+        def read(*args) -> str:
+            self.flush()
+            return reader(*args)
+        return read
+
+    def flush(self):
+        """
+        Formats every event and writes them as one string, if there are any.
+
+        Complexity: O(n) for events
+
+        Impure
+        """
+        if not self.events:
+            return
+
+        lines = []
+        scratch = self._scratch
+        for show, bank, hand, dealer in self.events:
+            if show is None:
+                lines.append(bank)
+                continue
+            scratch.bank = bank
+            scratch.player = None if hand is None else [list(hand)]
+            scratch.current_hand = 0
+            scratch.dealer = None if dealer is None else list(dealer)
+            show(scratch, lines.append)
+        self.events.clear()
+
+        self.writer("\n".join(lines))
+
+    def _record(self, show : Callable, state : Optional[GameState]):
+        # copies rather than references, since the state's hands are dealt into again next round. see GameState.reset
+        if state is None:
+            # see OutputProvider.show_keyboard_interrupt
+            self.events.append((show, None, None, None))
+            return
+        player = state.player
+        hand = tuple(player[state.current_hand]) if player is not None and state.current_hand is not None and state.current_hand < len(player) else None
+        dealer = None if state.dealer is None else tuple(state.dealer)
+        self.events.append((show, state.bank, hand, dealer))
+
+# show methods -- text that shows without requiring further action
+
+    def show_player_hand(self, state : GameState, writer : Callable[[str], None]):
+        self._record(self.strings.show_player_hand, state)
+
+    def show_dealer_hand_down(self, state : GameState, writer : Callable[[str], None]):
+        self._record(self.strings.show_dealer_hand_down, state)
+
+    def show_dealer_hand_up(self, state : GameState, writer : Callable[[str], None]):
+        self._record(self.strings.show_dealer_hand_up, state)
+
+    def show_player_bust(self, state : GameState, writer : Callable[[str], None]):
+        self._record(self.strings.show_player_bust, state)
+
+    def show_dealer_bust(self, state : GameState, writer : Callable[[str], None]):
+        self._record(self.strings.show_dealer_bust, state)
+
+    def show_insurance_success(self, state : GameState, writer : Callable[[str], None]):
+        self._record(self.strings.show_insurance_success, state)
+
+    def show_insurance_fail(self, state : GameState, writer : Callable[[str], None]):
+        self._record(self.strings.show_insurance_fail, state)
+
+    def show_bank(self, state : GameState, writer : Callable[[str], None]):
+        # the last thing a round shows
+        self._record(self.strings.show_bank, state)
+        self.flush()
+
+    def show_player_blackjack(self, state : GameState, writer : Callable[[str], None]):
+        self._record(self.strings.show_player_blackjack, state)
+
+    def show_max_hand(self, state : GameState, writer : Callable[[str], None]):
+        self._record(self.strings.show_max_hand, state)
+
+    def show_shuffling(self, state : GameState, writer : Callable[[str], None]):
+        self._record(self.strings.show_shuffling, state)
+
+    def show_keyboard_interrupt(self, state : GameState, writer : Callable[[str], None]):
+        # the session is over, so out with everything
+        self._record(self.strings.show_keyboard_interrupt, state)
+        self.flush()
@@ -0,0 +1,48 @@
+from typing import Callable
+
+from blackjack.core import constants, rules
+from blackjack.core.io.InputProvider import InputProvider
+from blackjack.core.state import GameState, PlayerAction
+
+# looked up once. on python 3.11 EnumType has a __getattr__, so PlayerAction.HIT is a slow lookup every time
+_HIT = PlayerAction.HIT
+_STAY = PlayerAction.STAY
+
+class DealerMimicInput(InputProvider):
+    """
+    Answers without reading anything: plays the hand the way the dealer must, never doubles, splits or takes insurance, and bets the same every round. A baseline policy for headless play.
+
+    Unlike BareInput this is used as an instance, because the bet is configurable.
+    """
+
+    def __init__(self, bet : int=constants.MIN_BET, bank : int=100 * constants.MIN_BET):
+        if bet < constants.MIN_BET:
+            raise ValueError(f"bet below the minimum of {constants.MIN_BET}: {bet}")
+        self.bet = bet
+        self.bank = bank
+
+    def input_bank(self, reader : Callable[..., str], writer : Callable[[str], None]) -> int:
+        return self.bank
+
+    def input_bet(self, state : GameState, reader : Callable[..., str], writer : Callable[[str], None]) -> int:
+        # all in when the bank can't cover the usual bet
+        return self.bet if self.bet <= state.bank else state.bank
+
+    def input_hit(self, state : GameState, reader : Callable[..., str], writer : Callable[[str], None]) -> PlayerAction:
+        hand = state.player[state.current_hand]
+        if type(hand) is rules.ValuedHand:
+            # a ValuedHand knows its counts already, no need to go through hand_value()'s dispatch on every card. this is value() without the call.
+            hard = hand.hard
+            value = hard + rules.SOFT_ACE_BONUS if hand.aces and hard + rules.SOFT_ACE_BONUS <= constants.MAX_HAND_VALUE else hard
+        else:
+            value = rules.hand_value(hand)
+        return _HIT if value < constants.DEALER_STOP else _STAY
+
+    def input_hit_stay_double(self, state : GameState, reader : Callable[..., str], writer : Callable[[str], None]) -> PlayerAction:
+        return self.input_hit(state, reader, writer)
+
+    def input_want_split(self, state : GameState, reader : Callable[..., str], writer : Callable[[str], None]) -> bool:
+        return False
+
+    def input_want_insurance(self, state : GameState, reader : Callable[..., str], writer : Callable[[str], None]) -> bool:
+        return False
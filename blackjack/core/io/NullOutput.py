@@ -0,0 +1,59 @@
+from typing import Callable
+
+from blackjack.core.io.OutputProvider import OutputProvider
+from blackjack.core.state import GameState
+
+class NullOutput(OutputProvider):
+    """
+    Shows nothing and formats nothing. For headless play where nobody reads the output, so writer is never called and can be None.
+    """
+
+# show methods -- text that shows without requiring further action
+
+    @staticmethod
+    def show_player_hand(state : GameState, writer : Callable[[str], None]):
+        pass
+
+    @staticmethod
+    def show_dealer_hand_down(state : GameState, writer : Callable[[str], None]):
+        pass
+
+    @staticmethod
+    def show_dealer_hand_up(state : GameState, writer : Callable[[str], None]):
+        pass
+
+    @staticmethod
+    def show_player_bust(state : GameState, writer : Callable[[str], None]):
+        pass
+
+    @staticmethod
+    def show_dealer_bust(state : GameState, writer : Callable[[str], None]):
+        pass
+
+    @staticmethod
+    def show_insurance_success(state : GameState, writer : Callable[[str], None]):
+        pass
+
+    @staticmethod
+    def show_insurance_fail(state : GameState, writer : Callable[[str], None]):
+        pass
+
+    @staticmethod
+    def show_bank(state : GameState, writer : Callable[[str], None]):
+        pass
+
+    @staticmethod
+    def show_player_blackjack(state : GameState, writer : Callable[[str], None]):
+        pass
+
+    @staticmethod
+    def show_max_hand(state : GameState, writer : Callable[[str], None]):
+        pass
+
+    @staticmethod
+    def show_shuffling(state : GameState, writer : Callable[[str], None]):
+        pass
+
+    @staticmethod
+    def show_keyboard_interrupt(state : GameState, writer : Callable[[str], None]):
+        pass
@@ -0,0 +1,41 @@
+from typing import Callable
+
+from blackjack.core.io.InputProvider import InputProvider
+from blackjack.core.state import GameState, PlayerAction
+
+class RecordingInput(InputProvider):
+    """
+    Passes every question on to `inputs` and tells `log` (a history.HandHistoryWriter) what the answer was. Get one from HandHistoryWriter.recording().
+    """
+
+    def __init__(self, inputs : InputProvider, log):
+        self.inputs = inputs
+        self.log = log
+
+    def input_bank(self, reader : Callable[..., str], writer : Callable[[str], None]) -> int:
+        return self.inputs.input_bank(reader, writer)
+
+    def input_bet(self, state : GameState, reader : Callable[..., str], writer : Callable[[str], None]) -> int:
+        bet = self.inputs.input_bet(state, reader, writer)
+        self.log.placed_bet(bet)
+        return bet
+
+    def input_hit(self, state : GameState, reader : Callable[..., str], writer : Callable[[str], None]) -> PlayerAction:
+        action = self.inputs.input_hit(state, reader, writer)
+        self.log.decide(action.value)
+        return action
+
+    def input_hit_stay_double(self, state : GameState, reader : Callable[..., str], writer : Callable[[str], None]) -> PlayerAction:
+        action = self.inputs.input_hit_stay_double(state, reader, writer)
+        self.log.decide(action.value)
+        return action
+
+    def input_want_split(self, state : GameState, reader : Callable[..., str], writer : Callable[[str], None]) -> bool:
+        split = self.inputs.input_want_split(state, reader, writer)
+        self.log.decide_split(split)
+        return split
+
+    def input_want_insurance(self, state : GameState, reader : Callable[..., str], writer : Callable[[str], None]) -> bool:
+        insurance = self.inputs.input_want_insurance(state, reader, writer)
+        self.log.decide_insurance(insurance)
+        return insurance
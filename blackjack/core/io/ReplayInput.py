@@ -0,0 +1,69 @@
+from typing import Callable
+
+from blackjack.core import history
+from blackjack.core.history import RoundRecord
+from blackjack.core.io.InputProvider import InputProvider
+from blackjack.core.state import GameState, PlayerAction
+
+# decoding a hit/stay/double decision, by code
+_ACTIONS = {action.value : action for action in PlayerAction}
+
+class ReplayInput(InputProvider):
+    """
+    Answers with the bet and decisions of a recorded round (see history.RoundRecord), in the order they were made. Load a round with start().
+
+    Raises ValueError when it's asked something the recording didn't answer at that point, which means the game no longer plays out the way it did when the round was recorded.
+    """
+
+    def __init__(self):
+        self.bet = 0
+        self.decisions = b""
+        self.next = 0
+
+    def start(self, record : RoundRecord):
+        """
+        Impure
+        """
+        self.bet = record.bet
+        self.decisions = record.decisions
+        self.next = 0
+
+    def _decision(self, question : str) -> int:
+        if self.next >= len(self.decisions):
+            raise ValueError(f"asked {question} after the last recorded decision")
+        code = self.decisions[self.next]
+        self.next += 1
+        return code
+
+    def input_bank(self, reader : Callable[..., str], writer : Callable[[str], None]) -> int:
+        raise ValueError("a hand history records the bank of each round, not of the session")
+
+    def input_bet(self, state : GameState, reader : Callable[..., str], writer : Callable[[str], None]) -> int:
+        return self.bet
+
+    def _action(self, question : str) -> PlayerAction:
+        code = self._decision(question)
+        if code not in _ACTIONS:
+            raise ValueError(f"asked {question} but decision {self.next - 1} is {code}")
+        return _ACTIONS[code]
+
+    def input_hit(self, state : GameState, reader : Callable[..., str], writer : Callable[[str], None]) -> PlayerAction:
+        action = self._action("hit or stay")
+        if action is PlayerAction.DOUBLE:
+            raise ValueError(f"asked hit or stay but decision {self.next - 1} is a double")
+        return action
+
+    def input_hit_stay_double(self, state : GameState, reader : Callable[..., str], writer : Callable[[str], None]) -> PlayerAction:
+        return self._action("hit, stay or double")
+
+    def input_want_split(self, state : GameState, reader : Callable[..., str], writer : Callable[[str], None]) -> bool:
+        code = self._decision("split")
+        if code != history.SPLIT and code != history.NO_SPLIT:
+            raise ValueError(f"asked split but decision {self.next - 1} is {code}")
+        return code == history.SPLIT
+
+    def input_want_insurance(self, state : GameState, reader : Callable[..., str], writer : Callable[[str], None]) -> bool:
+        code = self._decision("insurance")
+        if code != history.INSURANCE and code != history.NO_INSURANCE:
+            raise ValueError(f"asked insurance but decision {self.next - 1} is {code}")
+        return code == history.INSURANCE
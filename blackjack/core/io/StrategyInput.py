@@ -0,0 +1,43 @@
+from typing import Callable
+
+from blackjack.core import constants, rules
+from blackjack.core.StrategyTable import StrategyTable, card_index
+from blackjack.core.io.InputProvider import InputProvider
+from blackjack.core.state import GameState, PlayerAction
+
+class StrategyInput(InputProvider):
+    """
+    Answers from a StrategyTable, for bots and simulations. Every answer is a table lookup on the hand's value, softness, pair and the dealer's upcard, with no strings involved.
+
+    Like DealerMimicInput this is used as an instance. Swap `table` to change strategy, for example when the house rules change.
+    """
+
+    def __init__(self, table : StrategyTable, bet : int=constants.MIN_BET, bank : int=100 * constants.MIN_BET):
+        if bet < constants.MIN_BET:
+            raise ValueError(f"bet below the minimum of {constants.MIN_BET}: {bet}")
+        self.table = table
+        self.bet = bet
+        self.bank = bank
+
+    def input_bank(self, reader : Callable[..., str], writer : Callable[[str], None]) -> int:
+        return self.bank
+
+    def input_bet(self, state : GameState, reader : Callable[..., str], writer : Callable[[str], None]) -> int:
+        return min(self.bet, state.bank)
+
+    def input_hit(self, state : GameState, reader : Callable[..., str], writer : Callable[[str], None]) -> PlayerAction:
+        # also asked of a two card hand when the bank can't cover a double, so always the hit/stay half of the table
+        hand = state.player[state.current_hand]
+        return self.table.action(True, rules.is_soft(hand), 0, card_index(state.dealer[0]), rules.hand_value(hand))
+
+    def input_hit_stay_double(self, state : GameState, reader : Callable[..., str], writer : Callable[[str], None]) -> PlayerAction:
+        # a pair gets here after the split was declined, or as one of the split hands, so the pair no longer matters
+        hand = state.player[state.current_hand]
+        return self.table.action(False, rules.is_soft(hand), 0, card_index(state.dealer[0]), rules.hand_value(hand))
+
+    def input_want_split(self, state : GameState, reader : Callable[..., str], writer : Callable[[str], None]) -> bool:
+        hand = state.player[state.current_hand]
+        return self.table.split(rules.is_soft(hand), card_index(hand[0]), card_index(state.dealer[0]), rules.hand_value(hand))
+
+    def input_want_insurance(self, state : GameState, reader : Callable[..., str], writer : Callable[[str], None]) -> bool:
+        return self.table.insurance
@@ -1,5 +1,6 @@
 import functools
 
+from array import array
 from typing import List
 from enum import Enum
 
@@ -16,6 +17,104 @@ class Ordinal(Enum):
     EQ = 0
     GT = 1
 
+# the most an ace can add on top of its hard value of one. two aces can never both count as eleven, so at most one ace ever gets this.
+SOFT_ACE_BONUS = Rank.ACE.value[1] - Rank.ACE.value[0]
+
+# hard value (ace is one) of each rank, looked up once per card instead of digging through Rank.value
+_ACE_HARD_VALUE = Rank.ACE.value[0]
+_HARD_VALUES = {rank : (rank.value[0] if rank == Rank.ACE else rank.value[1]) for rank in Rank}
+
+def _soft(hard : int, aces_count : int) -> bool:
+    # given the hard total (aces as one), whether one ace can be eleven without busting.
+    return aces_count > 0 and hard + SOFT_ACE_BONUS <= constants.MAX_HAND_VALUE
+
+def soft_total(hard : int, aces_count : int) -> int:
+    """
+    The value of a hand from its hard total (aces as one) and how many aces it holds. This is all hand_value() needs, which is what makes running totals possible.
+
+    Complexity: O(1)
+    """
+    return hard + SOFT_ACE_BONUS if _soft(hard, aces_count) else hard
+
+class ValuedHand(list):
+    """
+    A Hand that keeps its hard total (aces as one) and ace count up to date as cards go in, so hand_value(), is_bust(), is_max(), is_hard_hand(), is_soft() and is_natural() answer without rescanning it.
+
+    It is still a list of Cards and compares equal to one, so anything that takes a Hand takes this. Appending is O(1). Any other mutation recounts the hand.
+    """
+    __slots__ = ('hard', 'aces')
+
+    def __init__(self, iterable=()):
+        super().__init__(iterable)
+        self._recount()
+
+    def _recount(self):
+        values = [_HARD_VALUES[card[0]] for card in self]
+        self.hard = sum(values)
+        self.aces = values.count(_ACE_HARD_VALUE)
+
+    def append(self, card):
+        super().append(card)
+        value = _HARD_VALUES[card[0]]
+        self.hard += value
+        if value == _ACE_HARD_VALUE:
+            self.aces += 1
+
+    def extend(self, iterable):
+        for card in iterable:
+            self.append(card)
+
+    def clear(self):
+        # every round empties the state's hands, so this one skips _recount()
+        super().clear()
+        self.hard = 0
+        self.aces = 0
+
+    def __iadd__(self, iterable):
+        self.extend(iterable)
+        return self
+
+    def _recounting(method):
+        # wraps the rest of list's mutators. they don't happen in a round so simplicity beats speed.
+        @functools.wraps(method)
+        def wrapper(self, *args):
+            result = method(self, *args)
+            self._recount()
+            return result
+        return wrapper
+
+    insert = _recounting(list.insert)
+    pop = _recounting(list.pop)
+    remove = _recounting(list.remove)
+    __setitem__ = _recounting(list.__setitem__)
+    __delitem__ = _recounting(list.__delitem__)
+    __imul__ = _recounting(list.__imul__)
+    del _recounting
+
+    def __reduce__(self):
+        # copy/deepcopy/pickle would otherwise restore the counts and then append every card on top of them
+        return (type(self), (list(self),))
+
+    def value(self) -> int:
+        """
+        Same as hand_value().
+
+        Complexity: O(1)
+        """
+        # soft_total() by hand. this is the hottest call in a simulation.
+        hard = self.hard
+        if self.aces and hard + SOFT_ACE_BONUS <= constants.MAX_HAND_VALUE:
+            return hard + SOFT_ACE_BONUS
+        return hard
+
+    def soft(self) -> bool:
+        """
+        Same as is_soft().
+
+        Complexity: O(1)
+        """
+        return _soft(self.hard, self.aces)
+
 # /core definitions
 ######################################################################################
 # hands
@@ -29,18 +128,27 @@ def init_hand(deck : Deck) -> Hand:
     Impure
     """
     ### the reason this is in rules and not cards is that the size of the hand is dependent on blackjack rules.
-    h = []
+    return init_hand_into(ValuedHand(), deck)
+
+def init_hand_into(hand : Hand, deck : Deck) -> Hand:
+    """
+    Same as init_hand() but deals into an existing empty hand, such as GameState.fresh_hand(), and returns it.
 
+    Complexity: O(k) for size of initial hand
+
+    Impure
+    """
     for _ in range(constants.INITIAL_HAND_LEN):
-        cards.take_card(h, deck)
+        cards.take_card(hand, deck)
 
-    return h
+    return hand
 
+@functools.singledispatch
 def is_hard_hand(hand : Hand) -> bool:
     """
     Determines whether a hand is 'hard' or 'soft' according to blackjack language.
 
-    Complexity: O(n)
+    Complexity: O(n), O(1) for a ValuedHand
     """
     aces_count = 0
     for card in hand:
@@ -54,15 +162,24 @@ def is_hard_hand(hand : Hand) -> bool:
 
     return True
 
+@is_hard_hand.register(ValuedHand)
+def _(hand : ValuedHand) -> bool:
+    return hand.aces != 1
+
 # /hands
 #######################################################################################
 # payouts
 
+def _with_aces(acc : int, aces_count : int) -> int:
+    # every ace is worth one, then one of them becomes eleven if that doesn't bust.
+    return soft_total(acc + aces_count * Rank.ACE.value[0], aces_count)
+
+@functools.singledispatch
 def hand_value(hand : Hand) -> int:
     """
-    Accumulates the cards in a hand, including ace rules.
+    Accumulates the cards in a hand, including ace rules. Encoded hands (see cards.EncodedHand) are also accepted.
 
-    Complexity: O(n)
+    Complexity: O(n), O(1) for a ValuedHand
     """
     # could refactor into functools.reduce/sum() but it might be less understandable.
     acc = 0
@@ -74,14 +191,56 @@ def hand_value(hand : Hand) -> int:
         else:
             acc += cards.card_value(card)
 
-    # count aces...
-    for _ in range(aces_count):
-        if acc + Rank.ACE.value[1] <= constants.MAX_HAND_VALUE:
-            acc += Rank.ACE.value[1]
+    return _with_aces(acc, aces_count)
+
+@hand_value.register(array)
+def _(hand : cards.EncodedHand) -> int:
+    # same as above but an ace is rank index zero and the values come from a flat table instead of the Enum.
+    acc = 0
+    aces_count = 0
+
+    for code in hand:
+        if code % cards.NUM_RANKS == 0:
+            aces_count += 1
+        else:
+            acc += cards.CARD_VALUES[code]
+
+    return _with_aces(acc, aces_count)
+
+@hand_value.register(ValuedHand)
+def _(hand : ValuedHand) -> int:
+    return hand.value()
+
+@functools.singledispatch
+def is_soft(hand : Hand) -> bool:
+    """
+    Whether an ace in the hand is currently counted as eleven. Unlike is_hard_hand() this is the definition basic strategy charts use.
+
+    Complexity: O(n), O(1) for a ValuedHand
+    """
+    hard = 0
+    aces_count = 0
+    for card in hand:
+        hard += _HARD_VALUES[card[0]]
+        if card[0] == Rank.ACE:
+            aces_count += 1
+    return _soft(hard, aces_count)
+
+@is_soft.register(array)
+def _(hand : cards.EncodedHand) -> bool:
+    hard = 0
+    aces_count = 0
+    for code in hand:
+        if code % cards.NUM_RANKS == 0:
+            hard += Rank.ACE.value[0]
+            aces_count += 1
         else:
-            acc += Rank.ACE.value[0]
+            hard += cards.CARD_VALUES[code]
+    return _soft(hard, aces_count)
 
-    return acc
+@is_soft.register(ValuedHand)
+def _(hand : ValuedHand) -> bool:
+    return hand.soft()
 
 def compare(a, b) -> Ordinal:
     """
@@ -140,7 +299,7 @@ def bet_hand(player : Hand, dealer : Hand, bet : int, win_odds : PayoutOdds=Payo
             raise StupidProgrammerException("Missing pattern match in blackjack.bet_hand()")
 
 
-def winnings(hands : List[Hand], dealer : Hand, bet : int) -> int:
+def winnings(hands : List[Hand], dealer : Hand, bet : int, house : HouseRules=TraditionalRules) -> int:
     """
     Computes bet winnings per hand split against the dealer.
 
@@ -149,7 +308,7 @@ def winnings(hands : List[Hand], dealer : Hand, bet : int) -> int:
     # naturals are 1:1 on split hands. fortunately this rule is accidentally built in already and nothing has to be done.
     bet_splice = round(bet / len(hands)) # TODO not scalable to len > 2 hands, if that were possible. this calculation is based on the assumption that the bet was *= 2 at split. also theoretically possible division by zero
     return functools.reduce(
-        lambda acc,hand: acc + bet_hand(hand, dealer, bet_splice),
+        lambda acc,hand: acc + bet_hand(hand, dealer, bet_splice, house=house),
         hands,
         0
     )
@@ -159,6 +318,7 @@ def winnings(hands : List[Hand], dealer : Hand, bet : int) -> int:
 # misc values
 
 def is_natural(hand: Hand) -> bool:
+    # O(1) for a ValuedHand since is_max() is.
     # this is an indirect check. it works. checking directly through the cards themselves is needlessly harder to do.
     return len(hand) == constants.INITIAL_HAND_LEN and is_max(hand)
 
@@ -167,6 +327,7 @@ def is_bust(value : int) -> bool:
     return value > constants.MAX_HAND_VALUE
 
 @is_bust.register(list)
+@is_bust.register(array)
 def _(hand : Hand) -> bool:
     return is_bust(hand_value(hand))
 
@@ -175,6 +336,7 @@ def is_max(value : int) -> bool:
     return value == constants.MAX_HAND_VALUE
 
 @is_max.register(list)
+@is_max.register(array)
 def _(hand : Hand) -> bool:
     return is_max(hand_value(hand))
 
@@ -186,9 +348,8 @@ def is_insurable(hand : Hand) -> bool:
     # we can directly access the second card here but it's not shown to user. so this function pretends.
     return hand[0][0] == cards.Rank.ACE
 
-def insurance_make_side_bet(bet) -> int:
-    # TODO allow flexible adjusting depending on casino rules
-    return round(bet / 2)
+def insurance_make_side_bet(bet, house : HouseRules=TraditionalRules) -> int:
+    return house.insurance_side_bet(bet)
 
 def insure(dealer : Hand, side_bet : int, house : HouseRules=TraditionalRules):
     if is_natural(dealer): # whereas a previous check might have observed just ace, this function observes entire hand
@@ -204,22 +365,44 @@ def can_split(hand : Hand) -> bool:
     return cards.card_rank_ord(hand[0]) == cards.card_rank_ord(hand[1])
 
 def init_split(hand : Hand, deck : Deck) -> List[Hand]:
-    return [[card, deck.pop()] for card in hand]
+    return [ValuedHand((card, deck.pop())) for card in hand]
+
+def init_split_into(hand : Hand, second : Hand, deck : Deck):
+    """
+    Same as init_split() but in place: `hand` keeps its first card and gets a new one, and the empty `second` gets the other card and a new one. The cards come off the deck in the same order.
+
+    Complexity: O(1)
+
+    Impure
+    """
+    moved = hand.pop()
+    cards.take_card(hand, deck)
+    second.append(moved)
+    cards.take_card(second, deck)
 
 # /splits
 #######################################################################################
 # dealer
 
-def dealer_play(dealer : Hand, deck : Deck):
+def dealer_hits(value : int, soft : bool, hit_soft_17 : bool=False) -> bool:
+    """
+    Whether the dealer takes another card on a hand of this value. Below constants.DEALER_STOP always, and on a soft 17 too when the house hits soft 17 (H17, see HouseRules.allow_dealer_hit_soft_17()).
+
+    Complexity: O(1)
+    """
+    return value < constants.DEALER_STOP or (hit_soft_17 and soft and value == constants.DEALER_STOP)
+
+def dealer_play(dealer : Hand, deck : Deck, hit_soft_17 : bool=False):
     """
-    Hits cards until the hand value >= constants.MAX_HAND_LEN
+    Hits cards until the hand value >= constants.DEALER_STOP, and past a soft 17 with hit_soft_17. The dealer and deck can both be encoded instead.
 
     Complexity: O(n)
 
     Impure
     """
     i = len(dealer)
-    while hand_value(dealer) < constants.DEALER_STOP and i <= constants.MAX_HAND_LEN:
+    # dealer_hits(), only asking is_soft() about a 17
+    while i <= constants.MAX_HAND_LEN and ((value := hand_value(dealer)) < constants.DEALER_STOP or (hit_soft_17 and value == constants.DEALER_STOP and is_soft(dealer))):
         cards.take_card(dealer, deck)
         i += 1
 
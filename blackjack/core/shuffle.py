@@ -0,0 +1,49 @@
+"""
+When to shuffle. A policy is asked between rounds, with the rounds played since the last shuffle, whether the shoe goes back in the shuffler before the next bet.
+
+Without a policy the house decides with HouseRules.shuffle_pred(), which for TraditionalRules waits for the cut card. Either way a shoe too low to last another round (cards.is_low()) is shuffled, whatever the policy says.
+"""
+from abc import ABC, abstractmethod
+
+from blackjack.core.state import GameState
+
+class ShufflePolicy(ABC):
+
+    @abstractmethod
+    def due(self, state : GameState, rounds : int) -> bool:
+        pass
+
+class Penetration(ShufflePolicy):
+    """
+    Shuffles once `fraction` of the shoe has been dealt, wherever the cut card is. Needs a cards.Shoe, which knows how big it was.
+    """
+
+    def __init__(self, fraction : float):
+        if not 0 < fraction <= 1:
+            raise ValueError(f"penetration must be within (0, 1]: {fraction}")
+        self.fraction = fraction
+
+    def due(self, state : GameState, rounds : int) -> bool:
+        size = state.deck.size
+        return size - len(state.deck) >= self.fraction * size
+
+class EveryRounds(ShufflePolicy):
+    """
+    Shuffles after every `rounds` rounds, however many cards they took.
+    """
+
+    def __init__(self, rounds : int):
+        if rounds < 1:
+            raise ValueError(f"can't shuffle every {rounds} rounds")
+        self.rounds = rounds
+
+    def due(self, state : GameState, rounds : int) -> bool:
+        return rounds >= self.rounds
+
+class Continuous(ShufflePolicy):
+    """
+    A continuous shuffling machine: the cards of every round go back in before the next.
+    """
+
+    def due(self, state : GameState, rounds : int) -> bool:
+        return True
@@ -1,8 +1,10 @@
 from enum import Enum
-from typing import List
-from dataclasses import dataclass
+from typing import List, Tuple
+from dataclasses import dataclass, field
 
 from blackjack.core.cards import Deck, Hand
+from blackjack.core.casino import TRADITIONAL, CompiledRules
+from blackjack.core.rules import ValuedHand
 
 class GameStage(Enum):
     ASK_BET = 0
@@ -14,7 +16,10 @@ class GameStage(Enum):
     UPDATE_BANK = 41
     COMPLETE = 50
 
-@dataclass
+# hands a player can have at once. only one split is allowed, see driver.transition_logic ASK_SPLIT.
+MAX_HANDS = 2
+
+@dataclass(slots=True)
 class GameState:
     # as a general guide for type safety, I've ordered this by roughly when they're initialized in the game. if you inspect at runtime you might be able to spot obvious bugs if there's a None before a non-None.
     stage : GameStage
@@ -24,6 +29,71 @@ class GameState:
     player : List[Hand]
     current_hand : int
     dealer : Hand
+    # the house's rules, compiled once (see casino.compile_rules) so a round reads flags instead of asking the house
+    rules : CompiledRules = field(default=TRADITIONAL, repr=False)
+
+    # every round deals into these instead of allocating new hands. they aren't part of the state's value, so they don't compare or print. whatever a round leaves in state.player and state.dealer belongs to the state and is emptied by the next deal, so copy a hand to keep it.
+    _player : List[Hand] = field(default_factory=list, init=False, repr=False, compare=False)
+    _hands : List[ValuedHand] = field(default_factory=lambda: [ValuedHand() for _ in range(MAX_HANDS)], init=False, repr=False, compare=False)
+    _dealer : ValuedHand = field(default_factory=ValuedHand, init=False, repr=False, compare=False)
+
+    def reset(self):
+        """
+        Ends the round. Everything but the bank and the deck goes back to None so that anything relying on the last round shows up, and the stage goes back to ASK_BET. Allocates nothing.
+
+        Complexity: O(1)
+
+        Impure
+        """
+        self.stage = GameStage.ASK_BET
+        self.bet = None
+        self.player = None
+        self.current_hand = None
+        self.dealer = None
+
+    def fresh_player(self) -> List[Hand]:
+        """
+        The state's own list of player hands, emptied.
+
+        Impure
+        """
+        self._player.clear()
+        return self._player
+
+    def fresh_hand(self, i : int) -> ValuedHand:
+        """
+        The state's own i-th player hand, emptied.
+
+        Impure
+        """
+        hand = self._hands[i]
+        hand.clear()
+        return hand
+
+    def fresh_dealer(self) -> ValuedHand:
+        """
+        The state's own dealer hand, emptied.
+
+        Impure
+        """
+        self._dealer.clear()
+        return self._dealer
+
+    def fresh_deal(self) -> Tuple[List[Hand], ValuedHand, ValuedHand]:
+        """
+        fresh_player(), fresh_hand(0) and fresh_dealer() in one call, for a deal that fills them all at once.
+
+        Impure
+        """
+        player = self._player
+        hand = self._hands[0]
+        dealer = self._dealer
+        player.clear()
+        # ValuedHand.clear() without two more calls
+        list.clear(hand)
+        list.clear(dealer)
+        hand.hard = hand.aces = dealer.hard = dealer.aces = 0
+        return player, hand, dealer
 
 class PlayerAction(Enum):
     DOUBLE = 2
@@ -0,0 +1,288 @@
+"""
+A tabular agent that learns to play from ml.env.BlackjackEnv: every-visit Monte Carlo control, acting epsilon-greedily on a dense Q-table.
+
+The Q-table is indexed by (total, soft, pair, upcard, action), the observation with StrategyTable's dimensions plus an action (PlayerAction values, then env.SPLIT). Each Q value is the mean reward of the rounds that took that action in that state, kept as a sum and a count so every update is one np.bincount() over the decisions of all the rounds that finished in a step, whatever the number of tables. A round's reward goes to each of its decisions, split hands included, since the env pays a round rather than a hand.
+
+Two card and later hands of the same total share their STAY and HIT values, since an observation doesn't say which it is, only whether DOUBLE is allowed.
+
+    agent = TabularAgent(VEGAS_STRIP, seed=0)
+    agent.train(BlackjackEnv(4096, VEGAS_STRIP, seed=0), 20_000, reference=strategy.solve_table(VEGAS_STRIP))
+    driver.driver_io(stop, agent.input_provider(bet=10), ...)
+"""
+import os
+from typing import Callable, List, NamedTuple, Optional, Tuple, Union
+from os import PathLike
+
+import numpy as np
+
+from blackjack.core import constants
+from blackjack.core.StrategyTable import PAIRS, SOFTS, TOTALS, UPCARDS, StrategyTable
+from blackjack.core.casino import HouseRules, TableRules, TraditionalRules, compile_rules
+from blackjack.core.io.StrategyInput import StrategyInput
+from blackjack.core.state import PlayerAction
+from blackjack.ml.env import NUM_ACTIONS, SPLIT, BlackjackEnv, Observation
+
+STATE_SHAPE = (TOTALS, SOFTS, PAIRS, UPCARDS)
+NUM_STATES = int(np.prod(STATE_SHAPE))
+Q_SHAPE = STATE_SHAPE + (NUM_ACTIONS,)
+
+# the most decisions a round can take: the split, then every card each hand can take
+MAX_DECISIONS = 1 + 2 * constants.MAX_HAND_LEN
+
+_STAY = PlayerAction.STAY.value
+_HIT = PlayerAction.HIT.value
+_DOUBLE = PlayerAction.DOUBLE.value
+
+# a hand can hit, stay or double from two cards up to 21. a lower total is only ever a pair.
+_TOTALS = range(constants.INITIAL_HAND_LEN * 2, constants.MAX_HAND_VALUE + 1)
+_UPCARDS = range(1, UPCARDS)
+
+class Progress(NamedTuple):
+    steps : int
+    # rounds played in this stretch of training, and their mean winnings in bets, exploring included
+    rounds : int
+    ev : float
+    # how much of the reference strategy the greedy policy plays, over the states it has seen, and weighted by how often it saw them. None without a reference.
+    agreement : Optional[float]
+    weighted_agreement : Optional[float]
+
+class TabularAgent:
+    """
+    See the module docs. Learns for one house: what it can double on is the house's.
+    """
+    def __init__(self, house : HouseRules=TraditionalRules, seed : Optional[int]=None):
+        self.house = house
+        self.rules = compile_rules(house)
+        self.rng = np.random.default_rng(seed)
+        self.sums = np.zeros(Q_SHAPE)
+        self.visits = np.zeros(Q_SHAPE, dtype=np.int64)
+
+    def q_values(self) -> np.ndarray:
+        """
+        The mean reward of every action in every state, -inf where it was never taken.
+
+        Complexity: O(q)
+        """
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(self.visits > 0, self.sums / self.visits, -np.inf)
+
+    def act(self, obs : Observation, epsilon : float=0.0) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        An action for every table: a random legal one with probability epsilon, the best so far otherwise (STAY when there's nothing to go on). Also returns where each decision sits in the Q-table, for learn().
+
+        Complexity: O(n)
+        """
+        states = state_index(obs)
+        legal = legal_actions(obs)
+        q = self.q_values().reshape(NUM_STATES, NUM_ACTIONS)[states]
+        best = np.where(legal, q, -np.inf).argmax(axis=1)
+
+        if epsilon > 0:
+            # a uniformly random legal action: the highest of random scores over the legal ones
+            explore = np.where(legal, self.rng.random(legal.shape), -1).argmax(axis=1)
+            best = np.where(self.rng.random(len(best)) < epsilon, explore, best)
+
+        return best, states * NUM_ACTIONS + best
+
+    def learn(self, decisions : np.ndarray, counts : np.ndarray, rewards : np.ndarray):
+        """
+        Adds the rewards of finished rounds to the Q-table.
+
+        @arg decisions Where each round's decisions sit in the Q-table, from act(), a row per round.
+        @arg counts How many of each row are decisions.
+        @arg rewards Each round's reward.
+
+        Complexity: O(n + q)
+
+        Impure
+        """
+        taken = np.arange(decisions.shape[1]) < np.asarray(counts)[:, np.newaxis]
+        cells = decisions[taken]
+        returns = np.broadcast_to(np.asarray(rewards, dtype=float)[:, np.newaxis], decisions.shape)[taken]
+        self.sums += np.bincount(cells, returns, self.sums.size).reshape(Q_SHAPE)
+        self.visits += np.bincount(cells, minlength=self.visits.size).reshape(Q_SHAPE)
+
+    def train(
+        self,
+        env : BlackjackEnv,
+        steps : int,
+        epsilon : float=0.1,
+        check_every : int=1000,
+        reference : Optional[StrategyTable]=None,
+        report : Optional[Callable[[Progress], None]]=None,
+        checkpoint : Optional[Union[str, PathLike]]=None,
+    ) -> List[Progress]:
+        """
+        Plays `steps` steps of every table of `env` from a reset(), learning from every round that finishes.
+
+        @arg epsilon How often to explore. Call again with less to settle down.
+        @arg check_every Steps between progress reports and checkpoints. Whatever's left over at the end is reported too.
+        @arg reference The strategy progress is measured against, for example analysis.strategy.solve_table(house).
+        @arg report Called with every Progress as it's made.
+        @arg checkpoint Saved to at every report, see save().
+
+        Complexity: O(sn) for s steps and n tables
+
+        Impure
+        """
+        if env.rules != self.rules:
+            raise ValueError(f"the agent learns for {self.rules.house}, the env plays {env.rules.house}")
+        if check_every < 1:
+            raise ValueError(f"can't check every {check_every} steps")
+
+        tables = np.arange(env.num_tables)
+        decisions = np.zeros((env.num_tables, MAX_DECISIONS), dtype=np.int64)
+        counts = np.zeros(env.num_tables, dtype=np.int64)
+        progress = []
+
+        obs = env.reset()
+        since = 0
+        rounds = env.rounds.sum()
+        net = env.net.sum()
+        for step in range(1, steps + 1):
+            actions, cells = self.act(obs, epsilon)
+            decisions[tables, counts] = cells
+            counts += 1
+
+            obs, reward, done, _ = env.step(actions)
+            if done.any():
+                self.learn(decisions[done], counts[done], reward[done])
+                counts[done] = 0
+
+            since += 1
+            if since == check_every or step == steps:
+                played = env.rounds.sum() - rounds
+                won = env.net.sum() - net
+                agreement = self.agreement(reference) if reference is not None else (None, None)
+                progress.append(Progress(step, int(played), won / env.base_bet / played if played else 0.0, *agreement))
+                if report is not None:
+                    report(progress[-1])
+                if checkpoint is not None:
+                    self.save(checkpoint)
+                since = 0
+                rounds = env.rounds.sum()
+                net = env.net.sum()
+
+        return progress
+
+    def _greedy(self, q : np.ndarray, actions : Tuple[int, ...]) -> int:
+        # the best of these actions, STAY when none were taken
+        values = q[list(actions)]
+        if np.all(values == -np.inf):
+            return _STAY
+        return actions[int(values.argmax())]
+
+    def policy_table(self, name : str="") -> StrategyTable:
+        """
+        The greedy policy as a StrategyTable, with the cells compile_table() fills. States never seen stay STAY.
+
+        Complexity: O(q)
+        """
+        q = self.q_values()
+        seen = self.visits.sum(axis=-1) > 0
+        table = StrategyTable(name=name)
+
+        for soft in range(SOFTS):
+            for upcard in _UPCARDS:
+                for total in _TOTALS:
+                    first = (_STAY, _HIT, _DOUBLE) if self.rules.double[total] else (_STAY, _HIT)
+                    if seen[total, soft, 0, upcard]:
+                        table.set(False, soft, 0, upcard, total, PlayerAction(self._greedy(q[total, soft, 0, upcard], first)))
+                        table.set(True, soft, 0, upcard, total, PlayerAction(self._greedy(q[total, soft, 0, upcard], (_STAY, _HIT))))
+
+                    for pair in range(1, PAIRS):
+                        if not seen[total, soft, pair, upcard]:
+                            continue
+                        cell = q[total, soft, pair, upcard]
+                        action = PlayerAction(self._greedy(cell, first))
+                        table.set(False, soft, pair, upcard, total, action, self._greedy(cell, first + (SPLIT,)) == SPLIT)
+                        # A,A and 2,2 are the only two card soft 12 and hard 4, like compile_table()
+                        if not seen[total, soft, 0, upcard]:
+                            table.set(False, soft, 0, upcard, total, action)
+
+        return table
+
+    def agreement(self, reference : StrategyTable) -> Tuple[float, float]:
+        """
+        How much of `reference` policy_table() plays: the fraction of the cells of states seen where both do the same, and the same weighted by how often each state was seen. A pair's cell agrees when both split, or neither does and both play the same.
+
+        Complexity: O(q)
+        """
+        table = self.policy_table()
+        visits = self.visits.sum(axis=-1)
+        cells = agreeing = 0
+        weight = weighted = 0
+
+        for soft in range(SOFTS):
+            for pair in range(PAIRS):
+                for upcard in _UPCARDS:
+                    for total in _TOTALS:
+                        seen = visits[total, soft, pair, upcard]
+                        if not seen:
+                            continue
+                        for later in ((False, True) if pair == 0 else (False,)):
+                            same = table.action(later, soft, pair, upcard, total) == reference.action(later, soft, pair, upcard, total)
+                            if pair:
+                                split = table.split(soft, pair, upcard, total)
+                                same = split == reference.split(soft, pair, upcard, total) and (split or same)
+                            cells += 1
+                            agreeing += same
+                            weight += seen
+                            weighted += seen * same
+
+        if not cells:
+            return 0.0, 0.0
+        return agreeing / cells, weighted / weight
+
+    def input_provider(self, bet : int=constants.MIN_BET, bank : int=100 * constants.MIN_BET) -> StrategyInput:
+        """
+        The greedy policy as an InputProvider, for driver.driver_io or sim.engine. Never takes insurance, like the env.
+
+        Complexity: O(q)
+        """
+        return StrategyInput(self.policy_table(self.house.name if isinstance(self.house, TableRules) else self.house.__name__), bet, bank)
+
+    def save(self, path : Union[str, PathLike]):
+        """
+        The Q-table as an .npz, written next to `path` first and then moved over it, so a checkpoint is never half written.
+
+        Impure
+        """
+        partial = f"{os.fspath(path)}.partial"
+        with open(partial, "wb") as f:
+            np.savez(f, sums=self.sums, visits=self.visits)
+        os.replace(partial, path)
+
+    @staticmethod
+    def load(path : Union[str, PathLike], house : HouseRules=TraditionalRules, seed : Optional[int]=None) -> "TabularAgent":
+        """
+        An agent for `house` that carries on from a save().
+
+        Impure
+        """
+        agent = TabularAgent(house, seed)
+        with np.load(path) as saved:
+            if saved["sums"].shape != Q_SHAPE or saved["visits"].shape != Q_SHAPE:
+                raise ValueError(f"not a Q-table of shape {Q_SHAPE}: {saved['sums'].shape}")
+            agent.sums = saved["sums"]
+            agent.visits = saved["visits"]
+        return agent
+
+def state_index(obs : Observation) -> np.ndarray:
+    """
+    Where each table's state sits in the first four dimensions of the Q-table, flattened.
+
+    Complexity: O(n)
+    """
+    return np.ravel_multi_index((obs.total, obs.soft.astype(np.int64), obs.pair, obs.upcard), STATE_SHAPE)
+
+def legal_actions(obs : Observation) -> np.ndarray:
+    """
+    Which actions each table can take, an (n, NUM_ACTIONS) mask.
+
+    Complexity: O(n)
+    """
+    legal = np.ones((len(obs.total), NUM_ACTIONS), dtype=bool)
+    legal[:, _DOUBLE] = obs.can_double
+    legal[:, SPLIT] = obs.pair > 0
+    return legal
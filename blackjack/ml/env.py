@@ -0,0 +1,338 @@
+"""
+A blackjack environment for training policies: N tables played at once with numpy, reset() and step() like a gym vector env.
+
+Every table plays the rounds sim.engine.play_round() plays, by the same rules (driver.transition_logic and rules.py), with one bet per round and a bank that never runs out. A table always waits on its player: step() takes one action per table, plays it, and a round that ends is settled (sim.dealer, sim.payouts) and the next one dealt straight away. What a decision looks like is an Observation, one array per field.
+
+    env = BlackjackEnv(4096, house=VEGAS_STRIP, seed=0)
+    obs = env.reset()
+    while training:
+        obs, reward, done, passive = env.step(policy(obs))
+
+The stages of a round (state.GameStage) map onto it like this:
+- ASK_BET is always the env's `bet`.
+- ASK_INSURANCE is always declined.
+- ASK_SPLIT is the first decision of a round with a pair, which can be SPLIT on top of the PLAYER_ACTIONS ones.
+- PLAYER_ACTIONS is every decision, in PlayerAction values.
+- PLAYER_DONE and UPDATE_BANK happen inside step() once a table's last hand is done.
+- A round that ends at INIT_DEAL, with a natural or a peeked dealer natural, has nothing to decide. It's settled as it's dealt and its winnings come back as `passive` rather than `reward`, so a round's reward is down to its decisions alone while reward + passive is everything the table won.
+"""
+from typing import Callable, NamedTuple, Optional
+
+import numpy as np
+
+from blackjack.core import cards, constants
+from blackjack.core.casino import HouseRules, TraditionalRules, compile_rules
+from blackjack.core.counting import HI_LO, CountSystem
+from blackjack.core.state import MAX_HANDS, GameStage, PlayerAction
+from blackjack.sim import dealer, payouts
+from blackjack.sim.dealer import HARD_VALUES, IS_ACE
+from blackjack.sim.shoes import make_shoes
+
+# the action on top of PlayerAction, only at ASK_SPLIT
+SPLIT = len(PlayerAction)
+NUM_ACTIONS = SPLIT + 1
+
+_STAY = PlayerAction.STAY.value
+_HIT = PlayerAction.HIT.value
+_DOUBLE = PlayerAction.DOUBLE.value
+
+_RANKS = np.arange(constants.DECK_SIZE) % cards.NUM_RANKS
+
+class Observation(NamedTuple):
+    # the current hand's value, soft total if it's soft
+    total : np.ndarray
+    soft : np.ndarray
+    # the pair's card value (StrategyTable's card_index()) while the table is at ASK_SPLIT, 0 otherwise
+    pair : np.ndarray
+    # the dealer's first card, ace as one
+    upcard : np.ndarray
+    # the running count of every card the player has seen this shoe per deck left, see counting.CountingShoe.true_count()
+    true_count : np.ndarray
+    # whether DOUBLE is allowed: two cards, a value the house doubles on, and not after a split unless the house allows it
+    can_double : np.ndarray
+    # GameStage.ASK_SPLIT or GameStage.PLAYER_ACTIONS, as their values
+    stage : np.ndarray
+
+class StepResult(NamedTuple):
+    observation : Observation
+    # winnings, less the bet, of the round each table finished this step, in bets. 0 where the round goes on.
+    reward : np.ndarray
+    done : np.ndarray
+    # winnings, less the bet, of the rounds settled as they were dealt since, in bets
+    passive : np.ndarray
+
+ShoeSource = Callable[[np.ndarray], np.ndarray]
+
+class BlackjackEnv:
+    """
+    N blackjack tables, each with its own shoe, played one decision per table per step(). See the module docs.
+    """
+    def __init__(self, num_tables : int, house : HouseRules=TraditionalRules, bet : int=2, seed : Optional[int]=None, count : CountSystem=HI_LO, shoes : Optional[ShoeSource]=None):
+        """
+        @arg bet Chips per round. Rewards are in bets, but payouts are floored in chips like the game's, so an odd bet can't be paid 3:2 exactly.
+        @arg seed Anything numpy.random.default_rng() accepts. Seeds every shoe of every table.
+        @arg count What true_count counts.
+        @arg shoes Where new shoes come from: given the tables that need one, an array of encoded shoes in deal order, a row per table (see sim.shoes). sim.shoes.make_shoes() from `seed` when absent.
+        """
+        if num_tables < 1:
+            raise ValueError(f"need at least one table: {num_tables}")
+        if bet < constants.MIN_BET:
+            raise ValueError(f"bet below the minimum of {constants.MIN_BET}: {bet}")
+
+        self.num_tables = num_tables
+        self.house = house
+        self.rules = compile_rules(house)
+        self.base_bet = bet
+        self.count = count
+        self.num_decks = house.num_decks()
+        self.shoe_size = self.num_decks * constants.DECK_SIZE
+        # cards left in the shoe once the cut card is out, the same cut as sim.shoes.ShoeBatch.deck()
+        self.cut = round(self.shoe_size * (1 - house.penetration()))
+
+        if shoes is None:
+            rng = np.random.default_rng(seed)
+            shoes = lambda tables: make_shoes(len(tables), self.num_decks, rng)
+        self._source = shoes
+
+        # CompiledRules as arrays
+        self._double = np.array(self.rules.double)
+        self._weights = np.array([count.weights[card[0]] for card in cards.CARDS], dtype=np.int64)
+
+        n = num_tables
+        self.shoes = np.zeros((n, self.shoe_size), dtype=np.int8)
+        # the next card of every shoe
+        self.positions = np.zeros(n, dtype=np.int64)
+        self.running_count = np.zeros(n, dtype=np.int64)
+        # rounds played by every table since reset(), the ones settled as they were dealt included, and their winnings less the bets in chips
+        self.rounds = np.zeros(n, dtype=np.int64)
+        self.net = np.zeros(n, dtype=np.int64)
+
+        # the player's hands as hard totals and aces, like sim.dealer. column 1 only while split.
+        self.hard = np.zeros((n, MAX_HANDS), dtype=np.int64)
+        self.aces = np.zeros((n, MAX_HANDS), dtype=bool)
+        self.num_cards = np.zeros((n, MAX_HANDS), dtype=np.int64)
+        self.num_hands = np.ones(n, dtype=np.int64)
+        self.current_hand = np.zeros(n, dtype=np.int64)
+        # state.bet, doubled by a split or a double
+        self.bets = np.zeros(n, dtype=np.int64)
+        self.pair = np.zeros(n, dtype=np.int64)
+        # the two cards dealt to the player, which a split parts
+        self.dealt = np.zeros((n, constants.INITIAL_HAND_LEN), dtype=np.int64)
+
+        self.dealer_hard = np.zeros(n, dtype=np.int64)
+        self.dealer_aces = np.zeros(n, dtype=bool)
+        self.upcard = np.zeros(n, dtype=np.int64)
+        self.hole = np.zeros(n, dtype=np.int64)
+
+    def reset(self) -> Observation:
+        """
+        New shoes at every table and a round dealt at each. `rounds` and `net` start over, from the rounds settled as they were dealt.
+
+        Complexity: O(ns) for n tables with shoes of s cards
+
+        Impure
+        """
+        tables = np.arange(self.num_tables)
+        self.rounds[:] = 0
+        self.net[:] = 0
+        self._new_shoes(tables)
+        self._deal(tables)
+        return self.observe()
+
+    def step(self, actions) -> StepResult:
+        """
+        Plays one action at every table: a PlayerAction value, or SPLIT at ASK_SPLIT. Raises ValueError for an action the table can't take, with nothing played.
+
+        Complexity: O(n)
+
+        Impure
+        """
+        actions = np.asarray(actions)
+        if actions.shape != (self.num_tables,):
+            raise ValueError(f"need one action per table: {self.num_tables} tables, actions {actions.shape}")
+
+        tables = np.arange(self.num_tables)
+        current = self.current_hand
+        splitting = actions == SPLIT
+        doubling = actions == _DOUBLE
+        drawing = (actions == _HIT) | doubling
+
+        if not np.all(splitting | drawing | (actions == _STAY)):
+            raise ValueError(f"not an action: {actions[~(splitting | drawing | (actions == _STAY))][0]}")
+        if np.any(splitting & (self.pair == 0)):
+            raise ValueError("can only split a pair, and only as the round's first decision")
+        if np.any(doubling & ~self._can_double(tables, current)):
+            raise ValueError("can't double that hand")
+
+        # ASK_SPLIT, rules.init_split_into(): the first hand keeps the first card and draws, then the second hand gets the other card and draws
+        if splitting.any():
+            split = np.flatnonzero(splitting)
+            first, second = self._draw(split), self._draw(split)
+            for hand, drawn in ((0, first), (1, second)):
+                kept = self.dealt[split, hand]
+                self.hard[split, hand] = HARD_VALUES[kept] + HARD_VALUES[drawn]
+                self.aces[split, hand] = IS_ACE[kept] | IS_ACE[drawn]
+                self.num_cards[split, hand] = constants.INITIAL_HAND_LEN
+            self.num_hands[split] = MAX_HANDS
+            self.bets[split] *= 2
+        # whatever the first decision was, there's no splitting after it
+        self.pair[:] = 0
+
+        # PLAYER_ACTIONS
+        done_hand = (actions == _STAY) | doubling
+        if drawing.any():
+            draw = np.flatnonzero(drawing)
+            hand = current[draw]
+            code = self._draw(draw)
+            self.hard[draw, hand] += HARD_VALUES[code]
+            self.aces[draw, hand] |= IS_ACE[code]
+            self.num_cards[draw, hand] += 1
+            # bust or max
+            done_hand[draw] |= dealer.soft_totals(self.hard[draw, hand], self.aces[draw, hand]) >= constants.MAX_HAND_VALUE
+        self.bets[doubling] *= 2
+        self.current_hand[done_hand] += 1
+
+        done = self.current_hand >= self.num_hands
+        reward = np.zeros(self.num_tables)
+        passive = np.zeros(self.num_tables)
+        if done.any():
+            finished = np.flatnonzero(done)
+            # a round that got this far can't be a natural
+            reward[finished] = self._settle(finished, np.zeros(len(finished), dtype=bool)) / self.base_bet
+            passive = self._deal(finished) / self.base_bet
+
+        return StepResult(self.observe(), reward, done, passive)
+
+    def observe(self) -> Observation:
+        """
+        The decision every table is waiting on.
+
+        Complexity: O(n)
+        """
+        tables = np.arange(self.num_tables)
+        current = self.current_hand
+        hard = self.hard[tables, current]
+        total = dealer.soft_totals(hard, self.aces[tables, current])
+        return Observation(
+            total,
+            total != hard,
+            self.pair.copy(),
+            HARD_VALUES[self.upcard],
+            self.true_count(),
+            self._can_double(tables, current),
+            np.where(self.pair > 0, GameStage.ASK_SPLIT.value, GameStage.PLAYER_ACTIONS.value),
+        )
+
+    def true_count(self) -> np.ndarray:
+        """
+        counting.CountingShoe.true_count() of every shoe, over the cards the player has seen. The dealer's second card is only seen once the dealer plays.
+
+        Complexity: O(n)
+        """
+        decks_left = np.maximum(self.shoe_size - self.positions, constants.DECK_SIZE // 2) / constants.DECK_SIZE
+        return self.running_count / decks_left
+
+    def _can_double(self, tables : np.ndarray, current : np.ndarray) -> np.ndarray:
+        # CompiledRules.can_double() of the current hands, with two cards
+        total = dealer.soft_totals(self.hard[tables, current], self.aces[tables, current])
+        return ((self.num_cards[tables, current] == constants.INITIAL_HAND_LEN) &
+                self._double[np.minimum(total, constants.MAX_HAND_VALUE)] &
+                (self.rules.double_after_split | (self.num_hands[tables] == 1)))
+
+    def _draw(self, tables : np.ndarray, seen : bool=True) -> np.ndarray:
+        # the next card of each table's shoe. deck.pop()
+        positions = self.positions[tables]
+        if np.any(positions >= self.shoe_size):
+            raise ValueError("a table's shoe ran out mid-round, the house's penetration leaves too few cards")
+        codes = self.shoes[tables, positions].astype(np.int64)
+        self.positions[tables] += 1
+        if seen:
+            self.running_count[tables] += self._weights[codes]
+        return codes
+
+    def _new_shoes(self, tables : np.ndarray):
+        shoes = np.asarray(self._source(tables))
+        if shoes.shape != (len(tables), self.shoe_size):
+            raise ValueError(f"need a shoe of {self.shoe_size} cards for each of {len(tables)} tables, got {shoes.shape}")
+        self.shoes[tables] = shoes
+        self.positions[tables] = 0
+        self.running_count[tables] = self.count.initial_count(self.num_decks)
+
+    def _deal(self, tables : np.ndarray) -> np.ndarray:
+        """
+        ASK_BET and INIT_DEAL at these tables, with a new shoe first where the cut card has come out. Rounds that end as they're dealt are settled and dealt again until every table has a decision to make.
+
+        Returns the winnings, less the bets, of the rounds that settled, per table.
+
+        Complexity: O(n)
+
+        Impure
+        """
+        net = np.zeros(self.num_tables, dtype=np.int64)
+        while len(tables):
+            # shuffle between rounds, CompiledRules.shuffle_due(): at the cut card, or sooner if a round could run the shoe dry
+            remaining = self.shoe_size - self.positions[tables]
+            cut = tables[(remaining <= self.cut) | (remaining < constants.MAX_ROUND_LEN)]
+            if len(cut):
+                self._new_shoes(cut)
+
+            # two cards to the player, then two to the dealer, the first one up
+            first, second = self._draw(tables), self._draw(tables)
+            upcard, hole = self._draw(tables), self._draw(tables, seen=False)
+
+            self.dealt[tables, 0] = first
+            self.dealt[tables, 1] = second
+            self.hard[tables, 0] = HARD_VALUES[first] + HARD_VALUES[second]
+            self.aces[tables, 0] = IS_ACE[first] | IS_ACE[second]
+            self.num_cards[tables, 0] = constants.INITIAL_HAND_LEN
+            self.hard[tables, 1] = 0
+            self.aces[tables, 1] = False
+            self.num_cards[tables, 1] = 0
+            self.num_hands[tables] = 1
+            self.current_hand[tables] = 0
+            self.bets[tables] = self.base_bet
+            # rules.can_split() compares ranks, so a ten and a king aren't a pair
+            self.pair[tables] = np.where(_RANKS[first] == _RANKS[second], HARD_VALUES[first], 0)
+
+            self.upcard[tables] = upcard
+            self.hole[tables] = hole
+            self.dealer_hard[tables] = HARD_VALUES[upcard] + HARD_VALUES[hole]
+            self.dealer_aces[tables] = IS_ACE[upcard] | IS_ACE[hole]
+
+            # driver._check_natural: a natural, or the dealer's if it peeks, goes straight to PLAYER_DONE
+            natural = dealer.soft_totals(self.hard[tables, 0], self.aces[tables, 0]) == constants.MAX_HAND_VALUE
+            over = natural.copy()
+            if self.rules.dealer_peeks:
+                over |= dealer.soft_totals(self.dealer_hard[tables], self.dealer_aces[tables]) == constants.MAX_HAND_VALUE
+
+            tables, natural = tables[over], natural[over]
+            if len(tables):
+                net[tables] += self._settle(tables, natural)
+        return net
+
+    def _settle(self, tables : np.ndarray, naturals : np.ndarray) -> np.ndarray:
+        """
+        PLAYER_DONE and UPDATE_BANK at these tables: the dealer plays out, and every round is settled. Returns the winnings less the bets.
+
+        Complexity: O(n)
+
+        Impure
+        """
+        start = self.positions[tables]
+        # the dealers draw straight from self.shoes, a card at a time, rather than from a copy of every row
+        result = dealer.play_dealers(self.dealer_hard[tables], self.dealer_aces[tables], self.shoes, start, self.rules.hit_soft_17, rows=tables)
+        self.positions[tables] = result.positions
+
+        # the hole card turns over, and every card the dealer drew is seen
+        seen = self._weights[self.hole[tables]]
+        for k in range(int(result.drawn.max(initial=0))):
+            drew = k < result.drawn
+            seen += np.where(drew, self._weights[self.shoes[tables, np.minimum(start + k, self.shoe_size - 1)]], 0)
+        self.running_count[tables] += seen
+
+        player = dealer.soft_totals(self.hard[tables], self.aces[tables])
+        bets = self.bets[tables]
+        net = payouts.settle_rounds(player, result.values, naturals, self.num_hands[tables], bets, self.rules.house) - bets
+        self.rounds[tables] += 1
+        self.net[tables] += net
+        return net
@@ -0,0 +1,144 @@
+"""
+Comparing two candidates, a policy and house rules each, with common random numbers: both play every round from the same cards, and what's measured is the difference between them round by round.
+
+Most of the variance of a round is the cards, and paired rounds share them, so the difference has far less variance than either candidate's result. Telling two EVs apart that are a tenth of a percent apart takes millions of rounds played independently and a small fraction of that paired. PairedResult.variance_reduction() says how much smaller for a given comparison.
+
+Shoes come from cards.make_seeded_shoe(), each with its own seed drawn from the one seed of the run, so any shoe of a comparison can be made again on its own.
+"""
+import copy
+import random
+import time
+
+from typing import Callable, Iterable, Iterator, NamedTuple, Optional, Tuple
+
+from blackjack.core import cards
+from blackjack.core.casino import HouseRules, TraditionalRules, compile_rules
+from blackjack.core.io.InputProvider import InputProvider
+from blackjack.core.state import GameState, GameStage
+from blackjack.sim import engine
+from blackjack.sim.stats import RoundStats
+
+class Candidate(NamedTuple):
+    inputs : InputProvider
+    house : HouseRules = TraditionalRules
+
+class PairedResult(NamedTuple):
+    rounds : int
+    a : RoundStats
+    b : RoundStats
+    # a's change in bank minus b's, round by round. per unit of a's bet.
+    diff : RoundStats
+    elapsed : float
+
+    def ev_difference(self) -> float:
+        """
+        EV per unit bet of a minus that of b.
+
+        Complexity: O(1)
+        """
+        return self.diff.ev_per_unit()
+
+    def independent_half_width(self, confidence : float=0.95) -> float:
+        """
+        The half width the difference would have at `confidence` had a and b played this many rounds on shoes of their own.
+
+        Complexity: O(1)
+        """
+        a = self.a.unit_half_width(confidence)
+        b = self.b.unit_half_width(confidence)
+        return (a * a + b * b) ** 0.5
+
+    def variance_reduction(self) -> float:
+        """
+        How many times fewer rounds pairing needs than independent shoes for the same precision.
+
+        Complexity: O(1)
+        """
+        paired = self.diff.unit_half_width()
+        if paired == 0.0:
+            return float("inf")
+        return (self.independent_half_width() / paired) ** 2
+
+def seeded_shoes(seed : Optional[int], num_decks : int, penetration : float) -> Iterator[cards.Shoe]:
+    """
+    Endless shoes from cards.make_seeded_shoe(), each seeded from one master stream.
+
+    Complexity: O(dsr log dsr) per shoe
+    """
+    master = random.Random(seed)
+    while True:
+        yield cards.make_seeded_shoe(master.getrandbits(64), num_decks, penetration)
+
+def _play(state : GameState, candidate : Candidate) -> Tuple[int, int, int]:
+    # one round of a candidate from its own copy of the shoe. returns the change in bank, the bet and the cards it took.
+    before = state.bank
+    remaining = len(state.deck)
+    bet = engine.play_round(state, candidate.inputs)
+    return state.bank - before, bet, remaining - len(state.deck)
+
+def _catch_up(state : GameState, took : int, most : int):
+    # the cards the other candidate took beyond this one's come out of this one's copy too, through its own pop() so a CountingShoe sees them like a player at the same table would
+    pop = state.deck.pop
+    for _ in range(most - took):
+        pop()
+
+def compare(
+    rounds : int,
+    a : Candidate,
+    b : Candidate,
+    seed : Optional[int]=0,
+    shoes : Optional[Iterable[cards.Deck]]=None,
+    stop : Optional[Callable[[RoundStats], bool]]=None,
+    check_every : int=engine.CHECK_EVERY,
+) -> PairedResult:
+    """
+    Plays `rounds` paired rounds of `a` and `b`. Each round both start from the same cards, and the next round starts after the cards of whichever took more, so neither ever sees a card twice. Each plays from its own copy of the shoe, made once per shoe and of the shoe's own type, and the two are brought level after every round. The shoe is replaced when a's house rules say so.
+
+    Both play with engine.UNLIMITED_BANK, so neither's bank ever changes what it can do.
+
+    @arg seed Seeds every shoe of the run. Ignored when `shoes` is given.
+    @arg shoes Where to take each shoe from, like engine.simulate.
+    @arg stop Asked every `check_every` rounds with the stats of the difference, for example a stats.Converged on how well the difference is known. `rounds` is then the most to play.
+
+    Complexity: O(r)
+    """
+    if check_every < 1:
+        raise ValueError(f"can't check every {check_every} rounds")
+    if shoes is None:
+        shoes = seeded_shoes(seed, a.house.num_decks(), a.house.penetration())
+    shoes = iter(shoes)
+
+    shoe = next(shoes, None)
+    a_state = GameState(GameStage.ASK_BET, None, engine.UNLIMITED_BANK, None, None, None, None, compile_rules(a.house))
+    b_state = GameState(GameStage.ASK_BET, None, engine.UNLIMITED_BANK, None, None, None, None, compile_rules(b.house))
+    if shoe is not None:
+        a_state.deck = shoe
+        b_state.deck = copy.copy(shoe)
+    a_stats = RoundStats()
+    b_stats = RoundStats()
+    diff = RoundStats()
+
+    start = time.perf_counter()
+    while shoe is not None and diff.rounds < rounds:
+        a_net, a_bet, a_took = _play(a_state, a)
+        b_net, b_bet, b_took = _play(b_state, b)
+        a_stats.add(a_net, a_bet)
+        b_stats.add(b_net, b_bet)
+        diff.add(a_net - b_net, a_bet)
+
+        most = max(a_took, b_took)
+        _catch_up(a_state, a_took, most)
+        _catch_up(b_state, b_took, most)
+
+        # shuffle between rounds, like engine.simulate
+        if a_state.rules.shuffle_due(a_state) or cards.is_low(a_state.deck):
+            shoe = next(shoes, None)
+            if shoe is not None:
+                a_state.deck = shoe
+                b_state.deck = copy.copy(shoe)
+
+        if stop is not None and diff.rounds % check_every == 0 and stop(diff):
+            break
+    elapsed = time.perf_counter() - start
+
+    return PairedResult(diff.rounds, a_stats, b_stats, diff, elapsed)
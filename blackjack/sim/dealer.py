@@ -0,0 +1,106 @@
+"""
+Playing out many dealer hands at once: rules.dealer_play() for a whole batch, with numpy.
+
+A dealer hand is its hard total (aces as one) and whether it holds an ace, which is all rules.dealer_play() can see (like analysis.dealer_odds). Every dealer draws from its own row of a batch of encoded shoes in deal order (see sim.shoes), starting at its own position, and every dealer still drawing takes its next card in the same step. That's at most a dozen steps whatever the size of the batch, since no dealer hand goes past constants.MAX_HAND_LEN cards.
+
+    hard, aces = dealer.hand_state(codes[:, :2])
+    result = dealer.play_dealers(hard, aces, codes, 2, house.allow_dealer_hit_soft_17())
+"""
+from typing import NamedTuple, Optional, Tuple, Union
+
+import numpy as np
+
+from blackjack.core import cards, constants
+from blackjack.core.exception.StupidProgrammerException import StupidProgrammerException
+from blackjack.core.rules import SOFT_ACE_BONUS
+
+# hard value of every encoded card, ace as one
+HARD_VALUES = np.array([1 if code % cards.NUM_RANKS == 0 else cards.CARD_VALUES[code] for code in range(constants.DECK_SIZE)], dtype=np.int64)
+IS_ACE = np.array([code % cards.NUM_RANKS == 0 for code in range(constants.DECK_SIZE)])
+
+class DealerResult(NamedTuple):
+    # final hand value per dealer, busts included
+    values : np.ndarray
+    hard : np.ndarray
+    aces : np.ndarray
+    # where each dealer's shoe is up to now
+    positions : np.ndarray
+    # cards each dealer drew
+    drawn : np.ndarray
+
+def soft_totals(hard : np.ndarray, aces : np.ndarray) -> np.ndarray:
+    """
+    rules.soft_total() of every hand.
+
+    Complexity: O(n)
+    """
+    return np.where(aces & (hard + SOFT_ACE_BONUS <= constants.MAX_HAND_VALUE), hard + SOFT_ACE_BONUS, hard)
+
+def hand_state(codes : np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    The hard total and whether there's an ace, for every row of an (n, k) array of encoded cards.
+
+    Complexity: O(nk)
+    """
+    codes = np.asarray(codes)
+    return HARD_VALUES[codes].sum(axis=1), IS_ACE[codes].any(axis=1)
+
+def _hitting(values : np.ndarray, hard : np.ndarray, aces : np.ndarray, hit_soft_17 : bool) -> np.ndarray:
+    # rules.dealer_hits(). soft 17 is a 17 that's ace-as-eleven, so its hard total is 7
+    hits = values < constants.DEALER_STOP
+    if hit_soft_17:
+        hits |= (values == constants.DEALER_STOP) & aces & (hard + SOFT_ACE_BONUS == constants.DEALER_STOP)
+    return hits
+
+def play_dealers(hard : np.ndarray, aces : np.ndarray, shoes : np.ndarray, positions : Union[np.ndarray, int], hit_soft_17 : bool=False, rows : Optional[np.ndarray]=None) -> DealerResult:
+    """
+    rules.dealer_play() for every dealer at once. Dealer i draws from shoes[i] starting at positions[i], or from shoes[rows[i]] given `rows`.
+
+    @arg hard The hard total of every dealer's starting hand.
+    @arg aces Whether every dealer's starting hand holds an ace.
+    @arg shoes An (n, m) array of encoded cards in deal order, one row per dealer. Any number of rows given `rows`.
+    @arg positions The next card to draw from each row, or one position for all of them.
+    @arg hit_soft_17 H17 when True, see HouseRules.allow_dealer_hit_soft_17().
+    @arg rows Which row of `shoes` each dealer draws from, so a few dealers can play from a big batch without gathering their rows first. Only the cards drawn are read.
+
+    Complexity: O(n) per card drawn by the longest hand
+
+    Pure. The arguments are copied, not drawn from.
+    """
+    shoes = np.asarray(shoes)
+    hard = np.array(hard, dtype=np.int64)
+    aces = np.array(aces, dtype=bool)
+    n = len(hard)
+    positions = np.array(np.broadcast_to(positions, (n,)), dtype=np.int64)
+    if rows is None:
+        if shoes.ndim == 2 and shoes.shape[0] != n:
+            raise ValueError(f"need one shoe row per dealer: {n} dealers, shoes {shoes.shape}")
+        rows = np.arange(n)
+    rows = np.asarray(rows)
+    if shoes.ndim != 2 or rows.shape != (n,) or aces.shape != (n,) or np.any(rows >= shoes.shape[0]):
+        raise ValueError(f"need one shoe row and one ace flag per dealer: {n} dealers, shoes {shoes.shape}, rows {rows.shape}, aces {aces.shape}")
+    drawn = np.zeros(n, dtype=np.int64)
+
+    values = soft_totals(hard, aces)
+    hitting = np.flatnonzero(_hitting(values, hard, aces, hit_soft_17))
+    steps = 0
+    while len(hitting):
+        steps += 1
+        if steps > constants.MAX_HAND_LEN:
+            raise StupidProgrammerException("somehow the dealers keep taking cards. infinite loop prevented.")
+
+        taking = positions[hitting]
+        if np.any(taking >= shoes.shape[1]):
+            raise ValueError("a dealer needs a card but its shoe is empty")
+        codes = shoes[rows[hitting], taking]
+
+        hard[hitting] += HARD_VALUES[codes]
+        aces[hitting] |= IS_ACE[codes]
+        positions[hitting] += 1
+        drawn[hitting] += 1
+
+        values[hitting] = soft_totals(hard[hitting], aces[hitting])
+        # only dealers that were still hitting can still be
+        hitting = hitting[_hitting(values[hitting], hard[hitting], aces[hitting], hit_soft_17)]
+
+    return DealerResult(values, hard, aces, positions, drawn)
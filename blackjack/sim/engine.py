@@ -0,0 +1,359 @@
+"""
+Headless play: the rounds of driver.transition_logic with no prompts, no parsing and no output, for as many rounds as asked.
+
+play_round() is the whole state machine from ASK_BET to COMPLETE as straight-line code. Stepping through transition_logic stage by stage costs more than the decisions themselves, and nothing watches the intermediate stages here. The tests hold the two to the same results.
+"""
+import random
+import time
+
+from typing import Callable, Iterable, Iterator, NamedTuple, Optional
+
+from blackjack.core import cards, constants, counting, rules
+from blackjack.core.PayoutOdds import PayoutOdds
+from blackjack.core.casino import HouseRules, TraditionalRules, compile_rules
+from blackjack.core.counting import CountSystem
+from blackjack.core.exception.StupidProgrammerException import StupidProgrammerException
+from blackjack.core.history import HandHistoryWriter
+from blackjack.core.shuffle import ShufflePolicy
+from blackjack.core.io.InputProvider import InputProvider
+from blackjack.core.state import GameState, GameStage, PlayerAction
+from blackjack.sim.shoes import ShoeBatch
+from blackjack.sim.stats import RoundStats
+
+# the default bank. big enough that no realistic run can't afford a double or split because of an earlier losing streak, which would bias the result.
+UNLIMITED_BANK = 10 ** 15
+
+class SimResult(NamedTuple):
+    rounds : int
+    # sum of the bets placed at ASK_BET. doubles, splits and insurance aren't included so EV is per initial bet like a chart's.
+    wagered : int
+    # change in bank over every round
+    net : int
+    # lowest and highest bank relative to the start, checked between rounds
+    low : int
+    high : int
+    # wall time of the rounds themselves, in seconds
+    elapsed : float
+
+    def ev_per_round(self) -> float:
+        return self.net / self.rounds if self.rounds else 0.0
+
+    def ev_per_unit(self) -> float:
+        return self.net / self.wagered if self.wagered else 0.0
+
+    def rounds_per_second(self) -> float:
+        return self.rounds / self.elapsed if self.elapsed else 0.0
+
+    def then(self, other : "SimResult") -> "SimResult":
+        """
+        The result of playing `other`'s rounds straight after these, as one run.
+
+        Complexity: O(1)
+        """
+        return SimResult(
+            self.rounds + other.rounds,
+            self.wagered + other.wagered,
+            self.net + other.net,
+            # other's extremes are relative to where it started, which is where this run ended
+            min(self.low, self.net + other.low),
+            max(self.high, self.net + other.high),
+            self.elapsed + other.elapsed,
+        )
+
+# rounds between asking a stop criterion whether to stop. asking is cheap, but there's no point asking after every round.
+CHECK_EVERY = 10_000
+
+# shoes made per sim.shoes.ShoeBatch. tens of thousands of rounds with a six deck shoe.
+_SHOE_BATCH = 1024
+
+def _batched_shoes(rseed : random.Random, num_decks : int, penetration : float) -> Iterator[cards.Deck]:
+    # endless. each batch gets its own seed from rseed so the whole sequence follows from one seed.
+    while True:
+        yield from ShoeBatch(_SHOE_BATCH, num_decks, rseed.getrandbits(64), penetration)
+
+# what play_round() uses to keep a ValuedHand's counts itself instead of a call to ValuedHand.append() or value() per card. the hard value of every card, where only an ace is one.
+_CARD_HARD = {card : rules.ValuedHand((card,)).hard for card in cards.CARDS}
+_ACE_HARD = _CARD_HARD[cards.CARDS[0]]
+_SOFT_ACE_BONUS = rules.SOFT_ACE_BONUS
+# the highest hard total an ace can still count as eleven on
+_SOFT_MAX = constants.MAX_HAND_VALUE - rules.SOFT_ACE_BONUS
+_list_append = list.append
+_list_extend = list.extend
+
+# the Enum members a round compares against, looked up once. on python 3.11 EnumType has a __getattr__, which puts every PlayerAction.HIT on a slow path that costs more than the comparison it's for. this was the biggest single cost in a round.
+_HIT = PlayerAction.HIT
+_STAY = PlayerAction.STAY
+_DOUBLE = PlayerAction.DOUBLE
+_ONE_ONE = PayoutOdds.ONE_ONE
+_THREE_TWO = PayoutOdds.THREE_TWO
+_ASK_BET = GameStage.ASK_BET
+
+def _settle(value : int, dealer_value : int, bet : int, win_odds : PayoutOdds, house : HouseRules) -> int:
+    # rules.bet_hand() on hand values the caller already has
+    player_bust = value > constants.MAX_HAND_VALUE
+    dealer_bust = dealer_value > constants.MAX_HAND_VALUE
+
+    if player_bust:
+        # both busting is a push
+        return bet if dealer_bust else 0
+    if dealer_bust or value > dealer_value:
+        return bet + house.win_payout(win_odds, bet)
+    if value == dealer_value:
+        return bet
+    return 0
+
+def play_round(state : GameState, inputs : InputProvider, house : Optional[HouseRules]=None, history : Optional[HandHistoryWriter]=None) -> int:
+    """
+    Plays one round from ASK_BET to COMPLETE and returns the bet placed at ASK_BET. Identical in effect to calling driver.transition_logic() until the stage returns to ASK_BET with NullOutput as the output provider, reader and writer as None, history included.
+
+    @arg house Plays by these rules from now on, by setting state.rules. state.rules as it is when absent.
+
+    Complexity: O(n) for cards dealt
+
+    Impure
+    """
+    if house is not None:
+        state.rules = compile_rules(house)
+    table = state.rules
+
+    if history is not None:
+        inputs = history.recording(inputs)
+        history.begin_round(state)
+
+    # ASK_BET
+    bet = state.bet = inputs.input_bet(state, None, None)
+    state.bank -= bet
+
+    # INIT_DEAL. the same two pops per hand as rules.init_hand(), in the same order, into the state's own hands. the cards go in with list.extend and the counts are kept here, which is what ValuedHand.append() would do one call per card.
+    deck = state.deck
+    pop = deck.pop
+    hands, player, dealer = state.fresh_deal()
+    first = pop()
+    second = pop()
+    up = pop()
+    hole = pop()
+    _list_extend(player, (first, second))
+    _list_extend(dealer, (up, hole))
+    first_hard = _CARD_HARD[first]
+    second_hard = _CARD_HARD[second]
+    up_hard = _CARD_HARD[up]
+    hole_hard = _CARD_HARD[hole]
+    player_hard = player.hard = first_hard + second_hard
+    player.aces = (first_hard == _ACE_HARD) + (second_hard == _ACE_HARD)
+    dealer_hard = dealer.hard = up_hard + hole_hard
+    dealer_aces = dealer.aces = (up_hard == _ACE_HARD) + (hole_hard == _ACE_HARD)
+    _list_append(hands, player)
+    state.player = hands
+    state.current_hand = 0
+    state.dealer = dealer
+    # counting.hide_hole_card(), asking what the deck is once for the round
+    counted = isinstance(deck, counting.CountingShoe)
+    if counted:
+        deck.hide(hole)
+
+    # ASK_INSURANCE
+    if (up_hard == _ACE_HARD and
+        table.insurance and
+        0 <= state.bank - (side_bet := rules.insurance_make_side_bet(state.bet, table)) and
+        inputs.input_want_insurance(state, None, None)):
+
+        state.bank -= side_bet
+        insurance_success, win_payout = rules.insure(dealer, side_bet, table)
+        if insurance_success:
+            state.bank += win_payout
+
+    # two cards make 21 only as an ace and a ten, which is a hard 11 with an ace in it
+    natural = player_hard == _SOFT_MAX and player.aces > 0
+    if natural or (table.dealer_peeks and dealer_hard == _SOFT_MAX and dealer_aces > 0):
+        # straight to PLAYER_DONE, for a natural of either side if the dealer peeks. see driver._check_natural
+        state.current_hand = 1
+
+    else:
+        # ASK_SPLIT
+        # rules.can_split(), comparing the ranks themselves rather than their ords
+        if (first[0] is second[0] and
+            state.bank - state.bet >= 0 and
+            inputs.input_want_split(state, None, None)):
+
+            split_hand = state.fresh_hand(1)
+            rules.init_split_into(player, split_hand, deck)
+            _list_append(hands, split_hand)
+            state.bank -= state.bet
+            state.bet *= 2
+
+        # PLAYER_ACTIONS
+        current = 0
+        while current < len(hands):
+            hand = hands[current]
+            hand_completed = False
+
+            hard = hand.hard
+            if (len(hand) == constants.INITIAL_HAND_LEN and
+                state.bank - state.bet >= 0 and
+                # hand.value() without the call
+                table.double[hard + _SOFT_ACE_BONUS if hand.aces and hard <= _SOFT_MAX else hard] and
+                (table.double_after_split or len(hands) == 1)):
+                hit_stay_double = inputs.input_hit_stay_double(state, None, None)
+                if hit_stay_double is _DOUBLE:
+                    state.bank -= state.bet
+                    state.bet *= 2
+                    hand_completed = True
+            else:
+                hit_stay_double = inputs.input_hit(state, None, None)
+
+            if hit_stay_double is _HIT or hit_stay_double is _DOUBLE:
+                card = pop()
+                _list_append(hand, card)
+                card_hard = _CARD_HARD[card]
+                hard = hand.hard = hard + card_hard
+                if card_hard == _ACE_HARD:
+                    hand.aces += 1
+                if hard >= constants.MAX_HAND_VALUE or (hard == _SOFT_MAX and hand.aces):
+                    # bust or max
+                    hand_completed = True
+
+            elif hit_stay_double is _STAY:
+                hand_completed = True
+
+            else:
+                raise StupidProgrammerException("missed hit/stay/double implementation")
+
+            if hand_completed:
+                current = state.current_hand = current + 1
+
+    # PLAYER_DONE. rules.dealer_play() on the running totals, bounded the same way. nothing reads the dealer's hand until it's done so the counts go back in once at the end.
+    if counted:
+        deck.reveal()
+    hit_soft_17 = table.hit_soft_17
+    while True:
+        soft = dealer_aces and dealer_hard <= _SOFT_MAX
+        dealer_value = dealer_hard + _SOFT_ACE_BONUS if soft else dealer_hard
+        if dealer_value >= constants.DEALER_STOP and not (soft and hit_soft_17 and dealer_value == constants.DEALER_STOP):
+            break
+        if len(dealer) >= constants.MAX_HAND_LEN:
+            raise StupidProgrammerException("somehow the dealer keeps taking cards. infinite loop prevented.")
+        card = pop()
+        _list_append(dealer, card)
+        card_hard = _CARD_HARD[card]
+        dealer_hard += card_hard
+        if card_hard == _ACE_HARD:
+            dealer_aces += 1
+    dealer.hard = dealer_hard
+    dealer.aces = dealer_aces
+
+    # UPDATE_BANK
+    if len(hands) == 1:
+        # _settle() inlined for the hand almost every round ends with. a natural is only possible here, and only pays 3:2 here.
+        hard = player.hard
+        value = hard + _SOFT_ACE_BONUS if player.aces and hard <= _SOFT_MAX else hard
+        bet_total = state.bet
+        if value > constants.MAX_HAND_VALUE:
+            # both busting is a push
+            if dealer_value > constants.MAX_HAND_VALUE:
+                state.bank += bet_total
+        elif dealer_value > constants.MAX_HAND_VALUE or value > dealer_value:
+            state.bank += bet_total + table.win_payout(_THREE_TWO if natural else _ONE_ONE, bet_total)
+        elif value == dealer_value:
+            state.bank += bet_total
+    else:
+        # same split of the bet as rules.winnings()
+        bet_splice = round(state.bet / len(hands))
+        for hand in hands:
+            state.bank += _settle(hand.value(), dealer_value, bet_splice, _ONE_ONE, table)
+
+    if history is not None:
+        history.end_round(state)
+
+    # COMPLETE. state.reset() inlined
+    state.stage = _ASK_BET
+    state.bet = state.player = state.current_hand = state.dealer = None
+
+    return bet
+
+def simulate(
+    rounds : int,
+    inputs : InputProvider,
+    house : HouseRules=TraditionalRules,
+    seed : Optional[int]=0,
+    bank : int=UNLIMITED_BANK,
+    shoes : Optional[Iterable[cards.Deck]]=None,
+    count : Optional[CountSystem]=None,
+    history : Optional[HandHistoryWriter]=None,
+    stats : Optional[RoundStats]=None,
+    stop : Optional[Callable[[RoundStats], bool]]=None,
+    check_every : int=CHECK_EVERY,
+    shuffle : Optional[ShufflePolicy]=None,
+) -> SimResult:
+    """
+    Plays `rounds` rounds with decisions from `inputs` and no output, starting a new shoe whenever house.shuffle_pred() says so. Stops early if the bank can no longer cover the minimum bet, if `shoes` runs out, or if `stop` says so.
+
+    @arg inputs The policy. reader and writer are passed as None, so it mustn't use them.
+    @arg seed Seeds every shoe of the run. Equal seeds and policies give equal results. Ignored when `shoes` is given.
+    @arg shoes Where to take each shoe from, like driver.driver_io. By default they come from sim.shoes in batches, because shuffling one card at a time with random.shuffle costs more than playing the rounds.
+    @arg count Keeps this count in every shoe (see counting.CountingShoe) for policies that read it from state.deck.
+    @arg history Logs every round to this hand history. Flushed at the end of the run, but left open.
+    @arg stats Adds every round to these stats. A fresh RoundStats when absent and there's a `stop`.
+    @arg stop Asked every `check_every` rounds with the stats so far, for example a stats.Converged. `rounds` is then the most to play.
+    @arg shuffle When to start a new shoe, see core.shuffle. The house's shuffle_pred() when absent, through its CompiledRules.
+
+    Complexity: O(r)
+    """
+    if check_every < 1:
+        raise ValueError(f"can't check every {check_every} rounds")
+    if stats is None and stop is not None:
+        stats = RoundStats()
+
+    if shoes is None:
+        shoes = _batched_shoes(random.Random(seed), house.num_decks(), house.penetration())
+    if count is not None:
+        shoes = counting.counted(shoes, count)
+    shoes = iter(shoes)
+
+    state = GameState(GameStage.ASK_BET, next(shoes, None), bank, None, None, None, None, compile_rules(house))
+
+    # whether it's the cut card that decides, which is most runs and is cheap enough to check here rather than through two calls a round
+    cut_card = shuffle is None and state.rules.shuffle_pred is None
+
+    completed = 0
+    wagered = 0
+    low = high = 0
+    # rounds since the last shuffle
+    since = 0
+
+    start = time.perf_counter()
+    while state.deck is not None and completed < rounds and state.bank >= constants.MIN_BET:
+        before = state.bank
+        bet = play_round(state, inputs, None, history)
+        wagered += bet
+        completed += 1
+
+        relative = state.bank - bank
+        if relative < low:
+            low = relative
+        elif relative > high:
+            high = relative
+
+        # shuffle between rounds, like driver_io
+        since += 1
+        deck = state.deck
+        if cut_card:
+            # CompiledRules.shuffle_due() inlined, which checks cards.is_low() too
+            left = len(deck)
+            due = left <= deck.cut or left < constants.MAX_ROUND_LEN
+        else:
+            due = (state.rules.shuffle_due(state) if shuffle is None else shuffle.due(state, since)) or cards.is_low(deck)
+        if due:
+            state.deck = next(shoes, None)
+            since = 0
+
+        if stats is not None:
+            stats.add(state.bank - before, bet)
+            if stop is not None and completed % check_every == 0 and stop(stats):
+                break
+
+    elapsed = time.perf_counter() - start
+
+    if history is not None:
+        history.flush()
+
+    return SimResult(completed, wagered, state.bank - bank, low, high, elapsed)
@@ -0,0 +1,142 @@
+"""
+sim.engine across processes.
+
+The rounds are cut into chunks of a fixed size, and chunk i always gets the i-th seed drawn from the master seed, whichever process plays it. Results are combined in chunk order, so a seed gives the same result with one worker or sixty four.
+
+A stop criterion is asked after each chunk is combined, in chunk order, and never inside a chunk. Where a run stops then depends only on the seed and chunk size too.
+"""
+import os
+import random
+import time
+
+from collections import deque
+from contextlib import nullcontext
+from itertools import islice
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Callable, Iterator, List, NamedTuple, Optional, Tuple
+
+from blackjack.core.casino import HouseRules, TraditionalRules
+from blackjack.core.io.InputProvider import InputProvider
+from blackjack.sim import engine
+from blackjack.sim.engine import SimResult
+from blackjack.sim.stats import RoundStats
+
+# chunks in flight per worker. enough that a worker never waits for its next chunk, few enough that stopping early wastes little.
+_AHEAD = 2
+
+# rounds per chunk. big enough that sending a chunk to a process is nothing next to playing it, small enough to keep every process busy near the end.
+CHUNK_ROUNDS = 50_000
+
+class ParallelResult(NamedTuple):
+    # every chunk combined in order. elapsed is the wall time of the whole run.
+    result : SimResult
+    workers : int
+    chunks : int
+    # sum of the time each chunk spent playing, in seconds
+    busy : float
+    # every chunk's stats combined in order
+    stats : RoundStats
+
+    def concurrency(self) -> float:
+        """
+        How many chunks were playing at once on average. Only says the workers were kept busy: with more workers than cores they're busy taking turns.
+        """
+        return self.busy / self.result.elapsed if self.result.elapsed else 0.0
+
+    def efficiency(self, single : float) -> float:
+        """
+        Scaling efficiency against `single`, the rounds per second of one worker. 1.0 is perfect scaling. Start-up, pickling, idle workers at the end and too few cores all bring it down.
+        """
+        return self.result.rounds_per_second() / (self.workers * single)
+
+def chunk_seeds(seed : Optional[int], count : int) -> List[int]:
+    """
+    The seeds of the first `count` chunks. One master stream gives every chunk its own independent, reproducible seed.
+
+    Complexity: O(n)
+    """
+    master = random.Random(seed)
+    return [master.getrandbits(64) for _ in range(count)]
+
+def chunk_sizes(rounds : int, chunk_rounds : int=CHUNK_ROUNDS) -> List[int]:
+    """
+    Splits `rounds` into chunks of `chunk_rounds`, the last one taking whatever is left.
+
+    Complexity: O(n)
+    """
+    if chunk_rounds < 1:
+        raise ValueError(f"chunks need at least one round: {chunk_rounds}")
+    full, rest = divmod(rounds, chunk_rounds)
+    return [chunk_rounds] * full + ([rest] if rest else [])
+
+def _play_chunk(args : Tuple[int, InputProvider, HouseRules, int]) -> Tuple[SimResult, RoundStats]:
+    # top level so that it pickles
+    rounds, inputs, house, seed = args
+    stats = RoundStats()
+    return engine.simulate(rounds, inputs, house, seed, stats=stats), stats
+
+def _in_order(pool : Executor, jobs : List[Tuple], ahead : int) -> Iterator[Tuple[SimResult, RoundStats]]:
+    # like pool.map(), but only `ahead` chunks are ever submitted and not yet handed back, so a caller that stops early doesn't leave the whole run queued
+    jobs = iter(jobs)
+    pending = deque(pool.submit(_play_chunk, job) for job in islice(jobs, ahead))
+    try:
+        while pending:
+            result = pending.popleft().result()
+            job = next(jobs, None)
+            if job is not None:
+                pending.append(pool.submit(_play_chunk, job))
+            yield result
+    finally:
+        for future in pending:
+            future.cancel()
+
+def simulate_parallel(
+    rounds : int,
+    inputs : InputProvider,
+    house : HouseRules=TraditionalRules,
+    seed : Optional[int]=0,
+    workers : Optional[int]=None,
+    chunk_rounds : int=CHUNK_ROUNDS,
+    stop : Optional[Callable[[RoundStats], bool]]=None,
+) -> ParallelResult:
+    """
+    Plays `rounds` rounds like engine.simulate(), spread over a pool of processes.
+
+    Each chunk starts with engine.UNLIMITED_BANK, since a bank that can run out makes every round depend on all the rounds before it and that can't be split up.
+
+    @arg inputs The policy, copied into every process. It must pickle, and any state it keeps is per chunk.
+    @arg workers Processes to use. Defaults to every core. With one worker everything happens in this process.
+    @arg chunk_rounds Part of the result: the same seed with a different chunk size plays different shoes.
+    @arg stop Asked after each chunk with the stats of every chunk so far, for example a stats.Converged. `rounds` is then the most to play.
+
+    Complexity: O(r / w)
+    """
+    workers = (os.cpu_count() or 1) if workers is None else workers
+    if workers < 1:
+        raise ValueError(f"need at least one worker: {workers}")
+
+    sizes = chunk_sizes(rounds, chunk_rounds)
+    jobs = [(size, inputs, house, chunk_seed) for size, chunk_seed in zip(sizes, chunk_seeds(seed, len(sizes)))]
+
+    combined = SimResult(0, 0, 0, 0, 0, 0.0)
+    stats = RoundStats()
+    chunks = 0
+    busy = 0.0
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) if workers > 1 else nullcontext() as pool:
+        # with one worker everything happens in this process, lazily so that stopping early stops playing
+        results = map(_play_chunk, jobs) if pool is None else _in_order(pool, jobs, workers * _AHEAD)
+        for result, chunk_stats in results:
+            combined = combined.then(result)
+            stats = stats.then(chunk_stats)
+            chunks += 1
+            busy += result.elapsed
+            if stop is not None and stop(stats):
+                break
+        if pool is not None:
+            # cancels the chunks still queued now, rather than whenever the generator gets collected
+            results.close()
+    wall = time.perf_counter() - start
+
+    return ParallelResult(combined._replace(elapsed=wall), workers, chunks, busy, stats)
@@ -0,0 +1,104 @@
+"""
+Settling whole batches of rounds at once: what rules.bet_hand(), rules.winnings() and HouseRules.win_payout() do for one hand, done for arrays of them with numpy.
+
+Everything works on hand values rather than hands, like engine._settle(), and in int64 chips. Payouts come from house.payout_ratio() as integers and are floored with integer division, so 3:2 and 6:5 are exact where a float would round. A house that overrides win_payout() without payout_ratio() settles differently here than in the game.
+
+Round by round this is driver.transition_logic's UPDATE_BANK:
+
+    bank_change = payouts.settle_rounds(player_totals, dealer_totals, naturals, num_hands, bets)
+"""
+from typing import Union
+
+import numpy as np
+
+from blackjack.core import constants
+from blackjack.core.casino import HouseRules, TraditionalRules
+from blackjack.core.PayoutOdds import PayoutOdds
+from blackjack.core.state import MAX_HANDS
+
+ArrayLike = Union[np.ndarray, int, list]
+
+def _chips(values : ArrayLike) -> np.ndarray:
+    return np.asarray(values, dtype=np.int64)
+
+def win_payouts(odds : PayoutOdds, bets : ArrayLike, house : HouseRules=TraditionalRules) -> np.ndarray:
+    """
+    house.win_payout() of every bet.
+
+    Complexity: O(n)
+    """
+    bets = _chips(bets)
+    if np.any(bets < 0):
+        raise ValueError(f"negative bet in payouts.win_payouts(): {bets[bets < 0][0]}")
+    numerator, denominator = house.payout_ratio(odds)
+    return bets * numerator // denominator
+
+def settle_hands(player : ArrayLike, dealer : ArrayLike, bets : ArrayLike, win_odds : PayoutOdds=PayoutOdds.ONE_ONE, house : HouseRules=TraditionalRules) -> np.ndarray:
+    """
+    rules.bet_hand() of hands with values `player` against dealer hands with values `dealer`, broadcast together. Like bet_hand() this is what comes back to the bank, the bet included.
+
+    Complexity: O(n)
+    """
+    player, dealer, bets = np.broadcast_arrays(_chips(player), _chips(dealer), _chips(bets))
+    player_bust = player > constants.MAX_HAND_VALUE
+    dealer_bust = dealer > constants.MAX_HAND_VALUE
+
+    # both busting is a push, so the player busting alone is the only bust that loses
+    win = ~player_bust & (dealer_bust | (player > dealer))
+    push = (player_bust & dealer_bust) | (~player_bust & ~dealer_bust & (player == dealer))
+
+    return np.where(win, bets + win_payouts(win_odds, bets, house), np.where(push, bets, 0))
+
+def split_bets(bets : ArrayLike, num_hands : ArrayLike) -> np.ndarray:
+    """
+    The bet each hand plays for, the round(bet / len(hands)) of rules.winnings(). round() goes to even on a half, and so does this, in integers.
+
+    Complexity: O(n)
+    """
+    bets, num_hands = np.broadcast_arrays(_chips(bets), _chips(num_hands))
+    if np.any(num_hands < 1):
+        raise ValueError("every round needs at least one hand")
+    quotient, remainder = np.divmod(bets, num_hands)
+    twice = 2 * remainder
+    return quotient + ((twice > num_hands) | ((twice == num_hands) & (quotient % 2 == 1)))
+
+def settle_rounds(player : ArrayLike, dealer : ArrayLike, naturals : ArrayLike, num_hands : ArrayLike, bets : ArrayLike, house : HouseRules=TraditionalRules) -> np.ndarray:
+    """
+    What UPDATE_BANK adds to the bank for every round. A round with one hand settles at the natural payout if it's flagged as a natural and even money otherwise. A round with more splits its bet over its hands (see split_bets()) and every hand settles at even money, natural flag or not.
+
+    @arg player Hand values, one row per round and a column per hand: shape (rounds, MAX_HANDS) or narrower. Columns past a round's num_hands are ignored. A 1-d array is one hand per round.
+    @arg dealer The dealer's final hand value per round.
+    @arg naturals Whether the first hand is a natural (rules.is_natural()), per round.
+    @arg num_hands How many hands each round ended with.
+    @arg bets The bet each round placed, doubled by a split or a double like state.bet.
+
+    Complexity: O(n)
+    """
+    player = _chips(player)
+    if player.ndim == 1:
+        player = player[:, np.newaxis]
+    rounds, columns = player.shape
+    if columns > MAX_HANDS:
+        raise ValueError(f"at most {MAX_HANDS} hands per round, not {columns}")
+
+    dealer = np.broadcast_to(_chips(dealer), (rounds,))
+    naturals = np.broadcast_to(np.asarray(naturals, dtype=bool), (rounds,))
+    num_hands = np.broadcast_to(_chips(num_hands), (rounds,))
+    bets = np.broadcast_to(_chips(bets), (rounds,))
+    if np.any(num_hands > columns):
+        raise ValueError(f"a round has more hands than the {columns} columns of player")
+
+    single = num_hands == 1
+    total = np.where(
+        single & naturals,
+        settle_hands(player[:, 0], dealer, bets, PayoutOdds.THREE_TWO, house),
+        0,
+    )
+
+    spliced = split_bets(bets, num_hands)
+    for i in range(columns):
+        # hands past the round's count settle to nothing, and a single natural was settled above
+        playing = (i < num_hands) & ~(single & naturals)
+        total += np.where(playing, settle_hands(player[:, i], dealer, spliced, PayoutOdds.ONE_ONE, house), 0)
+
+    return total
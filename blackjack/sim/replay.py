@@ -0,0 +1,159 @@
+"""
+Replaying a hand history: every recorded round is played again from the same cards with the same decisions, and what comes out is checked against the record. A round that plays out differently means the game has changed since it was recorded, which makes a log a regression test for the rules and a way to reproduce any round in it.
+
+The cards come from the record itself. A round takes its cards off the shoe in a fixed order (see dealt_order()), so the hands it ended with say exactly what order the shoe was in. When the record has a seed its shoe is made again instead (see cards.make_seeded_shoe), which also catches a round that now takes more cards than it did.
+
+    result = replay.replay_file("session.bjhh")
+    assert not result.mismatched, result.mismatches[0]
+"""
+import time
+
+from os import PathLike
+from typing import Iterable, List, NamedTuple, Optional, Union
+
+from blackjack.core import cards, driver, history
+from blackjack.core.cards import Card, Deck, Shoe
+from blackjack.core.casino import HouseRules, TraditionalRules, compile_rules
+from blackjack.core.history import HandHistoryWriter, RoundRecord
+from blackjack.core.io.NullOutput import NullOutput
+from blackjack.core.io.ReplayInput import ReplayInput
+from blackjack.core.state import GameState, GameStage
+from blackjack.sim import engine
+
+class Mismatch(NamedTuple):
+    # position of the round in the log, from zero
+    index : int
+    expected : RoundRecord
+    # what the round recorded as when replayed, or None when it couldn't be played to the end
+    actual : Optional[RoundRecord]
+    # why it couldn't be played to the end, if it couldn't
+    error : Optional[str]
+
+class ReplayResult(NamedTuple):
+    rounds : int
+    mismatched : int
+    # the first few mismatches, see replay()
+    mismatches : List[Mismatch]
+    elapsed : float
+
+    def rounds_per_second(self) -> float:
+        return self.rounds / self.elapsed if self.elapsed else 0.0
+
+def dealt_order(record : RoundRecord) -> List[Card]:
+    """
+    The cards of a round in the order they came off the shoe: two each to the player and dealer, the new card of each split hand, the player's hits hand by hand, then the dealer's.
+
+    Complexity: O(n) for cards
+    """
+    player = record.player
+    dealer = record.dealer
+    first = player[0]
+
+    if len(player) == 1:
+        order = [first[0], first[1], dealer[0], dealer[1]]
+    else:
+        # rules.init_split_into() gave the second hand the player's second card, then dealt one to each
+        second = player[1]
+        order = [first[0], second[0], dealer[0], dealer[1], first[1], second[1]]
+
+    for hand in player:
+        order.extend(hand[2:])
+    order.extend(dealer[2:])
+    return order
+
+class _Recorder(HandHistoryWriter):
+    # keeps the record of the last round instead of encoding it
+    def __init__(self):
+        super().__init__(None)
+        self.last = None
+
+    def end_round(self, state : GameState):
+        self.last = self.round_record(state)
+
+def _transition_round(state : GameState, inputs : ReplayInput, recorder : _Recorder):
+    while True:
+        driver.transition_logic(state, inputs, NullOutput, None, None, True, recorder)
+        if state.stage == GameStage.ASK_BET:
+            return
+
+def _engine_round(state : GameState, inputs : ReplayInput, recorder : _Recorder):
+    engine.play_round(state, inputs, None, recorder)
+
+def replay(records : Iterable[RoundRecord], house : HouseRules=TraditionalRules, exact : bool=False, keep : int=100) -> ReplayResult:
+    """
+    Plays every record again and compares the result to it: the bet, every decision asked for, both hands and the change in bank.
+
+    @arg house The rules to replay under. Seeded shoes are made again with its number of decks and penetration.
+    @arg exact Step through driver.transition_logic instead of sim.engine.play_round. Slower, but it's the game itself.
+    @arg keep How many mismatches to keep, from the first. All of them are counted.
+
+    Complexity: O(n) for rounds and cards
+
+    Impure
+    """
+    play = _transition_round if exact else _engine_round
+    inputs = ReplayInput()
+    recorder = _Recorder()
+    state = GameState(GameStage.ASK_BET, None, 0, None, None, None, None, compile_rules(house))
+
+    # the shoe of the last seeded record. consecutive rounds of a shoe carry on from where the last left off, so the shoe is only made again when the seed changes, or when the log goes back to an earlier point in it.
+    shoe = None
+
+    rounds = 0
+    mismatched = 0
+    mismatches = []
+
+    start = time.perf_counter()
+    for index, record in enumerate(records):
+        rounds += 1
+
+        actual = None
+        error = None
+
+        deck : Deck
+        if record.seed is None:
+            # deals from the right
+            deck = Shoe(reversed(dealt_order(record)))
+        else:
+            if shoe is None or shoe.seed != record.seed or len(shoe) < record.remaining:
+                shoe = cards.make_seeded_shoe(record.seed, house.num_decks(), house.penetration())
+            while len(shoe) > record.remaining:
+                shoe.pop()
+            deck = shoe
+            if len(deck) != record.remaining:
+                error = f"the shoe made from the seed has {len(deck)} cards where the record has {record.remaining}"
+
+        state.reset()
+        state.deck = deck
+        state.bank = record.bank
+        inputs.start(record)
+
+        if error is None:
+            try:
+                play(state, inputs, recorder)
+                actual = recorder.last
+                if inputs.next != len(record.decisions):
+                    error = f"{len(record.decisions) - inputs.next} recorded decisions were never asked for"
+            except (ValueError, IndexError) as e:
+                # IndexError: the shoe ran out, so the round took more cards than it did when it was recorded
+                error = f"{type(e).__name__}: {e}"
+
+        # a shoe rebuilt from the record only holds the round's own cards, so remaining can't be compared
+        if error is not None or actual != record._replace(remaining=actual.remaining):
+            mismatched += 1
+            if len(mismatches) < keep:
+                mismatches.append(Mismatch(index, record, actual, error))
+
+    elapsed = time.perf_counter() - start
+
+    return ReplayResult(rounds, mismatched, mismatches, elapsed)
+
+def replay_file(path : Union[str, PathLike], house : HouseRules=TraditionalRules, exact : bool=False, keep : int=100) -> ReplayResult:
+    """
+    replay() of the log at `path`, streamed from a memory map. See history.iter_history.
+
+    Complexity: O(n) for rounds and cards
+
+    Impure
+    """
+    return replay(history.iter_history(path), house, exact, keep)
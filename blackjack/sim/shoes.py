@@ -0,0 +1,84 @@
+"""
+Shoes in bulk for simulations. A batch of shoes is one (M, N) array of encoded cards (see cards.EncodedCard) rather than M deques of Card.
+
+Row order is deal order: column 0 of a row is the first card dealt from that shoe. Note this is the reverse of a Deck, which deals from the right.
+"""
+from array import array
+from typing import Iterator, Optional
+
+import numpy as np
+
+from blackjack.core import cards, constants
+from blackjack.core.cards import Shoe
+
+SHOE_DTYPE = np.int8
+
+# cards.CARDS as an object array, so a row of codes becomes its Cards in one indexing instead of one Python lookup per card
+_CARD_OBJECTS = np.empty(len(cards.CARDS), dtype=object)
+_CARD_OBJECTS[:] = cards.CARDS
+
+def make_shoes(num_shoes : int, num_decks : int=1, seed : Optional[int]=None) -> np.ndarray:
+    """
+    Creates num_shoes independently shuffled shoes of num_decks decks each, as an (num_shoes, num_decks * DECK_SIZE) array of encoded cards.
+
+    Every row is shuffled at once by sorting a matrix of random keys along the rows, rather than shuffling each shoe in Python.
+
+    @arg seed Anything numpy.random.default_rng() accepts. Equal seeds give equal batches.
+
+    Complexity: O(mn log n)
+    """
+    if num_shoes < 0:
+        raise ValueError(f"negative number of shoes: {num_shoes}")
+    if num_decks < 1:
+        raise ValueError(f"a shoe needs at least one deck: {num_decks}")
+
+    rng = np.random.default_rng(seed)
+
+    # same card layout as cards.make_deck_unordered(): index i of an ordered shoe is card i % DECK_SIZE
+    ordered = (np.arange(num_decks * constants.DECK_SIZE) % constants.DECK_SIZE).astype(SHOE_DTYPE)
+
+    # float64 keys make ties (and so any bias from the sort) vanishingly unlikely
+    keys = rng.random((num_shoes, len(ordered)))
+    return ordered[np.argsort(keys, axis=1)]
+
+class ShoeBatch:
+    """
+    A batch of shoes that only becomes Cards one row at a time, when something like driver.driver_io needs a real Deck.
+    """
+    def __init__(self, num_shoes : int, num_decks : int=1, seed : Optional[int]=None, penetration : float=1.0):
+        if not 0 < penetration <= 1:
+            raise ValueError(f"penetration must be within (0, 1]: {penetration}")
+
+        self.codes = make_shoes(num_shoes, num_decks, seed)
+        self.penetration = penetration
+
+    def __len__(self) -> int:
+        return self.codes.shape[0]
+
+    def __getitem__(self, i : int) -> Shoe:
+        return self.deck(i)
+
+    def __iter__(self) -> Iterator[Shoe]:
+        # lazy so that a driver consuming shoes one at a time never holds more than one as Cards
+        for i in range(len(self)):
+            yield self.deck(i)
+
+    def encoded(self, i : int) -> cards.EncodedDeck:
+        """
+        Row i as an encoded deck, ready for cards.take_card().
+
+        Complexity: O(n)
+        """
+        return array(cards.ENCODED_TYPECODE, self.codes[i, ::-1].tobytes())
+
+    def deck(self, i : int) -> Shoe:
+        """
+        Row i as a Shoe of Cards with the cut card placed by the batch's penetration.
+
+        Complexity: O(n)
+        """
+        row = self.codes[i]
+        return Shoe(
+            _CARD_OBJECTS[row[::-1]],
+            round(len(row) * (1 - self.penetration))
+        )
@@ -0,0 +1,155 @@
+"""
+Statistics of a simulation kept up round by round, so that a run can stop as soon as its EV is known well enough instead of after a fixed number of rounds.
+
+RoundStats is fed each round's change in bank. The mean and variance are Welford's running ones, which stay accurate over billions of rounds where summing squares wouldn't. Two RoundStats combine exactly with then(), so chunks played in different processes add up to the same numbers as one long run.
+"""
+import math
+
+from statistics import NormalDist
+from typing import NamedTuple, Tuple
+
+class RoundStats:
+    """
+    Everything here is relative to the bank the first round started with.
+    """
+    __slots__ = ("rounds", "wagered", "net", "mean", "m2", "wins", "losses", "pushes", "low", "high")
+
+    def __init__(self):
+        self.rounds = 0
+        # sum of the bets placed at ASK_BET, like SimResult
+        self.wagered = 0
+        self.net = 0
+        # running mean of the change in bank per round, and the sum of squared deviations from it
+        self.mean = 0.0
+        self.m2 = 0.0
+        # rounds that ended up, down and even, insurance and all
+        self.wins = 0
+        self.losses = 0
+        self.pushes = 0
+        # lowest and highest bank, checked between rounds
+        self.low = 0
+        self.high = 0
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, RoundStats) and all(getattr(self, name) == getattr(other, name) for name in RoundStats.__slots__)
+
+    def __repr__(self) -> str:
+        return "RoundStats(" + ", ".join(f"{name}={getattr(self, name)!r}" for name in RoundStats.__slots__) + ")"
+
+    def __getstate__(self):
+        # slots and no __dict__, so it pickles through here to and from worker processes
+        return tuple(getattr(self, name) for name in RoundStats.__slots__)
+
+    def __setstate__(self, values):
+        for name, value in zip(RoundStats.__slots__, values):
+            setattr(self, name, value)
+
+    def add(self, net : int, bet : int):
+        """
+        One round that changed the bank by `net` after an initial bet of `bet`.
+
+        Complexity: O(1)
+
+        Impure
+        """
+        self.rounds += 1
+        self.wagered += bet
+
+        delta = net - self.mean
+        self.mean += delta / self.rounds
+        self.m2 += delta * (net - self.mean)
+
+        if net > 0:
+            self.wins += 1
+        elif net < 0:
+            self.losses += 1
+        else:
+            self.pushes += 1
+
+        self.net += net
+        if self.net < self.low:
+            self.low = self.net
+        elif self.net > self.high:
+            self.high = self.net
+
+    def then(self, other : "RoundStats") -> "RoundStats":
+        """
+        The stats of playing `other`'s rounds straight after these, as one run. The mean and variance combine exactly (Chan et al.), the extremes like SimResult.then.
+
+        Complexity: O(1)
+        """
+        combined = RoundStats()
+        combined.rounds = self.rounds + other.rounds
+        combined.wagered = self.wagered + other.wagered
+        combined.net = self.net + other.net
+        combined.wins = self.wins + other.wins
+        combined.losses = self.losses + other.losses
+        combined.pushes = self.pushes + other.pushes
+        combined.low = min(self.low, self.net + other.low)
+        combined.high = max(self.high, self.net + other.high)
+
+        if combined.rounds:
+            delta = other.mean - self.mean
+            combined.mean = self.mean + delta * other.rounds / combined.rounds
+            combined.m2 = self.m2 + other.m2 + delta * delta * self.rounds * other.rounds / combined.rounds
+        return combined
+
+    def ev_per_round(self) -> float:
+        return self.net / self.rounds if self.rounds else 0.0
+
+    def ev_per_unit(self) -> float:
+        return self.net / self.wagered if self.wagered else 0.0
+
+    def variance(self) -> float:
+        """
+        Sample variance of the change in bank per round.
+
+        Complexity: O(1)
+        """
+        return self.m2 / (self.rounds - 1) if self.rounds > 1 else math.inf
+
+    def std_error(self) -> float:
+        """
+        Standard error of ev_per_round().
+
+        Complexity: O(1)
+        """
+        return math.sqrt(self.variance() / self.rounds) if self.rounds > 1 else math.inf
+
+    def half_width(self, confidence : float=0.95) -> float:
+        """
+        Half the width of the confidence interval of ev_per_round(), by the normal approximation. Fine for the thousands of rounds it takes to say anything about EV.
+
+        Complexity: O(1)
+        """
+        return NormalDist().inv_cdf(0.5 + confidence / 2) * self.std_error()
+
+    def unit_half_width(self, confidence : float=0.95) -> float:
+        """
+        half_width() per unit of the average initial bet, to go with ev_per_unit().
+
+        Complexity: O(1)
+        """
+        return self.half_width(confidence) * self.rounds / self.wagered if self.wagered else math.inf
+
+    def interval(self, confidence : float=0.95) -> Tuple[float, float]:
+        """
+        The confidence interval of ev_per_unit().
+
+        Complexity: O(1)
+        """
+        width = self.unit_half_width(confidence)
+        return self.ev_per_unit() - width, self.ev_per_unit() + width
+
+class Converged(NamedTuple):
+    """
+    A stop criterion: true once EV per unit bet is known to within `half_width` either way, at `confidence`. Nothing is trusted before `min_rounds`, since the variance of a few rounds says little about the variance of many.
+
+        engine.simulate(10 ** 9, inputs, stop=Converged(0.001))
+    """
+    half_width : float
+    confidence : float = 0.95
+    min_rounds : int = 10_000
+
+    def __call__(self, stats : RoundStats) -> bool:
+        return stats.rounds >= self.min_rounds and stats.unit_half_width(self.confidence) <= self.half_width
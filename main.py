@@ -3,10 +3,13 @@ from threading import Event
 from blackjack.core import driver
 from blackjack.core.io.BareInput import BareInput
 from blackjack.core.io.BareOutput import BareOutput
+from blackjack.core.io.BufferedOutput import BufferedOutput
 
 
 def main():
-    driver.driver_io(Event(), BareInput, BareOutput)
+    # everything shown between two questions comes out in one write
+    strings = BufferedOutput(BareOutput)
+    driver.driver_io(Event(), BareInput, strings, strings.reading(input), strings.write)
 
 if __name__ == "__main__":
     #import argparse
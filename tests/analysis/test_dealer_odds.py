@@ -0,0 +1,106 @@
+import itertools
+import math
+from collections import Counter
+
+import pytest
+
+from blackjack.core import cards, constants, rules
+from blackjack.analysis import dealer_odds
+
+def _outcome_index(dealer) -> int:
+    value = rules.hand_value(dealer)
+    return dealer_odds.BUST if rules.is_bust(value) else value - constants.DEALER_STOP
+
+def test_shoe_composition():
+    assert dealer_odds.shoe_composition(1) == dealer_odds.composition(cards.make_deck_ordered())
+    assert sum(dealer_odds.shoe_composition(6)) == 6 * constants.DECK_SIZE
+
+def test_remove():
+    comp = dealer_odds.shoe_composition(1)
+    assert dealer_odds.remove(comp, 1) == (3,) + comp[1:]
+    assert dealer_odds.remove(comp, 10)[-1] == 15
+    with pytest.raises(ValueError):
+        dealer_odds.remove((0,) * dealer_odds.NUM_VALUES, 5)
+
+@pytest.mark.parametrize("hit_soft_17", [False, True])
+@pytest.mark.parametrize("upcard,rest", [
+    ("6C", "5D 10H AS 2C 3D KS"),
+    ("AC", "5D 6H AS 2C 10D"),
+    ("2C", "2D 2H 2S 3C AS 9D"),
+    ("KC", "6D 5H 10S AD 2C"),
+    # soft 17s to hit
+    ("AC", "6D 3H 10S 2D AD"),
+])
+def test_final_dist_matches_dealer_play(upcard, rest, hit_soft_17):
+    # play every ordering of a small shoe through rules.dealer_play() and compare frequencies with the engine. exact, not a sample.
+    upcard = cards.parse_hand(upcard)[0]
+    rest = cards.parse_hand(rest)
+
+    counts = Counter()
+    for order in itertools.permutations(rest):
+        dealer = [upcard]
+        rules.dealer_play(dealer, list(order), hit_soft_17)
+        counts[_outcome_index(dealer)] += 1
+
+    total = math.factorial(len(rest))
+    dist = dealer_odds.DealerOdds(hit_soft_17).final_dist_deck(upcard, rest)
+
+    assert sum(dist) == pytest.approx(1)
+    for i in range(dealer_odds.BUST + 1):
+        assert dist[i] == pytest.approx(counts[i] / total)
+
+@pytest.mark.parametrize("upcard,rest", [
+    ("AC", "5D 6H KS 2C 10D"),
+    ("KC", "6D 5H 10S AD 2C"),
+    ("6C", "5D 10H AS 2C"),
+])
+def test_peeked_dist(upcard, rest):
+    # every ordering again, leaving out those where the hole card makes a natural
+    upcard = cards.parse_hand(upcard)[0]
+    rest = cards.parse_hand(rest)
+
+    counts = Counter()
+    naturals = 0
+    for order in itertools.permutations(rest):
+        dealer = [upcard]
+        deck = list(order)
+        cards.take_card(dealer, deck)
+        if rules.is_natural(dealer):
+            naturals += 1
+            continue
+        rules.dealer_play(dealer, deck)
+        counts[_outcome_index(dealer)] += 1
+
+    total = math.factorial(len(rest))
+    dist, p_natural = dealer_odds.DealerOdds().peeked_dist(dealer_odds._value_index(upcard) + 1, dealer_odds.composition(rest))
+
+    assert p_natural == pytest.approx(naturals / total)
+    for i in range(dealer_odds.BUST + 1):
+        assert dist[i] == pytest.approx(counts[i] / (total - naturals))
+
+def test_final_dist_certain():
+    # nothing but tens left. a seven up always stands on 17, a six up always busts.
+    tens = (0,) * (dealer_odds.NUM_VALUES - 1) + (8,)
+    engine = dealer_odds.DealerOdds()
+    assert engine.final_dist(7, tens)[0] == 1
+    assert engine.final_dist(6, tens)[dealer_odds.BUST] == 1
+
+def test_final_dist_memo_counters():
+    engine = dealer_odds.DealerOdds()
+    comp = dealer_odds.remove(dealer_odds.shoe_composition(6), 10)
+
+    first = engine.final_dist(10, comp)
+    misses = engine.misses
+    assert misses > 0
+
+    # the same query is answered entirely from the memo
+    assert engine.final_dist(10, comp) == first
+    assert engine.misses == misses
+    assert engine.hits > 0
+
+    engine.clear()
+    assert (engine.hits, engine.misses) == (0, 0)
+
+def test_final_dist_empty_shoe():
+    with pytest.raises(ValueError):
+        dealer_odds.DealerOdds().final_dist(5, (0,) * dealer_odds.NUM_VALUES)
@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from blackjack.analysis import risk
+from blackjack.analysis.risk import OutcomeDist
+from blackjack.core.io.DealerMimicInput import DealerMimicInput
+from blackjack.sim import engine
+
+def test_from_counts():
+    dist = OutcomeDist.from_counts({1.0 : 3, -1.0 : 5, 1.5 : 2})
+    assert list(dist.values) == [-1.0, 1.0, 1.5]
+    assert list(dist.probs) == pytest.approx([0.5, 0.3, 0.2])
+    assert dist.mean() == pytest.approx(-0.5 + 0.3 + 0.3)
+    with pytest.raises(ValueError):
+        OutcomeDist.from_counts({})
+
+def test_certain_loss_goes_all_in():
+    # 25 -> 15 -> 5, then the last 5 is all that can be bet
+    result = risk.risk_of_ruin(OutcomeDist.from_counts({-1.0 : 1}), 25, 10, 10, trajectories=4, seed=0)
+    assert list(result.ruined_at) == [3] * 4
+    assert list(result.final) == [0] * 4
+    assert list(result.max_drawdown) == [25] * 4
+    assert result.risk_of_ruin() == 1.0
+    assert result.double_probability() == 0.0
+
+def test_certain_win_doubles():
+    result = risk.risk_of_ruin(OutcomeDist.from_counts({1.5 : 1}), 30, 10, 10, trajectories=3, seed=0)
+    # 30 -> 45 -> 60
+    assert list(result.doubled_at) == [2] * 3
+    assert result.time_to_double() == 2
+    assert list(result.final) == [30 + 15 * 10] * 3
+    assert result.risk_of_ruin() == 0.0
+    assert list(result.max_drawdown) == [0] * 3
+
+def test_half_losses_round_toward_zero():
+    # losing half of 5 costs 2, like a lost insurance bet on 5
+    result = risk.risk_of_ruin(OutcomeDist.from_counts({-0.5 : 1}), 20, 5, 3, trajectories=2, seed=0)
+    assert list(result.final) == [20 - 2 * 3] * 2
+
+def test_gamblers_ruin():
+    # a ±1 walk with p > q is ruined from `bank` with probability (q / p) ** bank over an infinite horizon
+    p, q, bank = 0.55, 0.45, 10
+    dist = OutcomeDist.from_counts({1.0 : 55, -1.0 : 45})
+    result = risk.risk_of_ruin(dist, bank, 1, 3000, trajectories=20_000, seed=1)
+    assert result.risk_of_ruin() == pytest.approx((q / p) ** bank, abs=0.015)
+
+def test_reproducible():
+    dist = OutcomeDist.from_counts({1.0 : 48, -1.0 : 50, 0.0 : 9, 1.5 : 4, -2.0 : 3, 2.0 : 4})
+    a = risk.risk_of_ruin(dist, 100, 10, 500, trajectories=200, seed=3)
+    b = risk.risk_of_ruin(dist, 100, 10, 500, trajectories=200, seed=3)
+    assert np.array_equal(a.final, b.final)
+    assert np.array_equal(a.ruined_at, b.ruined_at)
+    # ruined banks stay ruined
+    assert (a.final[a.ruined_at >= 0] < 1).all()
+    assert (a.drawdown_quantiles([0.0, 1.0]) >= 0).all()
+
+def test_bad_arguments():
+    dist = OutcomeDist.from_counts({1.0 : 1})
+    with pytest.raises(ValueError):
+        risk.risk_of_ruin(dist, 100, 0, 10)
+    with pytest.raises(ValueError):
+        risk.risk_of_ruin(dist, 100, 10, 10, trajectories=0)
+
+def test_sample_outcomes_matches_simulate():
+    dist = risk.sample_outcomes(5000, DealerMimicInput(10), seed=2)
+    result = engine.simulate(5000, DealerMimicInput(10), seed=2)
+    assert dist.mean() == pytest.approx(result.ev_per_unit())
+    assert dist.probs.sum() == pytest.approx(1)
@@ -0,0 +1,146 @@
+import pytest
+
+from blackjack.core import cards, constants, rules
+from blackjack.core.PayoutOdds import PayoutOdds
+from blackjack.core.casino import EUROPEAN, VEGAS_STRIP, HitSoft17Rules, TraditionalRules
+from blackjack.core.io.DealerMimicInput import DealerMimicInput
+from blackjack.core.io.StrategyInput import StrategyInput
+from blackjack.core.state import PlayerAction
+from blackjack.sim import engine
+from blackjack.analysis import strategy
+from blackjack.analysis.dealer_odds import DealerOdds
+from blackjack.analysis.dealer_odds import BUST, FINAL_TOTALS
+
+from tests.core import helper_hands
+
+# a hand for each total the settlement can see, busts included
+_PLAYER_HANDS = [
+    helper_hands.hand_2C2D(),
+    cards.parse_hand("10C 6D"),
+    helper_hands.hand_17_len_2(),
+    helper_hands.hand_18_len_2(),
+    cards.parse_hand("10C 9D"),
+    cards.parse_hand("10C QD"),
+    cards.parse_hand("10C 5D 6H"),
+    helper_hands.hand_bust_1(),
+]
+_DEALER_HANDS = [
+    helper_hands.hand_17_len_3(),
+    helper_hands.hand_18_len_3(),
+    cards.parse_hand("10C 9H"),
+    cards.parse_hand("10C KH"),
+    cards.parse_hand("10C 5D 6H"),
+    helper_hands.hand_bust_dealer(),
+]
+
+def _certain(dealer) -> tuple:
+    # a dealer distribution with all of its weight on one outcome
+    value = rules.hand_value(dealer)
+    index = BUST if rules.is_bust(value) else FINAL_TOTALS.index(value)
+    return tuple(1.0 if i == index else 0.0 for i in range(BUST + 1))
+
+@pytest.mark.parametrize("player", _PLAYER_HANDS)
+@pytest.mark.parametrize("dealer", _DEALER_HANDS)
+def test_settle_matches_bet_hand(player, dealer):
+    bet = 100
+    ex = (rules.bet_hand(player, dealer, bet) - bet) / bet
+    win = strategy.payout_ratio(TraditionalRules, PayoutOdds.ONE_ONE)
+    assert strategy.settle(rules.hand_value(player), _certain(dealer), win) == ex
+
+def test_payout_ratio():
+    assert strategy.payout_ratio(TraditionalRules, PayoutOdds.ONE_ONE) == 1
+    assert strategy.payout_ratio(TraditionalRules, PayoutOdds.THREE_TWO) == 1.5
+
+@pytest.fixture(scope="module")
+def chart():
+    return strategy.solve(TraditionalRules, 6)
+
+@pytest.mark.parametrize("key,action,split", [
+    # hard 11 against a 6 doubles
+    ((11, False, 0, 6), PlayerAction.DOUBLE, False),
+    # hard 18 stands against anything
+    ((18, False, 0, 1), PlayerAction.STAY, False),
+    ((18, False, 0, 10), PlayerAction.STAY, False),
+    # hard 5 hits
+    ((5, False, 0, 6), PlayerAction.HIT, False),
+    # aces and eights split against a 6
+    ((12, True, 1, 6), PlayerAction.HIT, True),
+    ((16, False, 8, 6), PlayerAction.STAY, True),
+    # two tens of the same rank stay together
+    ((20, False, 10, 6), PlayerAction.STAY, False),
+    # and two ten-valued cards of different ranks can't split at all
+    ((20, False, 0, 6), PlayerAction.STAY, False),
+])
+def test_solve_known_decisions(chart, key, action, split):
+    decision = chart.initial[key]
+    assert decision.action == action
+    assert decision.split == split
+
+def test_solve_decisions_consistent(chart):
+    for key, decision in chart.initial.items():
+        total, soft, pair, upcard = key
+        assert decision.double is not None
+        assert (decision.split_ev is not None) == (pair != 0)
+        assert decision.ev() >= max(decision.stand, decision.hit, decision.double)
+
+    for key, decision in chart.later.items():
+        assert decision.double is None
+        assert decision.action in (PlayerAction.HIT, PlayerAction.STAY)
+        assert not decision.split
+
+def test_solve_covers_all_two_card_hands(chart):
+    for upcard in strategy.UPCARDS:
+        for total in range(5, constants.MAX_HAND_VALUE):
+            assert (total, False, 0, upcard) in chart.initial
+        for total in range(13, constants.MAX_HAND_VALUE):
+            assert (total, True, 0, upcard) in chart.initial
+        for total in range(4, constants.MAX_HAND_VALUE):
+            assert (total, False, 0, upcard) in chart.later
+
+def test_format_chart(chart):
+    text = strategy.format_chart(chart)
+    assert text.splitlines()[0] == "hard"
+    assert "soft" in text
+    assert "A,A" in text
+
+def test_compile_table(chart):
+    table = strategy.compile_table(chart, "TraditionalRules")
+
+    for (total, soft, pair, upcard), decision in chart.initial.items():
+        assert table.action(False, soft, pair, upcard, total) == decision.action
+        assert table.split(soft, pair, upcard, total) == decision.split
+    for (total, soft, _, upcard), decision in chart.later.items():
+        assert table.action(True, soft, 0, upcard, total) == decision.action
+
+    # unsplit aces play like any soft 12
+    for upcard in strategy.UPCARDS:
+        assert table.action(False, True, 0, upcard, 12) == chart.initial[(12, True, 1, upcard)].action
+
+def test_strategy_input_plays_the_chart(chart):
+    # the simulated edge of the compiled chart lands near the solver's
+    result = engine.simulate(100_000, StrategyInput(strategy.compile_table(chart), 10), seed=0)
+    assert result.ev_per_unit() == pytest.approx(chart.game_ev, abs=0.02)
+    assert result.ev_per_unit() > engine.simulate(100_000, DealerMimicInput(10), seed=0).ev_per_unit()
+
+def test_solve_european_doubles():
+    chart = strategy.solve(EUROPEAN)
+    for (total, soft, pair, upcard), decision in chart.initial.items():
+        assert (decision.double is not None) == (total in (9, 10, 11))
+    # no doubling after a split makes a split 5,5 worth less
+    assert chart.initial[(10, False, 5, 6)].split_ev < strategy.solve(TraditionalRules).initial[(10, False, 5, 6)].split_ev
+
+def test_solve_hit_soft_17_costs():
+    assert strategy.solve(HitSoft17Rules).game_ev < strategy.solve(TraditionalRules).game_ev
+
+def test_solve_dealer_must_match_house():
+    with pytest.raises(ValueError):
+        strategy.solve(HitSoft17Rules, dealer=DealerOdds())
+
+def test_solve_table_named_after_table_rules():
+    assert strategy.solve_table(VEGAS_STRIP).name == "Vegas Strip"
+
+@pytest.mark.parametrize("house", [VEGAS_STRIP, EUROPEAN])
+def test_strategy_input_plays_the_chart_under_house(house):
+    chart = strategy.solve(house)
+    result = engine.simulate(100_000, StrategyInput(strategy.compile_table(chart), 10), house, seed=0)
+    assert result.ev_per_unit() == pytest.approx(chart.game_ev, abs=0.02)
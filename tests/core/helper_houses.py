@@ -0,0 +1,24 @@
+from typing import Tuple
+
+from blackjack.core.PayoutOdds import PayoutOdds
+from blackjack.core.casino import TraditionalRules
+
+# house rules for the tests that need a house the game doesn't ship
+
+class EvenMoneyRules(TraditionalRules):
+    # naturals pay 1:1, so any natural that won plays out differently
+    @staticmethod
+    def payout_ratio(odds : PayoutOdds) -> Tuple[int, int]:
+        if odds == PayoutOdds.THREE_TWO:
+            return 1, 1
+        return TraditionalRules.payout_ratio(odds)
+
+class FullPenetrationRules(TraditionalRules):
+    # a single deck dealt to the last card
+    @staticmethod
+    def num_decks() -> int:
+        return 1
+
+    @staticmethod
+    def penetration() -> float:
+        return 1.0
@@ -1,7 +1,12 @@
 import queue
+import random
 
 from typing import List
 
+from blackjack.core import constants
+from blackjack.core.io.InputProvider import InputProvider
+from blackjack.core.state import PlayerAction
+
 class IOQueue:
     def __init__(self):
         self._q = queue.Queue()
@@ -44,3 +49,26 @@ class InputMock(IOQueue):
 
 def print_stub(*args : List[str], end="\n") -> None:
     pass
+
+class ChaosInput(InputProvider):
+    # answers everything at random from its own seed, so that insurance, splits and doubles all happen. two instances with the same seed asked the same questions in the same order answer the same.
+    def __init__(self, seed : int):
+        self.rseed = random.Random(seed)
+
+    def input_bank(self, reader, writer) -> int:
+        return 1000
+
+    def input_bet(self, state, reader, writer) -> int:
+        return self.rseed.randint(constants.MIN_BET, min(state.bank, 50))
+
+    def input_hit(self, state, reader, writer) -> PlayerAction:
+        return self.rseed.choice([PlayerAction.HIT, PlayerAction.STAY])
+
+    def input_hit_stay_double(self, state, reader, writer) -> PlayerAction:
+        return self.rseed.choice([PlayerAction.HIT, PlayerAction.STAY, PlayerAction.DOUBLE])
+
+    def input_want_split(self, state, reader, writer) -> bool:
+        return self.rseed.random() < 0.5
+
+    def input_want_insurance(self, state, reader, writer) -> bool:
+        return self.rseed.random() < 0.5
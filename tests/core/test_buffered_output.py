@@ -0,0 +1,64 @@
+from blackjack.core import driver
+from blackjack.core.io.BareInput import BareInput
+from blackjack.core.io.BareOutput import BareOutput
+from blackjack.core.io.BufferedOutput import BufferedOutput
+from blackjack.core.state import GameState, GameStage
+from blackjack.sim.shoes import ShoeBatch
+from tests.core.mocks_io import ChaosInput
+
+def _play(rounds : int, inputs, strings, reader, writer, shoe):
+    state = GameState(GameStage.ASK_BET, shoe, 10_000, None, None, None, None)
+    completed = 0
+    while completed < rounds:
+        driver.transition_logic(state, inputs, strings, reader, writer)
+        if state.stage == GameStage.COMPLETE:
+            completed += 1
+
+def test_same_text_one_write_per_round():
+    eager = []
+    _play(30, ChaosInput(0), BareOutput, None, eager.append, ShoeBatch(1, 6, seed=1)[0])
+
+    buffered = []
+    out = BufferedOutput(BareOutput, buffered.append)
+    _play(30, ChaosInput(0), out, None, out.write, ShoeBatch(1, 6, seed=1)[0])
+
+    assert len(buffered) == 30
+    assert "\n".join(buffered) == "\n".join(eager)
+    assert out.events == []
+
+def _answer(lines) -> str:
+    # a person at the terminal answering whatever the last line written asked. bets ten, stays, and says no to everything else.
+    prompt = lines[-1] if lines else ""
+    if prompt.startswith("prompt_bet"):
+        return "10"
+    if prompt.startswith("prompt_hit_stay"):
+        return "stay"
+    return "no"
+
+def test_prompts_come_after_what_was_shown():
+    eager = []
+    _play(20, BareInput, BareOutput, lambda *args: _answer(eager), eager.append, ShoeBatch(1, 6, seed=2)[0])
+
+    buffered = []
+    out = BufferedOutput(BareOutput, buffered.append)
+
+    def reader(*args):
+        # everything before the question has been written by now, the question last
+        return _answer("\n".join(buffered).split("\n"))
+
+    _play(20, BareInput, out, out.reading(reader), out.write, ShoeBatch(1, 6, seed=2)[0])
+
+    assert "\n".join(buffered) == "\n".join(eager)
+    assert len(buffered) < len(eager)
+
+def test_flush_on_demand_and_interrupt():
+    buffered = []
+    out = BufferedOutput(BareOutput, buffered.append)
+    out.flush()
+    assert buffered == []
+
+    out.show_shuffling(None, None)
+    out.write("hello")
+    assert buffered == []
+    out.show_keyboard_interrupt(None, None)
+    assert buffered == ["SHUFFLING...\nhello\nKeyboardInterrupt"]
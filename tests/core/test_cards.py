@@ -1,6 +1,6 @@
 import pytest
 import random
-from copy import deepcopy
+from copy import copy, deepcopy
 
 from blackjack.core import cards, constants
 from blackjack.core.cards import Card, Rank, Suit
@@ -46,6 +46,28 @@ def test_parse_hand_deck_fixture(fix_deck_alphabetical_52):
         list(cards.parse_hand("AC2C3C4C5C6C7C8C9C10CJCQCKCAD2D3D4D5D6D7D8D9D10DJDQDKDAH2H3H4H5H6H7H8H9H10HJHQHKHAS2S3S4S5S6S7S8S9S10SJSQSKS")) \
         == list(fix_deck_alphabetical_52)
 
+def test_parse_hand_fmt():
+    # groups are joined into the card, lowercase included
+    assert cards.parse_hand("10h, as", r'(10|[2-9ajqk])([cdhs])') == cards.parse_hand("10HAS")
+    # without groups the whole match is the card
+    assert cards.parse_hand("<QD><2S>", r'(?<=<)\w+(?=>)') == [Card(Rank.QUEEN, Suit.DIAMOND), Card(Rank.TWO, Suit.SPADE)]
+
+def test_parse_hand_fmt_not_a_card():
+    with pytest.raises(ValueError):
+        cards.parse_hand("1H", r'(1)([CDHS])')
+
+def test_card_strings(fix_deck_alphabetical_52):
+    assert len(set(cards.CARD_STRINGS)) == constants.DECK_SIZE
+    assert [cards.card_string(card) for card in fix_deck_alphabetical_52] == list(cards.CARD_STRINGS)
+    assert cards.card_string(Card(Rank.TEN, Suit.HEART)) == "10H"
+
+@pytest.mark.parametrize("sep", [" ", "", ","])
+def test_render_hand_round_trip(fix_rseed_zero_deck, sep):
+    assert cards.parse_hand(cards.render_hand(fix_rseed_zero_deck, sep)) == list(fix_rseed_zero_deck)
+
+def test_render_hand_empty():
+    assert cards.render_hand([]) == ""
+
 # /parse_hand
 ########################################################################################
 # card properties
@@ -80,6 +102,78 @@ def test_make_deck_unordered(fix_rseed_zero_deck):
     assert len(cards.Rank) * len(cards.Suit) == constants.DECK_SIZE
     assert list(cards.make_deck_unordered(random.Random(0))) == list(fix_rseed_zero_deck)
 
+def test_make_deck_unordered_multi():
+    num_decks = 6
+    shoe = cards.make_deck_unordered(random.Random(0), num_decks)
+    assert len(shoe) == num_decks * constants.DECK_SIZE
+    # every card appears once per deck
+    for card in cards.make_deck_ordered():
+        assert shoe.count(card) == num_decks
+
+def test_make_deck_unordered_zero_decks():
+    with pytest.raises(ValueError):
+        cards.make_deck_unordered(random.Random(0), 0)
+
+def test_shoe_copy():
+    shoe = cards.make_seeded_shoe(3, 2, 0.75)
+    shoe.pop()
+    copied = copy(shoe)
+    assert type(copied) is cards.Shoe
+    assert list(copied) == list(shoe)
+    assert (copied.cut, copied.seed, copied.size) == (shoe.cut, shoe.seed, shoe.size)
+    # the copy deals on its own
+    copied.pop()
+    assert len(copied) == len(shoe) - 1
+
+def test_make_shoe_single_deck(fix_rseed_zero_deck):
+    # one deck, no cut card. same as the plain deck.
+    shoe = cards.make_shoe(random.Random(0))
+    assert list(shoe) == list(fix_rseed_zero_deck)
+    assert shoe.cut == 0
+    assert shoe.cards_before_cut() == constants.DECK_SIZE
+
+@pytest.mark.parametrize("num_decks,penetration,ex_cut", [
+    (6, 0.75, 78),
+    (8, 0.8, 83),
+    (1, 0.5, 26),
+])
+def test_make_shoe_cut(num_decks, penetration, ex_cut):
+    shoe = cards.make_shoe(random.Random(0), num_decks, penetration)
+    assert shoe.cut == ex_cut
+    assert shoe.cards_before_cut() == num_decks * constants.DECK_SIZE - ex_cut
+    assert not shoe.is_cut()
+
+    hand = []
+    for _ in range(num_decks * constants.DECK_SIZE - ex_cut - 1):
+        cards.take_card(hand, shoe)
+    assert shoe.cards_before_cut() == 1
+    assert not shoe.is_cut()
+
+    cards.take_card(hand, shoe)
+    assert shoe.cards_before_cut() == 0
+    assert shoe.is_cut()
+
+    # dealing past the cut card is allowed, the round just has to finish
+    cards.take_card(hand, shoe)
+    assert shoe.cards_before_cut() == 0
+    assert shoe.is_cut()
+
+def test_is_low():
+    # no cut card at all, so only running low says when to shuffle
+    shoe = cards.make_shoe(random.Random(0))
+    hand = []
+    while len(shoe) >= constants.MAX_ROUND_LEN:
+        assert not cards.is_low(shoe)
+        assert not shoe.is_cut()
+        cards.take_card(hand, shoe)
+    assert cards.is_low(shoe)
+    assert not shoe.is_cut()
+
+@pytest.mark.parametrize("penetration", [0, -0.5, 1.5])
+def test_make_shoe_invalid_penetration(penetration):
+    with pytest.raises(ValueError):
+        cards.make_shoe(random.Random(0), 6, penetration)
+
 @pytest.mark.parametrize("hand,deck,hex,dex", [
     # empty hand, deck has one card -> transfers that card over
     (helper_hands.hand_empty(), helper_hands.hand_2C(), helper_hands.hand_2C(),helper_hands.hand_empty()),
@@ -120,3 +214,42 @@ def test_take_card_entire_deck(fix_deck_alphabetical_52):
     assert hand[::-1] == list(original)
 
 ## /decks
+
+########################################################################################
+# encoded cards
+
+def test_encode_decode_card(fix_deck_alphabetical_52):
+    # the alphabetical fixture is also the encoded order, so each card's code is its position.
+    for i, card in enumerate(fix_deck_alphabetical_52):
+        assert cards.encode_card(card) == i
+        assert cards.decode_card(i) == card
+
+def test_encode_decode_hand(fix_rseed_zero_deck):
+    encoded = cards.encode_hand(fix_rseed_zero_deck)
+    assert len(encoded) == len(fix_rseed_zero_deck)
+    assert cards.decode_hand(encoded) == list(fix_rseed_zero_deck)
+
+def test_encoded_card_properties(fix_deck_alphabetical_52):
+    for card in fix_deck_alphabetical_52:
+        code = cards.encode_card(card)
+        assert cards.encoded_rank_ord(code) == cards.card_rank_ord(card)
+        assert cards.encoded_value(code) == cards.card_value(card)
+
+def test_make_encoded_deck_ordered(fix_deck_alphabetical_52):
+    assert cards.decode_hand(cards.make_encoded_deck_ordered()) == list(fix_deck_alphabetical_52)
+
+def test_make_encoded_deck_unordered(fix_rseed_zero_deck):
+    # equal seeds give the same order in both representations.
+    assert cards.decode_hand(cards.make_encoded_deck_unordered(random.Random(0))) == list(fix_rseed_zero_deck)
+
+def test_make_encoded_deck_unordered_multi():
+    assert cards.decode_hand(cards.make_encoded_deck_unordered(random.Random(3), 6)) == list(cards.make_deck_unordered(random.Random(3), 6))
+
+def test_take_card_encoded():
+    hand = cards.encode_hand(helper_hands.hand_2C())
+    deck = cards.encode_hand(helper_hands.hand_2D() + helper_hands.hand_2H())
+    cards.take_card(hand, deck)
+    assert cards.decode_hand(hand) == helper_hands.hand_2C() + helper_hands.hand_2H()
+    assert cards.decode_hand(deck) == helper_hands.hand_2D()
+
+## /encoded cards
@@ -0,0 +1,98 @@
+import random
+
+import pytest
+
+from blackjack.core import cards, constants, rules
+from blackjack.core.PayoutOdds import PayoutOdds
+from blackjack.core.casino import ATLANTIC_CITY, EUROPEAN, TRADITIONAL, VEGAS_STRIP, HitSoft17Rules, HouseRules, SixFiveRules, TableRules, TraditionalRules, compile_rules
+from blackjack.core.state import GameState, GameStage
+
+from tests.core import helper_hands
+
+def test_traditional_shuffle_pred():
+    shoe = cards.make_shoe(random.Random(0), TraditionalRules.num_decks(), TraditionalRules.penetration())
+    state = GameState(GameStage.COMPLETE, shoe, 100, None, None, None, None)
+
+    hand = helper_hands.hand_empty()
+    while not shoe.is_cut():
+        assert not TraditionalRules.shuffle_pred(state)
+        cards.take_card(hand, shoe)
+
+    assert TraditionalRules.shuffle_pred(state)
+
+def test_traditional_shuffle_pred_full_penetration():
+    # the cut card never comes out, but a round mustn't start on a shoe it could empty
+    shoe = cards.make_shoe(random.Random(0), 1, 1.0)
+    state = GameState(GameStage.COMPLETE, shoe, 100, None, None, None, None)
+
+    hand = helper_hands.hand_empty()
+    while len(shoe) >= constants.MAX_ROUND_LEN:
+        assert not TraditionalRules.shuffle_pred(state)
+        cards.take_card(hand, shoe)
+
+    assert TraditionalRules.shuffle_pred(state)
+
+def test_compile_traditional():
+    table = compile_rules(TraditionalRules)
+    assert table is TRADITIONAL
+    assert table.payouts[PayoutOdds.THREE_TWO] == (3, 2)
+    assert not table.hit_soft_17 and not table.dealer_peeks
+    assert table.insurance and table.insurance_side_bet(25) == rules.insurance_make_side_bet(25)
+    assert all(table.double) and table.double_after_split
+
+def test_compile_cached():
+    assert compile_rules(EUROPEAN) is compile_rules(TableRules("European no-hole-card", decks=6, double_on=frozenset((9, 10, 11)), double_after_split=False))
+
+@pytest.mark.parametrize("house", [TraditionalRules, SixFiveRules, HitSoft17Rules, VEGAS_STRIP, ATLANTIC_CITY, EUROPEAN])
+def test_compiled_matches_house(house):
+    table = compile_rules(house)
+    for bet in range(50):
+        for odds in PayoutOdds:
+            assert table.win_payout(odds, bet) == house.win_payout(odds, bet)
+        assert table.insurance_side_bet(bet) == house.insurance_side_bet(bet)
+    for value in range(constants.MAX_HAND_VALUE + 1):
+        assert table.can_double(value, False) == house.allow_double(value)
+        assert table.can_double(value, True) == (house.allow_double(value) and house.allow_double_after_split())
+    assert table.hit_soft_17 == house.allow_dealer_hit_soft_17()
+    assert table.dealer_peeks == house.dealer_peeks()
+
+def test_table_rules_is_a_house():
+    state = GameState(GameStage.COMPLETE, cards.make_shoe(random.Random(0), 1, 0.5), 100, None, None, None, None)
+    assert ATLANTIC_CITY.num_decks() == 8
+    assert ATLANTIC_CITY.penetration() == TraditionalRules.penetration()
+    assert ATLANTIC_CITY.shuffle_pred(state) == TraditionalRules.shuffle_pred(state)
+    assert TableRules("6:5", natural_payout=(6, 5)).win_payout(PayoutOdds.THREE_TWO, 10) == SixFiveRules.win_payout(PayoutOdds.THREE_TWO, 10)
+
+def test_negative_bet():
+    with pytest.raises(ValueError):
+        compile_rules(TraditionalRules).win_payout(PayoutOdds.ONE_ONE, -1)
+
+@pytest.mark.parametrize("decks,penetration", [(0, 0.75), (6, 0.0), (6, 1.0), (6, 1.5)])
+def test_table_rules_validates(decks, penetration):
+    with pytest.raises(ValueError):
+        TableRules("bad", decks=decks, deck_penetration=penetration)
+
+def test_house_rules_declares_insurance_side_bet():
+    # everything but the insurance side bet, which rules.insurance_make_side_bet() needs
+    NoSideBet = type("NoSideBet", (HouseRules,), {name : TraditionalRules.__dict__[name] for name in HouseRules.__abstractmethods__ - {"insurance_side_bet"}})
+
+    with pytest.raises(TypeError):
+        NoSideBet()
+
+class EveryRoundRules(TraditionalRules):
+    @staticmethod
+    def shuffle_pred(state, *args) -> bool:
+        return True
+
+@pytest.mark.parametrize("house", [TraditionalRules, HitSoft17Rules, VEGAS_STRIP, EveryRoundRules])
+@pytest.mark.parametrize("penetration", [0.5, 1.0])
+def test_compiled_shuffle_due(house, penetration):
+    table = compile_rules(house)
+    assert (table.shuffle_pred is None) == (house is not EveryRoundRules)
+
+    shoe = cards.make_shoe(random.Random(0), 1, penetration)
+    state = GameState(GameStage.COMPLETE, shoe, 100, None, None, None, None, table)
+    hand = helper_hands.hand_empty()
+    while shoe:
+        assert table.shuffle_due(state) == house.shuffle_pred(state)
+        cards.take_card(hand, shoe)
@@ -0,0 +1,147 @@
+import random
+from copy import copy
+
+import pytest
+
+from blackjack.core import cards, constants, counting, driver, rules
+from blackjack.core.counting import CountingShoe, HI_LO, KO, OMEGA_II
+from blackjack.core.io.DealerMimicInput import DealerMimicInput
+from blackjack.core.io.NullOutput import NullOutput
+from blackjack.core.state import GameState, GameStage
+from blackjack.sim import engine
+from blackjack.sim.shoes import ShoeBatch
+from tests.core.mocks_io import ChaosInput
+
+@pytest.mark.parametrize("system,per_deck", [(HI_LO, 0), (KO, 4), (OMEGA_II, 0)])
+def test_deck_sums(system, per_deck):
+    assert sum(system.weights[card.rank] for card in cards.make_deck_ordered()) == per_deck
+    assert system.balanced == (per_deck == 0)
+
+@pytest.mark.parametrize("system", [HI_LO, KO, OMEGA_II])
+def test_running_count_matches_recount(system):
+    shoe = CountingShoe(cards.make_deck_unordered(random.Random(1), 6), 0, system)
+    start = system.initial_count(6)
+    dealt = []
+    while shoe:
+        dealt.append(shoe.pop())
+        assert shoe.running_count == start + sum(system.weights[card.rank] for card in dealt)
+        assert shoe.cards_dealt == len(dealt)
+
+def test_full_shoe_ends_at_pivot():
+    for system, end in [(HI_LO, 0), (OMEGA_II, 0), (KO, 4)]:
+        shoe = CountingShoe(cards.make_deck_unordered(random.Random(2), 6), 0, system)
+        assert shoe.num_decks == 6
+        assert shoe.running_count == system.initial_count(6)
+        while shoe:
+            shoe.pop()
+        assert shoe.running_count == end
+
+def test_counts_take_card_and_split():
+    # 5, 5 for the player to split, then two tens for the split hands
+    deck = [cards.Card(cards.Rank.KING, cards.Suit.CLUB), cards.Card(cards.Rank.TEN, cards.Suit.CLUB), cards.Card(cards.Rank.FIVE, cards.Suit.CLUB), cards.Card(cards.Rank.FIVE, cards.Suit.HEART)]
+    shoe = CountingShoe(deck, 0, HI_LO, num_decks=1)
+
+    hand = rules.init_hand(shoe)
+    assert shoe.running_count == 2
+    rules.init_split(hand, shoe)
+    assert shoe.running_count == 0
+    assert shoe.cards_dealt == 4
+
+def test_hide_and_reveal():
+    shoe = CountingShoe(cards.parse_hand("5C KC"), 0, HI_LO, num_decks=1)
+    ten, five = shoe.pop(), shoe.pop()
+    shoe.hide(five)
+    assert shoe.running_count == -1
+    shoe.reveal()
+    assert shoe.running_count == 0
+    assert shoe.hidden == 0
+
+class HoleCardSpy(ChaosInput):
+    # checks at every decision that the count is of the cards the player can see: everything out of the shoe but the dealer's hole card
+    def __init__(self, seed, shoe):
+        super().__init__(seed)
+        self.dealt = list(shoe)
+        self.decisions = 0
+
+    def check(self, state):
+        deck = state.deck
+        out = self.dealt[len(deck):]
+        visible = sum(HI_LO.weights[card.rank] for card in out) - HI_LO.weights[state.dealer[1].rank]
+        assert deck.running_count == HI_LO.initial_count(deck.num_decks) + visible
+        self.decisions += 1
+
+    def input_hit(self, state, reader, writer):
+        self.check(state)
+        return super().input_hit(state, reader, writer)
+
+    def input_hit_stay_double(self, state, reader, writer):
+        self.check(state)
+        return super().input_hit_stay_double(state, reader, writer)
+
+    def input_want_split(self, state, reader, writer):
+        self.check(state)
+        return super().input_want_split(state, reader, writer)
+
+    def input_want_insurance(self, state, reader, writer):
+        self.check(state)
+        return super().input_want_insurance(state, reader, writer)
+
+def _play_transitions(state, inputs):
+    while True:
+        driver.transition_logic(state, inputs, NullOutput, None, None)
+        if state.stage == GameStage.ASK_BET:
+            return
+
+@pytest.mark.parametrize("play", [engine.play_round, _play_transitions])
+def test_policy_never_counts_the_hole_card(play):
+    for shoe in counting.counted(ShoeBatch(5, 2, seed=3, penetration=0.75)):
+        inputs = HoleCardSpy(0, shoe)
+        state = GameState(GameStage.ASK_BET, shoe, 10 ** 6, None, None, None, None)
+        while not shoe.is_cut():
+            play(state, inputs)
+            # the dealer has played, so every card is counted again
+            assert shoe.running_count == sum(HI_LO.weights[card.rank] for card in inputs.dealt[len(shoe):])
+        assert inputs.decisions > 0
+
+def test_true_count():
+    shoe = CountingShoe(cards.make_deck_ordered() * 2, 0, HI_LO)
+    shoe.running_count = 13
+    assert shoe.decks_remaining() == 2
+    assert shoe.true_count() == 6.5
+
+    # never divides by less than half a deck
+    shoe.clear()
+    assert shoe.decks_remaining() == 0.5
+    assert shoe.true_count() == 26
+
+def test_counted_keeps_cut():
+    batch = ShoeBatch(3, 2, seed=0, penetration=0.5)
+    shoes = list(counting.counted(batch, KO))
+    assert [shoe.cut for shoe in shoes] == [batch[i].cut for i in range(3)]
+    assert all(shoe == batch[i] for i, shoe in enumerate(shoes))
+    assert all(shoe.running_count == KO.initial_count(2) for shoe in shoes)
+
+def test_copy_keeps_the_count():
+    shoe = CountingShoe(cards.make_seeded_shoe(2, 2, 0.75), 26, KO)
+    for _ in range(10):
+        shoe.pop()
+    copied = copy(shoe)
+    assert type(copied) is CountingShoe
+    assert (copied.running_count, copied.cards_dealt, copied.cut, copied.system) == (shoe.running_count, shoe.cards_dealt, 26, KO)
+    copied.pop()
+    assert copied.cards_dealt == shoe.cards_dealt + 1
+
+def test_simulate_counts():
+    seen = []
+
+    class Recorder(DealerMimicInput):
+        def input_hit(self, state, reader, writer):
+            deck = state.deck
+            seen.append((deck.cards_dealt, len(deck), deck.running_count, deck.true_count()))
+            return super().input_hit(state, reader, writer)
+
+    engine.simulate(500, Recorder(10), count=HI_LO)
+    assert seen
+    for dealt, remaining, running, true in seen:
+        assert dealt + remaining == 6 * constants.DECK_SIZE
+        assert true == pytest.approx(running / max(remaining / constants.DECK_SIZE, 0.5))
@@ -5,8 +5,11 @@ from tests.core import helper_hands
 
 from tests.core.TestOutput import TestOutput
 from blackjack.core.io.BareInput import BareInput
+from blackjack.core.io.BareOutput import BareOutput
+from blackjack.sim.shoes import ShoeBatch
 
-from tests.core.mocks_io import InputMock, print_stub
+from tests.core.mocks_io import InputMock, PrintMock, print_stub
+from tests.core.mocks_io import ChaosInput
 from tests.core.test_io import InputRequireString
 
 #########
@@ -255,3 +258,42 @@ def test_insurance_decline():
     # ask insurance
     transition_logic(state_in, BareInput, TestOutput, input_mock.input, print_stub)
     assert state_in == GameState(GameStage.ASK_SPLIT, parse_hand("2H"), 100, 100, [parse_hand("2C2D")], 0, parse_hand("ACKD"))
+
+
+
+
+def _printed(writer : PrintMock):
+    lines = []
+    while not writer.empty():
+        lines.append(writer.get())
+    return lines
+
+def test_skip_no_ops_differential():
+    """
+    the same seeded rounds played with and without skip_no_ops go through the same states and print the same lines. the stepping version catches up with the skipping one after every call.
+    """
+    batch = ShoeBatch(10, 2, seed=0, penetration=0.75)
+
+    for i in range(len(batch)):
+        skipping = GameState(GameStage.ASK_BET, batch[i], 10_000, None, None, None, None)
+        stepping = GameState(GameStage.ASK_BET, batch[i], 10_000, None, None, None, None)
+        skipping_inputs = ChaosInput(i)
+        stepping_inputs = ChaosInput(i)
+        skipping_writer = PrintMock()
+        stepping_writer = PrintMock()
+
+        while not (skipping.stage == GameStage.ASK_BET and skipping.deck.is_cut()):
+            transition_logic(skipping, skipping_inputs, BareOutput, None, skipping_writer.print, skip_no_ops=True)
+
+            # one call, then one more for each stage the other skipped
+            transition_logic(stepping, stepping_inputs, BareOutput, None, stepping_writer.print, skip_no_ops=False)
+            calls = 1
+            while stepping.stage != skipping.stage:
+                transition_logic(stepping, stepping_inputs, BareOutput, None, stepping_writer.print, skip_no_ops=False)
+                calls += 1
+                assert calls <= 3
+
+            assert stepping == skipping
+            assert _printed(stepping_writer) == _printed(skipping_writer)
+
+        assert stepping_writer.length() == skipping_writer.length() > 0
@@ -6,6 +6,7 @@ import pytest
 from copy import deepcopy
 
 from blackjack.core import driver
+from blackjack.core.casino import EUROPEAN, VEGAS_STRIP, HitSoft17Rules, TableRules, compile_rules
 from blackjack.core.state import GameStage, GameState
 from blackjack.core.cards import parse_hand
 
@@ -59,6 +60,31 @@ def test_transition_logic_INIT_DEAL_natural():
 
 
 
+@pytest.mark.parametrize("deck,bank,stage_ex,current_hand_ex", [
+    # no ace showing and no pair: straight to the player's actions
+    (parse_hand("10S JS QS KS"), 90, GameStage.PLAYER_ACTIONS, 0),
+    # no ace showing and a natural: straight to the dealer
+    (parse_hand("KSQSJSAH"), 90, GameStage.PLAYER_DONE, 1),
+    # a pair: the split question still gets asked
+    (parse_hand("2C 3D 5H 5S"), 90, GameStage.ASK_SPLIT, 0),
+    # a pair the bank can't cover: nothing to ask
+    (parse_hand("2C 3D 5H 5S"), 0, GameStage.PLAYER_ACTIONS, 0),
+    # an ace showing: insurance still gets offered
+    (parse_hand("2C AD 5H 6S"), 90, GameStage.ASK_INSURANCE, 0),
+])
+def test_transition_logic_INIT_DEAL_skip_no_ops(deck, bank, stage_ex, current_hand_ex):
+    state_in = GameState(GameStage.INIT_DEAL, deck, bank, 10, None, None, None)
+
+    input_mock = InputMock([])
+    driver.transition_logic(state_in, BareInput, TestOutput, input_mock.input, print_stub, skip_no_ops=True)
+
+    assert state_in.stage == stage_ex
+    assert state_in.current_hand == current_hand_ex
+    assert len(state_in.player[0]) == 2 and len(state_in.dealer) == 2
+
+def test_stage_handlers_cover_every_stage():
+    assert set(driver.STAGE_HANDLERS) == set(GameStage)
+
 @pytest.mark.parametrize("state_in,state_ex,input_mock", [
     # note that the player hand and deck are None because we don't care about their state in this test. If the original code tried to modify either, the test would likely fail, as it should. Anyway, their implementation doesn't matter in unit testing as long as they pass the tests, so I like the idea of None effectively encapsulating that.
     (
@@ -286,3 +312,58 @@ def test_transition_logic_COMPLETE(fix_deck_alphabetical_52):
     driver.transition_logic(state_in, BareInput, TestOutput, InputMock([]), print_stub)
 
     assert state_in == state_ex
+
+
+
+def test_transition_logic_ASK_INSURANCE_peek():
+    # a dealer who peeks ends the round at a natural, once insurance has been offered
+    rules = compile_rules(VEGAS_STRIP)
+    state_in = GameState(GameStage.ASK_INSURANCE, None, 90, 10, [parse_hand("10S2C")], 0, helper_hands.hand_blackjack_ace_up(), rules)
+    state_ex = GameState(GameStage.PLAYER_DONE, None, 90, 10, [parse_hand("10S2C")], 1, helper_hands.hand_blackjack_ace_up(), rules)
+
+    input_mock = InputMock(["no"])
+    driver.transition_logic(state_in, BareInput, TestOutput, input_mock.input, print_stub)
+    assert state_in == state_ex
+    assert input_mock.empty()
+
+def test_transition_logic_ASK_INSURANCE_not_offered():
+    rules = compile_rules(TableRules("no insurance", insurance=False))
+    state_in = GameState(GameStage.ASK_INSURANCE, None, 90, 10, [parse_hand("10S2C")], 0, parse_hand("AS2S"), rules)
+    state_ex = GameState(GameStage.ASK_SPLIT, None, 90, 10, [parse_hand("10S2C")], 0, parse_hand("AS2S"), rules)
+
+    input_mock = InputMock([])
+    driver.transition_logic(state_in, BareInput, TestOutput, input_mock.input, print_stub)
+    assert state_in == state_ex
+
+@pytest.mark.parametrize("player,bank_ex,bet_ex,current_hand_ex", [
+    # 9, 10 and 11 double
+    (parse_hand("5D4C"), 300, 200, 1),
+    (parse_hand("5D6C"), 300, 200, 1),
+    # anything else is asked hit or stay, where double isn't an answer
+    (helper_hands.hand_17_len_2(), 400, 100, 0),
+    (parse_hand("ACAD"), 400, 100, 0),
+])
+def test_transition_logic_PLAYER_ACTIONS_double_restricted(player, bank_ex, bet_ex, current_hand_ex):
+    rules = compile_rules(EUROPEAN)
+    state_in = GameState(GameStage.PLAYER_ACTIONS, parse_hand("2C"), 400, 100, [player], 0, None, rules)
+
+    mock_input = InputMock(["double", "hit"])
+    driver.transition_logic(state_in, BareInput, TestOutput, mock_input.input, print_stub)
+    assert (state_in.bank, state_in.bet, state_in.current_hand) == (bank_ex, bet_ex, current_hand_ex)
+    assert len(state_in.player[0]) == 3
+
+def test_transition_logic_PLAYER_ACTIONS_no_double_after_split():
+    rules = compile_rules(EUROPEAN)
+    state_in = GameState(GameStage.PLAYER_ACTIONS, parse_hand("2C"), 400, 100, [parse_hand("5D6C"), parse_hand("5C6D")], 0, None, rules)
+
+    mock_input = InputMock(["double", "stay"])
+    driver.transition_logic(state_in, BareInput, TestOutput, mock_input.input, print_stub)
+    assert (state_in.bank, state_in.bet, state_in.current_hand) == (400, 100, 1)
+    assert mock_input.empty()
+
+def test_transition_logic_PLAYER_DONE_hit_soft_17():
+    rules = compile_rules(HitSoft17Rules)
+    state_in = GameState(GameStage.PLAYER_DONE, parse_hand("2C"), 0, 10, [parse_hand("10S8C")], 1, parse_hand("AC6C"), rules)
+
+    driver.transition_logic(state_in, BareInput, TestOutput, InputMock([]).input, print_stub)
+    assert state_in.dealer == parse_hand("AC6C2C")
@@ -0,0 +1,168 @@
+import io
+import threading
+
+import pytest
+
+from blackjack.core import cards, driver, history
+from blackjack.core.history import HandHistoryWriter, RoundRecord
+from blackjack.core.io.DealerMimicInput import DealerMimicInput
+from blackjack.core.io.NullOutput import NullOutput
+from blackjack.core.state import GameState, GameStage
+from blackjack.sim import engine
+from blackjack.sim.shoes import ShoeBatch
+from tests.core.mocks_io import ChaosInput
+
+@pytest.mark.parametrize("n", [0, 1, -1, 63, -64, 64, 127, 128, 300, -300, 2 ** 64 - 1, -(2 ** 40)])
+def test_varint_zigzag_round_trip(n):
+    buf = bytearray()
+    history.write_varint(buf, history.zigzag(n))
+    decoded, pos = history.read_varint(buf, 0)
+    assert history.unzigzag(decoded) == n
+    assert pos == len(buf)
+
+def test_varint_small_is_one_byte():
+    buf = bytearray()
+    history.write_varint(buf, 127)
+    assert len(buf) == 1
+    with pytest.raises(ValueError):
+        history.write_varint(buf, -1)
+
+def test_encode_decode_round():
+    record = RoundRecord(
+        2 ** 63 + 5, 300, 1000, 25, -50, bytes([history.SPLIT, history.HIT, history.STAY]),
+        (tuple(cards.parse_hand("8H 3C 10D")), tuple(cards.parse_hand("8S KC"))),
+        tuple(cards.parse_hand("AH 6D 4S")),
+    )
+    buf = bytearray()
+    history.encode_round(buf, record)
+    history.encode_round(buf, record._replace(seed=None))
+
+    first, pos = history.decode_round(buf, 0)
+    second, end = history.decode_round(buf, pos)
+    assert first == record
+    assert second == record._replace(seed=None)
+    assert end == len(buf)
+
+def test_read_history_rejects_other_files():
+    with pytest.raises(ValueError):
+        history.read_history(b"BJST\x01")
+    with pytest.raises(ValueError):
+        history.read_history(history.MAGIC + b"\x63")
+
+def test_writer_buffers_until_full():
+    sink = io.BytesIO()
+    writer = HandHistoryWriter(sink, buffer_size=256)
+
+    result = engine.simulate(200, DealerMimicInput(10), seed=1, history=writer)
+    # simulate flushes at the end of a run
+    assert writer.buffer == bytearray()
+
+    records = history.read_history(sink.getvalue())
+    assert len(records) == writer.rounds == result.rounds
+    assert sum(record.bet for record in records) == result.wagered
+    assert sum(record.delta for record in records) == result.net
+
+def test_writer_holds_records_below_buffer_size():
+    sink = io.BytesIO()
+    writer = HandHistoryWriter(sink)
+    state = GameState(GameStage.ASK_BET, ShoeBatch(1, 1, seed=0)[0], 1000, None, None, None, None)
+    engine.play_round(state, DealerMimicInput(10), history=writer)
+
+    assert sink.getvalue() == b""
+    with writer:
+        pass
+    assert len(history.read_history(sink.getvalue())) == 1
+
+def test_writer_appends_under_one_header(tmp_path):
+    # a log reopened to append carries on after its records, rather than starting a second header in the middle
+    path = tmp_path / "history.bjhh"
+    with open(path, "wb") as sink:
+        first = engine.simulate(50, DealerMimicInput(10), seed=1, history=HandHistoryWriter(sink))
+    with open(path, "ab") as sink:
+        second = engine.simulate(70, DealerMimicInput(10), seed=2, history=HandHistoryWriter(sink))
+
+    records = list(history.iter_history(path))
+    assert path.read_bytes().count(history.HEADER) == 1
+    assert len(records) == first.rounds + second.rounds
+    assert sum(record.delta for record in records) == first.net + second.net
+
+def test_iter_history_empty_file(tmp_path):
+    path = tmp_path / "history.bjhh"
+    path.write_bytes(b"")
+    assert list(history.iter_history(path)) == []
+
+@pytest.mark.parametrize("policy_seed", range(3))
+def test_engine_and_transition_logic_write_the_same_history(policy_seed):
+    batch = ShoeBatch(5, 2, seed=policy_seed, penetration=0.75)
+    expected_sink, actual_sink = io.BytesIO(), io.BytesIO()
+    expected_log, actual_log = HandHistoryWriter(expected_sink), HandHistoryWriter(actual_sink)
+    expected_inputs, actual_inputs = ChaosInput(policy_seed), ChaosInput(policy_seed)
+
+    for i in range(len(batch)):
+        expected = GameState(GameStage.ASK_BET, batch[i], 10_000, None, None, None, None)
+        actual = GameState(GameStage.ASK_BET, batch[i], 10_000, None, None, None, None)
+
+        while not expected.deck.is_cut():
+            while True:
+                driver.transition_logic(expected, expected_inputs, NullOutput, None, None, True, expected_log)
+                if expected.stage == GameStage.ASK_BET:
+                    break
+            engine.play_round(actual, actual_inputs, history=actual_log)
+
+    expected_log.flush()
+    actual_log.flush()
+    assert expected_sink.getvalue() == actual_sink.getvalue()
+    assert expected_log.rounds > 0
+
+def test_history_records_the_round():
+    # every record describes its round completely: replaying the decisions from the recorded cards gives the same hands and the same delta
+    batch = ShoeBatch(3, 1, seed=7, penetration=0.75)
+    sink = io.BytesIO()
+    writer = HandHistoryWriter(sink)
+    inputs = ChaosInput(7)
+
+    banks = []
+    for shoe in batch:
+        state = GameState(GameStage.ASK_BET, shoe, 10_000, None, None, None, None)
+        while not state.deck.is_cut():
+            before = state.bank
+            remaining = len(state.deck)
+            engine.play_round(state, inputs, history=writer)
+            banks.append((before, state.bank, remaining))
+    writer.flush()
+
+    records = history.read_history(sink.getvalue())
+    assert [(record.bank, record.bank + record.delta, record.remaining) for record in records] == banks
+    for record in records:
+        assert record.seed is None
+        assert all(2 <= len(hand) for hand in record.player)
+        assert len(record.player) in (1, 2)
+        # a split is only ever asked once
+        assert record.decisions.count(history.SPLIT) <= 1
+
+def test_driver_io_history():
+    # seeded shoes are recorded with their seeds, which make the same shoe again
+    sink = io.BytesIO()
+    writer = HandHistoryWriter(sink)
+    stop = threading.Event()
+
+    class StopAfter(DealerMimicInput):
+        # stops the session at its 31st bet. that round never finishes, so it's never recorded
+        rounds = 0
+
+        def input_bet(self, state, reader, writer):
+            self.rounds += 1
+            if self.rounds == 31:
+                stop.set()
+            return super().input_bet(state, reader, writer)
+
+    driver.driver_io(stop, StopAfter(10, 1000), NullOutput, None, None, seed=5, history=writer)
+
+    records = history.read_history(sink.getvalue())
+    assert len(records) == 30
+    first = records[0]
+    shoe = cards.make_seeded_shoe(first.seed, 6, 0.75)
+    assert first.remaining == len(shoe)
+    dealt = [shoe.pop() for _ in range(4)]
+    assert list(first.player[0][:2]) == dealt[:2]
+    assert list(first.dealer[:2]) == dealt[2:]
@@ -1,4 +1,4 @@
-from copy import deepcopy
+from copy import copy, deepcopy
 import pytest
 
 from blackjack.core import constants
@@ -17,10 +17,21 @@ def test_init_hand_fix(fix_deck_alphabetical_52):
     original = deepcopy(fix_deck_alphabetical_52)
     hand = rules.init_hand(fix_deck_alphabetical_52)
 
+    assert isinstance(hand, rules.ValuedHand)
+    assert hand.value() == rules.hand_value(list(hand))
+
     assert len(original) - constants.INITIAL_HAND_LEN == len(fix_deck_alphabetical_52)
     # need to reverse the list (order matters) then check if the hand matches the now first n elements
     assert original[::-1][:constants.INITIAL_HAND_LEN] == list(hand)
 
+def test_init_hand_into(fix_deck_alphabetical_52):
+    original = deepcopy(fix_deck_alphabetical_52)
+    hand = rules.ValuedHand()
+
+    assert rules.init_hand_into(hand, fix_deck_alphabetical_52) is hand
+    assert list(hand) == list(rules.init_hand(original))
+    assert hand.value() == rules.hand_value(list(hand))
+
 # /init hand
 #######################################################################################
 ## hand_value
@@ -79,11 +90,21 @@ def test_compare(a, b, ex):
     (cards.parse_hand("AC AD AH AS 2C 2D 2H 2S 3C 3D 3H"), 21),
     # most cards without busting, plus another card
     (cards.parse_hand("AC AD AH AS 2C 2D 2H 2S 3C 3D 3H 3S"), 24),
+    # three aces where the first being eleven would bust with the other two. all three are one.
+    (cards.parse_hand("9C AD AH AS"), 12),
     # empty hand
     (helper_hands.hand_empty(), 0)
 ])
 def test_hand_value(hand,ex):
     assert rules.hand_value(hand) == ex
+    # the encoded representation has to agree on every case.
+    assert rules.hand_value(cards.encode_hand(hand)) == ex
+    # so does the running total, whether built at once or a card at a time
+    assert rules.hand_value(rules.ValuedHand(hand)) == ex
+    valued = rules.ValuedHand()
+    for card in hand:
+        valued.append(card)
+    assert rules.hand_value(valued) == ex
 
 def test_hand_value_whole_deck(fix_deck_alphabetical_52):
     # I got 340 using calculator
@@ -135,6 +156,45 @@ def test_compare_hand_extreme_lt(fix_deck_alphabetical_52):
 ])
 def test_is_hard_hand(hand,ex):
     assert rules.is_hard_hand(hand) == ex
+    assert rules.is_hard_hand(rules.ValuedHand(hand)) == ex
+
+@pytest.mark.parametrize("hand,ex", [
+    (cards.parse_hand("AC6D"), True),
+    (cards.parse_hand("ACAD"), True),
+    (cards.parse_hand("AC6D10H"), False),
+    (cards.parse_hand("9C AD AH AS"), False),
+    (cards.parse_hand("AC AD 9H"), True),
+    (helper_hands.hand_2C2D(), False),
+    (helper_hands.hand_empty(), False),
+])
+def test_is_soft(hand,ex):
+    assert rules.is_soft(hand) == ex
+    assert rules.is_soft(cards.encode_hand(hand)) == ex
+    assert rules.is_soft(rules.ValuedHand(hand)) == ex
+
+def test_valued_hand_mutations():
+    hand = rules.ValuedHand(cards.parse_hand("AC 6D"))
+    assert hand == cards.parse_hand("AC 6D")
+    assert (hand.value(), hand.soft()) == (17, True)
+
+    hand += cards.parse_hand("10H")
+    assert (hand.value(), hand.soft()) == (17, False)
+
+    hand.pop()
+    assert (hand.value(), hand.soft()) == (17, True)
+
+    hand[0] = cards.parse_hand("KC")[0]
+    assert (hand.value(), hand.soft()) == (16, False)
+
+    hand.clear()
+    assert (hand.value(), hand.soft()) == (0, False)
+
+def test_valued_hand_copy():
+    hand = rules.ValuedHand(cards.parse_hand("AC 6D"))
+    for copied in [copy(hand), deepcopy(hand)]:
+        assert type(copied) == rules.ValuedHand
+        assert copied == hand
+        assert copied.value() == hand.value()
 
 # /other hand methods
 #######################################################################################
@@ -248,6 +308,7 @@ def test_bet_hand_TWO_ONE(player,dealer,bet,ex):
 ])
 def test_is_natural(hand,ex):
     assert rules.is_natural(hand) == ex
+    assert rules.is_natural(rules.ValuedHand(hand)) == ex
 
 @pytest.mark.parametrize("hand,ex", [
     (helper_hands.hand_blackjack_ace_up(), True),
@@ -261,6 +322,7 @@ def test_is_natural(hand,ex):
 ])
 def test_is_max(hand,ex):
     assert rules.is_max(hand) == ex
+    assert rules.is_max(cards.encode_hand(hand)) == ex
 
 #######################################################################################
 # insurance
@@ -322,6 +384,15 @@ def test_init_split(hand,deck,split_ex,deck_ex):
     assert result_split == split_ex
     assert deck == deck_ex
 
+    # in place, into the same hands it started with
+    hand_in_place = rules.ValuedHand(hand)
+    # the two cards that were dealt, last one dealt first
+    deck_in_place = [split_ex[1][1], split_ex[0][1]]
+    second = rules.ValuedHand()
+    rules.init_split_into(hand_in_place, second, deck_in_place)
+    assert [hand_in_place, second] == split_ex
+    assert [hand_in_place.value(), second.value()] == [rules.hand_value(list(h)) for h in split_ex]
+
 @pytest.mark.parametrize("split,dealer,bet,ex_winnings", [
     # one hand win vs dealer
     ([helper_hands.hand_18_len_2()], helper_hands.hand_2C2D(), 100, 200),
@@ -356,6 +427,31 @@ def test_winnings(split,dealer,bet,ex_winnings):
     (helper_hands.hand_2C2D(), cards.parse_hand("2H 2S 3C 3D 3H 3S 4C")[::-1], cards.parse_hand("2C 2D 2H 2S 3C 3D 3H"), cards.parse_hand("4C 3S")),
 ])
 def test_dealer_play(dealer,deck,dealer_ex,deck_ex):
+    encoded_dealer = cards.encode_hand(dealer)
+    encoded_deck = cards.encode_hand(deck)
+
     rules.dealer_play(dealer,deck)
     assert dealer == dealer_ex
     assert deck == deck_ex
+
+    rules.dealer_play(encoded_dealer, encoded_deck)
+    assert cards.decode_hand(encoded_dealer) == dealer_ex
+    assert cards.decode_hand(encoded_deck) == deck_ex
+
+@pytest.mark.parametrize("dealer,deck,s17_ex,h17_ex", [
+    # soft 17 stands under S17 and hits under H17
+    ("AC6C", "4C", "AC6C", "AC6C4C"),
+    # soft 17 after soft totals below it
+    ("AC2C", "4C 3C", "AC2C4C", "AC2C4C3C"),
+    # hard 17 stands either way
+    ("10C7C", "4C", "10C7C", "10C7C"),
+    # an ace that has to be one makes a hard 17
+    ("AC6C10C", "4C", "AC6C10C", "AC6C10C"),
+    # soft 18 stands either way
+    ("AC7C", "4C", "AC7C", "AC7C"),
+])
+def test_dealer_play_hit_soft_17(dealer, deck, s17_ex, h17_ex):
+    for hit_soft_17, ex in ((False, s17_ex), (True, h17_ex)):
+        hand = cards.parse_hand(dealer)
+        rules.dealer_play(hand, cards.parse_hand(deck)[::-1], hit_soft_17)
+        assert hand == cards.parse_hand(ex)
@@ -0,0 +1,144 @@
+import io
+import threading
+
+import pytest
+
+from blackjack.core import cards, counting, driver, history
+from blackjack.core.history import HandHistoryWriter
+from blackjack.core.io.DealerMimicInput import DealerMimicInput
+from blackjack.core.io.NullOutput import NullOutput
+from blackjack.core.shuffle import Continuous, EveryRounds, Penetration
+from blackjack.core.state import GameState, GameStage
+from blackjack.sim import engine, replay
+from blackjack.sim.shoes import ShoeBatch
+from tests.core.helper_houses import FullPenetrationRules
+from tests.core.mocks_io import ChaosInput
+
+def _state(deck) -> GameState:
+    return GameState(GameStage.COMPLETE, deck, 100, None, None, None, None)
+
+def test_reshuffle_matches_make_seeded_shoe():
+    shoe = cards.make_seeded_shoe(1, 2, 0.75)
+    for _ in range(40):
+        shoe.pop()
+
+    shoe.reshuffle(7)
+    expected = cards.make_seeded_shoe(7, 2, 0.75)
+    assert list(shoe) == list(expected)
+    assert (shoe.cut, shoe.seed, shoe.size) == (expected.cut, 7, 104)
+
+    # and again, reusing its buffer
+    shoe.reshuffle(8)
+    assert list(shoe) == list(cards.make_seeded_shoe(8, 2, 0.75))
+
+def test_reshuffle_needs_whole_decks():
+    with pytest.raises(ValueError):
+        cards.Shoe(cards.CARDS[:10]).reshuffle(1)
+
+def test_counting_shoe_reshuffle_restarts_count():
+    shoe = next(counting.counted([cards.make_seeded_shoe(2, 1)], counting.KO))
+    for _ in range(20):
+        shoe.pop()
+    shoe.reshuffle(3)
+    assert shoe.running_count == counting.KO.initial_count(1)
+    assert shoe.cards_dealt == 0
+    assert len(shoe) == 52
+
+def test_penetration():
+    shoe = cards.make_seeded_shoe(0, 1)
+    policy = Penetration(0.5)
+    for _ in range(25):
+        shoe.pop()
+    assert not policy.due(_state(shoe), 5)
+    shoe.pop()
+    assert policy.due(_state(shoe), 5)
+    with pytest.raises(ValueError):
+        Penetration(0)
+
+def test_every_rounds_and_continuous():
+    shoe = cards.make_seeded_shoe(0, 1)
+    assert not EveryRounds(3).due(_state(shoe), 2)
+    assert EveryRounds(3).due(_state(shoe), 3)
+    assert Continuous().due(_state(shoe), 1)
+    with pytest.raises(ValueError):
+        EveryRounds(0)
+
+def _session(rounds : int, **kwargs):
+    # plays `rounds` rounds of driver_io and returns their records and every deck a round started from
+    stop = threading.Event()
+    writer = HandHistoryWriter(io.BytesIO())
+    decks = []
+
+    class Watch(DealerMimicInput):
+        def input_bet(self, state, reader, writer):
+            decks.append(state.deck)
+            if len(decks) == rounds + 1:
+                stop.set()
+            return super().input_bet(state, reader, writer)
+
+    driver.driver_io(stop, Watch(10, 10_000), NullOutput, None, None, seed=11, history=writer, **kwargs)
+    return history.read_history(writer.sink.getvalue()), decks
+
+def test_driver_io_reuses_its_shoe():
+    records, decks = _session(120)
+    # six decks at 0.75 penetration need a shuffle well within 120 rounds
+    assert len({record.seed for record in records}) > 1
+    assert all(deck is decks[0] for deck in decks)
+    assert replay.replay(records).mismatched == 0
+
+def test_driver_io_shuffle_policies():
+    records, _ = _session(10, shuffle=Continuous())
+    assert len({record.seed for record in records}) == 10
+    assert all(record.remaining == 312 for record in records)
+    assert replay.replay(records).mismatched == 0
+
+    records, _ = _session(9, shuffle=EveryRounds(3))
+    seeds = [record.seed for record in records]
+    assert seeds[0] == seeds[1] == seeds[2] != seeds[3] == seeds[4] == seeds[5] != seeds[6]
+
+def test_simulate_shuffle_policy():
+    # a new shoe every round is the same as dealing the first round of every shoe
+    batch = ShoeBatch(50, 6, seed=0)
+    shuffled = engine.simulate(50, DealerMimicInput(10), shoes=batch, shuffle=Continuous())
+
+    expected = 0
+    for shoe in ShoeBatch(50, 6, seed=0):
+        state = GameState(GameStage.ASK_BET, shoe, 1000, None, None, None, None)
+        engine.play_round(state, DealerMimicInput(10))
+        expected += state.bank - 1000
+    assert shuffled.rounds == 50
+    assert shuffled.net == expected
+
+def test_driver_io_full_penetration():
+    # used to start rounds on a nearly empty shoe and pop from an empty deque
+    stop = threading.Event()
+    writer = HandHistoryWriter(io.BytesIO())
+
+    class Stop(ChaosInput):
+        rounds = 0
+        def input_bank(self, reader, writer):
+            return 10 ** 6
+
+        def input_bet(self, state, reader, writer):
+            Stop.rounds += 1
+            if Stop.rounds == 500:
+                stop.set()
+            return super().input_bet(state, reader, writer)
+
+    driver.driver_io(stop, Stop(0), NullOutput, None, None, FullPenetrationRules, seed=0, history=writer)
+    records = history.read_history(writer.sink.getvalue())
+    assert len(records) >= 499
+    assert all(record.remaining >= 0 for record in records)
+
+class NeverShuffleRules(FullPenetrationRules):
+    # a house of its own that never shuffles, so only cards.is_low() can
+    @staticmethod
+    def shuffle_pred(state, *args) -> bool:
+        return False
+
+@pytest.mark.parametrize("house,shuffle", [(FullPenetrationRules, None), (FullPenetrationRules, EveryRounds(10 ** 6)), (NeverShuffleRules, None)])
+def test_simulate_never_runs_dry(house, shuffle):
+    # neither the cut card, the house nor the policy would shuffle in time
+    result = engine.simulate(1000, ChaosInput(1), house, bank=10 ** 6, shuffle=shuffle,
+                             shoes=ShoeBatch(1000, 1, seed=1, penetration=1.0))
+    assert result.rounds == 1000
@@ -0,0 +1,49 @@
+from blackjack.core import cards
+from blackjack.core.state import GameState, GameStage, MAX_HANDS
+
+def test_reset():
+    deck = cards.make_deck_ordered()
+    state = GameState(GameStage.COMPLETE, deck, 456, 0, [cards.parse_hand("10C 8D")], 1, cards.parse_hand("AC 6D"))
+    state.reset()
+    assert state == GameState(GameStage.ASK_BET, deck, 456, None, None, None, None)
+    assert state.deck is deck
+
+def test_buffers_reused_and_emptied():
+    state = GameState(GameStage.ASK_BET, None, 100, None, None, None, None)
+
+    hands = [state.fresh_hand(i) for i in range(MAX_HANDS)]
+    for hand in hands:
+        hand.append(cards.CARDS[0])
+    dealer = state.fresh_dealer()
+    dealer.append(cards.CARDS[1])
+    player = state.fresh_player()
+    player.extend(hands)
+
+    assert [state.fresh_hand(i) for i in range(MAX_HANDS)] == [[], []]
+    assert all(state.fresh_hand(i) is hands[i] for i in range(MAX_HANDS))
+    assert state.fresh_hand(0).value() == 0
+    assert state.fresh_dealer() is dealer and dealer == []
+    assert state.fresh_player() is player and player == []
+
+def test_fresh_deal():
+    state = GameState(GameStage.ASK_BET, None, 100, None, None, None, None)
+    hand = state.fresh_hand(0)
+    hand.append(cards.CARDS[0])
+    dealer = state.fresh_dealer()
+    dealer.append(cards.CARDS[1])
+    player = state.fresh_player()
+    player.append(hand)
+
+    assert state.fresh_deal() == ([], [], [])
+    player_again, hand_again, dealer_again = state.fresh_deal()
+    assert player_again is player and hand_again is hand and dealer_again is dealer
+    assert (hand.hard, hand.aces, dealer.hard, dealer.aces) == (0, 0, 0, 0)
+
+def test_buffers_not_part_of_value():
+    a = GameState(GameStage.ASK_BET, None, 100, None, None, None, None)
+    b = GameState(GameStage.ASK_BET, None, 100, None, None, None, None)
+    a.fresh_dealer().append(cards.CARDS[0])
+    assert a == b
+    assert "_dealer" not in repr(a)
+    # slotted
+    assert not hasattr(a, "__dict__")
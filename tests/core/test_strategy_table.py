@@ -0,0 +1,77 @@
+import pytest
+
+from blackjack.core import cards, constants
+from blackjack.core.StrategyTable import StrategyTable, TABLE_SIZE, card_index, index
+from blackjack.core.io.StrategyInput import StrategyInput
+from blackjack.core.state import GameState, GameStage, PlayerAction
+
+from tests.core import helper_hands
+
+def test_index_unique_and_in_bounds():
+    seen = set()
+    for later in (False, True):
+        for soft in (False, True):
+            for pair in range(11):
+                for upcard in range(1, 11):
+                    for total in range(constants.MAX_HAND_VALUE + 1):
+                        i = index(later, soft, pair, upcard, total)
+                        assert 0 <= i < TABLE_SIZE
+                        seen.add(i)
+    assert len(seen) == 2 * 2 * 11 * 10 * (constants.MAX_HAND_VALUE + 1)
+
+def test_card_index():
+    assert card_index(cards.Card(cards.Rank.ACE, cards.Suit.SPADE)) == 1
+    assert card_index(cards.Card(cards.Rank.SEVEN, cards.Suit.HEART)) == 7
+    assert card_index(cards.Card(cards.Rank.KING, cards.Suit.CLUB)) == 10
+
+def test_set_and_look_up():
+    table = StrategyTable()
+    assert table.action(False, False, 0, 6, 11) == PlayerAction.STAY
+
+    table.set(False, False, 0, 6, 11, PlayerAction.DOUBLE)
+    table.set(False, False, 8, 6, 16, PlayerAction.HIT, split=True)
+    assert table.action(False, False, 0, 6, 11) == PlayerAction.DOUBLE
+    assert table.action(False, False, 8, 6, 16) == PlayerAction.HIT
+    assert table.split(False, 8, 6, 16)
+    assert not table.split(False, 0, 6, 11)
+    # the other half of the table is untouched
+    assert table.action(True, False, 0, 6, 11) == PlayerAction.STAY
+
+def test_bytes_round_trip(tmp_path):
+    table = StrategyTable(insurance=True, name="TraditionalRules")
+    table.set(True, True, 0, 1, 18, PlayerAction.HIT)
+
+    assert StrategyTable.from_bytes(table.to_bytes()) == table
+
+    path = tmp_path / "traditional.bjst"
+    table.save(path)
+    assert StrategyTable.load(path) == table
+    assert path.stat().st_size < TABLE_SIZE + 64
+
+@pytest.mark.parametrize("data", [
+    b"nope" + bytes(TABLE_SIZE),
+    b"BJST" + bytes([99, 0, 0]) + bytes(TABLE_SIZE),
+    b"BJST" + bytes([1, 0, 0]) + bytes(TABLE_SIZE - 1),
+])
+def test_from_bytes_invalid(data):
+    with pytest.raises(ValueError):
+        StrategyTable.from_bytes(data)
+
+def test_strategy_input():
+    table = StrategyTable(insurance=True)
+    # hand_17_len_2 is a soft 17
+    table.set(False, True, 0, 10, 17, PlayerAction.DOUBLE)
+    table.set(True, True, 0, 10, 17, PlayerAction.HIT)
+    table.set(False, False, 2, 10, 4, PlayerAction.HIT, split=True)
+
+    inputs = StrategyInput(table, 5)
+    state = GameState(GameStage.PLAYER_ACTIONS, [], 3, 1, [helper_hands.hand_17_len_2()], 0, cards.parse_hand("KC 2D"))
+
+    assert inputs.input_bet(state, None, None) == 3
+    assert inputs.input_hit_stay_double(state, None, None) == PlayerAction.DOUBLE
+    assert inputs.input_hit(state, None, None) == PlayerAction.HIT
+    assert inputs.input_want_insurance(state, None, None)
+    assert not inputs.input_want_split(state, None, None)
+
+    state.player = [helper_hands.hand_2C2D()]
+    assert inputs.input_want_split(state, None, None)
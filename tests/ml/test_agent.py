@@ -0,0 +1,128 @@
+import io
+import threading
+
+import numpy as np
+import pytest
+
+from blackjack.analysis import strategy
+from blackjack.core import driver
+from blackjack.core.StrategyTable import PAIRS, SOFTS, UPCARDS
+from blackjack.core.casino import EUROPEAN, TraditionalRules
+from blackjack.core.history import HandHistoryWriter
+from blackjack.core.io.NullOutput import NullOutput
+from blackjack.core.io.StrategyInput import StrategyInput
+from blackjack.core.state import PlayerAction
+from blackjack.ml import agent as ml_agent
+from blackjack.ml.agent import NUM_ACTIONS, TabularAgent
+from blackjack.ml.env import SPLIT, BlackjackEnv
+from blackjack.sim import engine
+
+@pytest.fixture(scope="module")
+def reference():
+    return strategy.solve_table(TraditionalRules)
+
+@pytest.fixture(scope="module")
+def trained():
+    agent = TabularAgent(seed=0)
+    agent.train(BlackjackEnv(1024, seed=0), 1500, epsilon=0.2, check_every=1500)
+    return agent
+
+def _teach(agent, table):
+    # Q values that make table the greedy policy, over every state of the table: the split best, then the first action, then the later one
+    for soft in range(SOFTS):
+        for pair in range(PAIRS):
+            for upcard in range(1, UPCARDS):
+                for total in range(4, 22):
+                    q = agent.sums[total, soft, pair, upcard]
+                    agent.visits[total, soft, pair, upcard] = 1
+                    q[table.action(True, soft, pair, upcard, total).value] = 0.25
+                    q[table.action(False, soft, pair, upcard, total).value] = 0.5
+                    if pair and table.split(soft, pair, upcard, total):
+                        q[SPLIT] = 1
+
+def test_learn_averages():
+    agent = TabularAgent()
+    decisions = np.array([[3, 5, 0], [3, 0, 0], [7, 7, 7]])
+    agent.learn(decisions, [2, 1, 3], [1.0, -2.0, 0.5])
+
+    q = agent.q_values().reshape(-1)
+    assert q[3] == -0.5
+    assert q[5] == 1.0
+    # every visit counts
+    assert q[7] == 0.5
+    assert agent.visits.reshape(-1)[7] == 3
+    assert q[0] == -np.inf
+
+def test_act_is_legal():
+    agent = TabularAgent(seed=1)
+    env = BlackjackEnv(2000, seed=1)
+    obs = env.reset()
+    legal = ml_agent.legal_actions(obs)
+    for epsilon in (0.0, 1.0):
+        actions, cells = agent.act(obs, epsilon)
+        assert np.all(legal[np.arange(env.num_tables), actions])
+        assert np.all(cells % NUM_ACTIONS == actions)
+        assert np.all(cells // NUM_ACTIONS == ml_agent.state_index(obs))
+    # exploring tries everything that's legal
+    assert set(actions) == {PlayerAction.STAY.value, PlayerAction.HIT.value, PlayerAction.DOUBLE.value, SPLIT}
+    # with nothing learned the greedy choice is to stay
+    assert np.all(agent.act(obs)[0] == PlayerAction.STAY.value)
+
+def test_policy_table_exports(reference):
+    agent = TabularAgent()
+    _teach(agent, reference)
+    table = agent.policy_table(reference.name)
+    assert table == reference
+    assert agent.agreement(reference) == (1.0, 1.0)
+
+def test_training_converges(trained, reference):
+    agreement, weighted = trained.agreement(reference)
+    assert agreement > 0.8
+    assert weighted > 0.85
+
+def test_training_reports(tmp_path, reference):
+    agent = TabularAgent(seed=2)
+    reported = []
+    checkpoint = tmp_path / "agent.npz"
+    progress = agent.train(BlackjackEnv(256, seed=2), 250, check_every=100, reference=reference, report=reported.append, checkpoint=checkpoint)
+
+    assert progress == reported
+    assert [p.steps for p in progress] == [100, 200, 250]
+    assert all(p.rounds > 0 and p.agreement is not None for p in progress)
+    # the checkpoint is the agent as it ended
+    loaded = TabularAgent.load(checkpoint)
+    assert np.array_equal(loaded.sums, agent.sums)
+    assert np.array_equal(loaded.visits, agent.visits)
+
+def test_load_rejects_other_shapes(tmp_path):
+    path = tmp_path / "bad.npz"
+    np.savez(path, sums=np.zeros(3), visits=np.zeros(3))
+    with pytest.raises(ValueError):
+        TabularAgent.load(path)
+
+def test_train_rejects_other_house():
+    with pytest.raises(ValueError):
+        TabularAgent(EUROPEAN).train(BlackjackEnv(4), 1)
+
+def test_exported_policy_plays(trained, reference):
+    inputs = trained.input_provider(bet=2)
+    assert isinstance(inputs, StrategyInput)
+    assert inputs.table.name == "TraditionalRules"
+
+    # plays about as well as the chart it learned towards
+    result = engine.simulate(50_000, inputs, seed=0)
+    chart = engine.simulate(50_000, StrategyInput(reference, bet=2), seed=0)
+    assert result.ev_per_unit() > chart.ev_per_unit() - 0.03
+
+def test_exported_policy_drives_the_game(trained):
+    stop = threading.Event()
+    rounds = []
+
+    class Count(HandHistoryWriter):
+        def end_round(self, state):
+            rounds.append(state.bank)
+            if len(rounds) == 100:
+                stop.set()
+
+    driver.driver_io(stop, trained.input_provider(bet=2, bank=10 ** 6), NullOutput, None, None, seed=0, history=Count(io.BytesIO()))
+    assert len(rounds) == 100
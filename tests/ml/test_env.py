@@ -0,0 +1,200 @@
+import numpy as np
+import pytest
+
+from blackjack.core import cards, constants, rules
+from blackjack.core.StrategyTable import card_index
+from blackjack.core.casino import EUROPEAN, VEGAS_STRIP, HitSoft17Rules, SixFiveRules, TraditionalRules
+from blackjack.core.counting import KO
+from blackjack.core.io.DealerMimicInput import DealerMimicInput
+from blackjack.core.io.InputProvider import InputProvider
+from blackjack.core.state import GameStage, PlayerAction
+from blackjack.ml.env import SPLIT, BlackjackEnv
+from blackjack.sim import engine
+from blackjack.sim.shoes import make_shoes
+from tests.core.helper_houses import FullPenetrationRules
+
+def policy(total, soft, pair, upcard, can_double):
+    # plays a bit of everything, and splits without looking at can_double so that the game asking about splits and doubles apart answers the same
+    weak = (upcard >= 2) & (upcard <= 6)
+    split = (pair > 0) & (weak | (pair == 1) | (pair == 8))
+    double = can_double & (((total >= 9) & (total <= 11)) | (soft & (total >= 15) & (total <= 18) & (upcard >= 3)))
+    hit = (total < 12) | ((total < 17) & ~weak) | (soft & (total < 18))
+    return np.where(split, SPLIT, np.where(double, PlayerAction.DOUBLE.value, np.where(hit, PlayerAction.HIT.value, PlayerAction.STAY.value)))
+
+class PolicyInput(InputProvider):
+    # policy() asked by the game
+    def __init__(self, bet : int):
+        self.bet = bet
+
+    def input_bank(self, reader, writer) -> int:
+        return 0
+
+    def input_bet(self, state, reader, writer) -> int:
+        return self.bet
+
+    def _action(self, state, pair : int, can_double : bool) -> int:
+        hand = state.player[state.current_hand]
+        return int(policy(rules.hand_value(hand), rules.is_soft(hand), pair, card_index(state.dealer[0]), can_double))
+
+    def input_hit(self, state, reader, writer) -> PlayerAction:
+        return PlayerAction(self._action(state, 0, False))
+
+    def input_hit_stay_double(self, state, reader, writer) -> PlayerAction:
+        return PlayerAction(self._action(state, 0, True))
+
+    def input_want_split(self, state, reader, writer) -> bool:
+        return self._action(state, card_index(state.player[0][0]), False) == SPLIT
+
+    def input_want_insurance(self, state, reader, writer) -> bool:
+        return False
+
+def _recorded_env(num_tables : int, house, seed : int):
+    # keeps every shoe each table gets so the game can be dealt the same ones
+    rng = np.random.default_rng(seed)
+    dealt = [[] for _ in range(num_tables)]
+
+    def source(tables):
+        shoes = make_shoes(len(tables), house.num_decks(), rng)
+        for table, shoe in zip(tables, shoes):
+            dealt[table].append(shoe)
+        return shoes
+
+    return BlackjackEnv(num_tables, house, bet=10, shoes=source), dealt
+
+# a shoe dealt to the last card is shuffled once a round could run it dry, by both
+@pytest.mark.parametrize("house", [TraditionalRules, HitSoft17Rules, SixFiveRules, VEGAS_STRIP, EUROPEAN, FullPenetrationRules])
+def test_env_matches_engine(house):
+    env, dealt = _recorded_env(40, house, seed=0)
+    obs = env.reset()
+    splits = doubles = 0
+    for _ in range(600):
+        actions = policy(obs.total, obs.soft, obs.pair, obs.upcard, obs.can_double)
+        splits += np.sum(actions == SPLIT)
+        doubles += np.sum(actions == PlayerAction.DOUBLE.value)
+        obs = env.step(actions).observation
+    assert splits and doubles
+
+    for table in range(env.num_tables):
+        shoes = [cards.Shoe((cards.CARDS[code] for code in shoe[::-1].tolist()), env.cut) for shoe in dealt[table]]
+        result = engine.simulate(int(env.rounds[table]), PolicyInput(10), house, shoes=shoes, bank=10 ** 9)
+        assert result.rounds == env.rounds[table]
+        assert result.net == env.net[table], table
+
+def test_rewards_add_up():
+    env = BlackjackEnv(64, seed=1)
+    obs = env.reset()
+    start = env.net.copy()
+    total = np.zeros(env.num_tables)
+    for _ in range(300):
+        step = env.step(policy(obs.total, obs.soft, obs.pair, obs.upcard, obs.can_double))
+        obs = step.observation
+        assert np.all(step.reward[~step.done] == 0)
+        total += step.reward + step.passive
+    assert np.allclose(total * env.base_bet, env.net - start)
+
+def test_dealer_mimic_ev():
+    # the same policy as DealerMimicInput, in the env and in the engine, within a few standard errors
+    env = BlackjackEnv(2000, seed=2)
+    obs = env.reset()
+    for _ in range(400):
+        obs = env.step(np.where(obs.total < constants.DEALER_STOP, PlayerAction.HIT.value, PlayerAction.STAY.value)).observation
+    env_ev = env.net.sum() / env.base_bet / env.rounds.sum()
+
+    # a bet of one chip would pay a natural 1:1
+    result = engine.simulate(200_000, DealerMimicInput(bet=env.base_bet), seed=2)
+    assert abs(env_ev - result.ev_per_unit()) < 0.015
+
+def test_observation():
+    env = BlackjackEnv(500, seed=3)
+    obs = env.reset()
+    assert np.all((obs.total >= 4) & (obs.total <= 20))
+    assert np.all((obs.upcard >= 1) & (obs.upcard <= 10))
+    assert np.all(obs.can_double)
+    assert np.all((obs.pair > 0) == (obs.stage == GameStage.ASK_SPLIT.value))
+    assert np.all((obs.stage == GameStage.ASK_SPLIT.value) | (obs.stage == GameStage.PLAYER_ACTIONS.value))
+    # a soft hand under 21 counts an ace as eleven
+    assert np.all(obs.total[obs.soft] >= 12)
+
+    obs, _, done, _ = env.step(np.full(env.num_tables, PlayerAction.HIT.value))
+    continuing = ~done
+    assert continuing.any()
+    assert np.all(env.num_cards[continuing, 0] == 3)
+    assert not np.any(obs.can_double[continuing])
+    assert not np.any(obs.pair[continuing])
+
+def test_true_count():
+    # a running count of everything seen, with the dealer's second card unseen until the round ends
+    env = BlackjackEnv(300, seed=4, count=KO)
+    env.reset()
+    weights = np.array([KO.weights[card[0]] for card in cards.CARDS])
+    expected = KO.initial_count(6) + np.array([
+        weights[env.shoes[table, :env.positions[table]]].sum() - weights[env.hole[table]]
+        for table in range(env.num_tables)
+    ])
+    assert list(env.running_count) == list(expected)
+    assert np.allclose(env.true_count(), env.running_count / ((env.shoe_size - env.positions) / constants.DECK_SIZE))
+
+def test_split_and_double_bets():
+    env = BlackjackEnv(2000, seed=5)
+    obs = env.reset()
+    pairs = np.flatnonzero(obs.pair > 0)
+    assert len(pairs)
+
+    actions = np.where(obs.pair > 0, SPLIT, PlayerAction.STAY.value)
+    obs = env.step(actions).observation
+    assert np.all(env.num_hands[pairs] == 2)
+    assert np.all(env.bets[pairs] == 2 * env.base_bet)
+    assert np.all(env.num_cards[pairs] == 2)
+
+    # doubling one split hand doubles the whole bet, like state.bet
+    doubling = pairs[obs.can_double[pairs]]
+    actions = np.where(obs.can_double, PlayerAction.DOUBLE.value, PlayerAction.STAY.value)
+    env.step(actions)
+    assert np.all(env.bets[doubling] == 4 * env.base_bet)
+    assert np.all(env.current_hand[doubling] == 1)
+
+def test_no_double_after_split():
+    env = BlackjackEnv(2000, EUROPEAN, seed=6)
+    obs = env.reset()
+    obs = env.step(np.where(obs.pair > 0, SPLIT, PlayerAction.STAY.value)).observation
+    assert not np.any(obs.can_double[env.num_hands == 2])
+
+def test_rejects_illegal_actions():
+    env = BlackjackEnv(500, EUROPEAN, seed=7)
+    obs = env.reset()
+    position = env.positions.copy()
+
+    with pytest.raises(ValueError):
+        env.step(np.full(env.num_tables, SPLIT))
+    with pytest.raises(ValueError):
+        env.step(np.full(env.num_tables, PlayerAction.DOUBLE.value))
+    with pytest.raises(ValueError):
+        env.step(np.full(env.num_tables, 7))
+    with pytest.raises(ValueError):
+        env.step(np.zeros(3))
+    # nothing was played
+    assert np.all(env.positions == position)
+
+    env.step(np.where(obs.can_double, PlayerAction.DOUBLE.value, PlayerAction.STAY.value))
+
+def test_reshuffles_at_the_cut():
+    env = BlackjackEnv(10, seed=8)
+    env.reset()
+    shuffles = np.zeros(env.num_tables, dtype=np.int64)
+    for _ in range(500):
+        before = env.positions.copy()
+        env.step(np.full(env.num_tables, PlayerAction.STAY.value))
+        # a new shoe only once the cut card came out, never mid-round
+        shuffled = env.positions < before
+        assert np.all(env.shoe_size - before[shuffled] <= env.cut + 2 * constants.MAX_HAND_LEN)
+        shuffles += shuffled
+    # staying, a round takes around five cards, so 500 rounds go through a few 234 card stretches
+    assert np.all(shuffles >= 5)
+
+def test_bad_arguments():
+    with pytest.raises(ValueError):
+        BlackjackEnv(0)
+    with pytest.raises(ValueError):
+        BlackjackEnv(1, bet=0)
+    with pytest.raises(ValueError):
+        BlackjackEnv(2, shoes=lambda tables: make_shoes(len(tables), 1)).reset()
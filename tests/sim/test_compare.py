@@ -0,0 +1,75 @@
+import pytest
+
+from blackjack.core import cards, counting
+from blackjack.core.counting import CountingShoe
+from blackjack.core.io.DealerMimicInput import DealerMimicInput
+from blackjack.sim import compare
+from blackjack.sim.compare import Candidate
+from blackjack.sim.stats import Converged
+from tests.core.helper_houses import EvenMoneyRules
+from tests.core.mocks_io import ChaosInput
+
+def test_seeded_shoes():
+    shoes = compare.seeded_shoes(4, 2, 0.5)
+    first, second = next(shoes), next(shoes)
+    assert list(first) != list(second)
+    assert list(first) == list(cards.make_seeded_shoe(first.seed, 2, 0.5))
+    assert first.cut == second.cut == 52
+
+def test_against_itself_has_no_variance():
+    result = compare.compare(2000, Candidate(DealerMimicInput(10)), Candidate(DealerMimicInput(10)), seed=1)
+
+    assert result.rounds == 2000
+    assert result.a.net == result.b.net
+    assert result.diff.net == 0
+    assert result.diff.m2 == 0.0
+    assert result.diff.pushes == 2000
+    assert result.variance_reduction() == float("inf")
+
+def test_house_variants_differ_only_on_naturals():
+    # paying naturals 1:1 can only ever cost the player, and only on the rounds with a natural
+    result = compare.compare(3000, Candidate(DealerMimicInput(10)), Candidate(DealerMimicInput(10), EvenMoneyRules), seed=2)
+
+    assert result.diff.losses == 0
+    assert 0 < result.diff.wins < result.rounds / 10
+    assert result.diff.net == result.a.net - result.b.net
+    assert result.ev_difference() > 0
+    assert result.variance_reduction() > 10
+
+def test_pairing_reduces_variance():
+    result = compare.compare(5000, Candidate(ChaosInput(0)), Candidate(DealerMimicInput(10)), seed=3)
+    assert result.diff.unit_half_width() < result.independent_half_width()
+    assert result.variance_reduction() > 1
+
+def test_reproducible():
+    a = compare.compare(1000, Candidate(ChaosInput(5)), Candidate(DealerMimicInput(10)), seed=4)
+    b = compare.compare(1000, Candidate(ChaosInput(5)), Candidate(DealerMimicInput(10)), seed=4)
+    assert (a.a, a.b, a.diff) == (b.a, b.b, b.diff)
+
+def test_stops_early():
+    result = compare.compare(10 ** 7, Candidate(DealerMimicInput(10)), Candidate(DealerMimicInput(10), EvenMoneyRules), stop=Converged(0.01, min_rounds=500), check_every=500)
+    assert result.rounds < 10 ** 7
+    assert result.rounds % 500 == 0
+    assert result.diff.unit_half_width() <= 0.01
+
+def test_bad_check_every():
+    with pytest.raises(ValueError):
+        compare.compare(10, Candidate(DealerMimicInput(10)), Candidate(DealerMimicInput(10)), check_every=0)
+
+def test_candidates_play_the_shoes_type():
+    # each candidate deals from a CountingShoe of its own, and both have counted every card by the end of each round
+    counts = []
+
+    class Counts(DealerMimicInput):
+        def input_bet(self, state, reader, writer):
+            assert type(state.deck) is CountingShoe
+            counts.append((state.deck.cards_dealt, state.deck.running_count))
+            return super().input_bet(state, reader, writer)
+
+    shoes = counting.counted(compare.seeded_shoes(6, 2, 0.75))
+    result = compare.compare(500, Candidate(Counts(10)), Candidate(Counts(10), EvenMoneyRules), shoes=shoes)
+
+    assert result.rounds == 500
+    # a's and b's bets alternate, from the same point of the same shoe
+    assert counts[0::2] == counts[1::2]
+    assert any(dealt > 0 for dealt, _ in counts)
@@ -0,0 +1,68 @@
+from array import array
+
+import numpy as np
+import pytest
+
+from blackjack.core import cards, rules
+from blackjack.sim import dealer
+from blackjack.sim.shoes import make_shoes
+
+def _scalar(row, start, hit_soft_17):
+    # rules.dealer_play() on the first `start` cards of a row, drawing from the rest
+    hand = array(cards.ENCODED_TYPECODE, row[:start].tobytes())
+    deck = array(cards.ENCODED_TYPECODE, row[start:][::-1].tobytes())
+    rules.dealer_play(hand, deck, hit_soft_17)
+    return rules.hand_value(hand), len(hand) - start
+
+@pytest.mark.parametrize("hit_soft_17", [False, True])
+@pytest.mark.parametrize("start", [1, 2])
+def test_play_dealers_matches_dealer_play(hit_soft_17, start):
+    shoes = make_shoes(2000, 1, seed=3)
+    hard, aces = dealer.hand_state(shoes[:, :start])
+    result = dealer.play_dealers(hard, aces, shoes, start, hit_soft_17)
+
+    expected = [_scalar(row, start, hit_soft_17) for row in shoes]
+    assert result.values.tolist() == [value for value, _ in expected]
+    assert result.drawn.tolist() == [drawn for _, drawn in expected]
+    assert (result.positions == start + result.drawn).all()
+
+def test_soft_17():
+    shoes = np.array([[cards.encode_card(card) for card in cards.parse_hand(hs)] for hs in ("AC6C5C", "10C7C5C", "AC6C10C")], dtype=np.int8)
+    hard, aces = dealer.hand_state(shoes[:, :2])
+
+    stand = dealer.play_dealers(hard, aces, shoes, 2)
+    assert stand.values.tolist() == [17, 17, 17]
+    assert stand.drawn.tolist() == [0, 0, 0]
+
+    # only soft 17 hits. A,6,5 is a hard 12 and keeps going off the end of the row
+    with pytest.raises(ValueError):
+        dealer.play_dealers(hard, aces, shoes, 2, hit_soft_17=True)
+    hit = dealer.play_dealers(hard[1:], aces[1:], shoes[1:], 2, hit_soft_17=True)
+    assert hit.values.tolist() == [17, 17]
+    assert hit.drawn.tolist() == [0, 1]
+
+def test_play_dealers_rows():
+    # dealers drawing from chosen rows of a batch play the same as from those rows gathered
+    shoes = make_shoes(50, 1, seed=4)
+    rows = np.array([7, 3, 3, 41, 0])
+    hard, aces = dealer.hand_state(shoes[rows, :2])
+    gathered = dealer.play_dealers(hard, aces, shoes[rows], 2, True)
+    chosen = dealer.play_dealers(hard, aces, shoes, 2, True, rows=rows)
+    assert all((a == b).all() for a, b in zip(gathered, chosen))
+
+    with pytest.raises(ValueError):
+        dealer.play_dealers(hard, aces, shoes, 2, rows=rows[:3])
+    with pytest.raises(ValueError):
+        dealer.play_dealers(hard, aces, shoes, 2, rows=rows + 10)
+
+def test_play_dealers_leaves_arguments():
+    shoes = make_shoes(10, 1, seed=0)
+    hard, aces = dealer.hand_state(shoes[:, :2])
+    positions = np.full(10, 2)
+    before = hard.copy(), aces.copy(), positions.copy()
+    dealer.play_dealers(hard, aces, shoes, positions)
+    assert all((a == b).all() for a, b in zip((hard, aces, positions), before))
+
+def test_play_dealers_mismatched():
+    with pytest.raises(ValueError):
+        dealer.play_dealers([10, 10], [False, False], make_shoes(3, 1, seed=0), 0)
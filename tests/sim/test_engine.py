@@ -0,0 +1,125 @@
+
+import pytest
+
+from blackjack.core import cards, constants, driver, rules
+from blackjack.core.casino import EUROPEAN, VEGAS_STRIP, HitSoft17Rules, TableRules, TraditionalRules, compile_rules
+from blackjack.core.exception.StupidProgrammerException import StupidProgrammerException
+from blackjack.core.io.DealerMimicInput import DealerMimicInput
+from blackjack.core.io.InputProvider import InputProvider
+from blackjack.core.io.NullOutput import NullOutput
+from blackjack.core.state import GameState, GameStage, PlayerAction
+from blackjack.sim import engine
+from blackjack.sim.shoes import ShoeBatch
+from tests.core.mocks_io import ChaosInput
+
+def play_transitions(state : GameState, inputs : InputProvider):
+    # one round through the real state machine
+    while True:
+        driver.transition_logic(state, inputs, NullOutput, None, None)
+        if state.stage == GameStage.ASK_BET:
+            return
+
+@pytest.mark.parametrize("house", [TraditionalRules, HitSoft17Rules, VEGAS_STRIP, EUROPEAN, TableRules("no insurance", insurance=False)])
+@pytest.mark.parametrize("policy_seed", range(4))
+def test_play_round_matches_transition_logic(policy_seed, house):
+    batch = ShoeBatch(20, 2, seed=policy_seed, penetration=0.75)
+    expected_inputs = ChaosInput(policy_seed)
+    actual_inputs = ChaosInput(policy_seed)
+
+    for i in range(len(batch)):
+        expected = GameState(GameStage.ASK_BET, batch[i], 10_000, None, None, None, None, compile_rules(house))
+        actual = GameState(GameStage.ASK_BET, batch[i], 10_000, None, None, None, None, compile_rules(house))
+
+        while not expected.deck.is_cut():
+            play_transitions(expected, expected_inputs)
+            engine.play_round(actual, actual_inputs)
+            assert actual == expected
+
+@pytest.mark.parametrize("house,soft_17_stands", [(TraditionalRules, True), (HitSoft17Rules, False)])
+def test_play_round_hit_soft_17(house, soft_17_stands):
+    # the dealer's hand stays in the state's buffer after the round
+    soft_17s = 0
+    for shoe in ShoeBatch(5, 6, seed=0, penetration=0.75):
+        state = GameState(GameStage.ASK_BET, shoe, 10_000, None, None, None, None)
+        while not state.deck.is_cut():
+            engine.play_round(state, DealerMimicInput(1), house)
+            soft_17s += state._dealer.value() == constants.DEALER_STOP and state._dealer.soft()
+    assert (soft_17s > 0) == soft_17_stands
+
+def test_play_round_returns_initial_bet():
+    deck = [cards.CARDS[9], cards.CARDS[8], cards.CARDS[7], cards.CARDS[6]] * 4
+    state = GameState(GameStage.ASK_BET, deck, 100, None, None, None, None)
+    assert engine.play_round(state, DealerMimicInput(25)) == 25
+    assert state.stage == GameStage.ASK_BET
+
+class StayInput(DealerMimicInput):
+    def input_hit(self, state, reader, writer) -> PlayerAction:
+        return PlayerAction.STAY
+
+@pytest.mark.parametrize("house", [TraditionalRules, HitSoft17Rules])
+def test_play_round_bounds_dealer(monkeypatch, house):
+    # a dealer who never stands would take the whole shoe. like rules.dealer_play() it gives up past the longest hand there can be.
+    monkeypatch.setattr(constants, "DEALER_STOP", 100)
+    deck = [cards.CARDS[1]] * 40
+    state = GameState(GameStage.ASK_BET, deck, 100, None, None, None, None)
+    with pytest.raises(StupidProgrammerException):
+        engine.play_round(state, StayInput(1), house)
+    assert len(deck) >= 40 - 2 - constants.MAX_HAND_LEN
+
+def test_simulate_reproducible():
+    a = engine.simulate(2000, DealerMimicInput(10), seed=3)
+    b = engine.simulate(2000, DealerMimicInput(10), seed=3)
+    c = engine.simulate(2000, DealerMimicInput(10), seed=4)
+
+    assert a.rounds == 2000
+    assert a.wagered == 2000 * 10
+    assert a[:5] == b[:5]
+    assert a.net != c.net
+    assert a.low <= min(0, a.net) and a.high >= max(0, a.net)
+
+def test_simulate_matches_shoes():
+    # a given sequence of shoes plays out the same whether rounds go one at a time or through simulate
+    batch = ShoeBatch(10, 6, seed=0, penetration=TraditionalRules.penetration())
+    result = engine.simulate(10 ** 6, DealerMimicInput(10), shoes=batch)
+
+    state = GameState(GameStage.ASK_BET, None, engine.UNLIMITED_BANK, None, None, None, None)
+    rounds = 0
+    for shoe in batch:
+        state.deck = shoe
+        while True:
+            play_transitions(state, DealerMimicInput(10))
+            rounds += 1
+            if TraditionalRules.shuffle_pred(state):
+                break
+
+    # stops when the shoes run out
+    assert result.rounds == rounds
+    assert result.net == state.bank - engine.UNLIMITED_BANK
+
+def test_simulate_stops_when_broke():
+    result = engine.simulate(10 ** 6, DealerMimicInput(10), bank=100)
+    assert result.rounds < 10 ** 6
+    assert result.net + 100 < constants.MIN_BET
+    assert result.low == result.net
+
+def test_simulate_ev_reasonable():
+    # mimicking the dealer loses about five percent at a casino. here both busting pushes and naturals pay 3:2, so the same play is ahead, and by less than the best strategy is.
+    result = engine.simulate(50_000, DealerMimicInput(10), seed=0)
+    assert 0.0 < result.ev_per_unit() < 0.05
+    assert result.rounds_per_second() > 0
+
+def test_dealer_mimic_input():
+    inputs = DealerMimicInput(25)
+    state = GameState(GameStage.PLAYER_ACTIONS, [], 10, 25, [rules.ValuedHand([cards.CARDS[9], cards.CARDS[5]])], 0, None)
+
+    assert inputs.input_bet(state, None, None) == 10
+    assert inputs.input_hit(state, None, None) == PlayerAction.HIT
+    assert inputs.input_hit_stay_double(state, None, None) == PlayerAction.HIT
+    assert not inputs.input_want_split(state, None, None)
+    assert not inputs.input_want_insurance(state, None, None)
+
+    state.player[0].append(cards.CARDS[0])
+    assert inputs.input_hit(state, None, None) == PlayerAction.STAY
+
+    with pytest.raises(ValueError):
+        DealerMimicInput(constants.MIN_BET - 1)
@@ -0,0 +1,51 @@
+import pytest
+
+from blackjack.core.io.DealerMimicInput import DealerMimicInput
+from blackjack.sim import engine, parallel
+
+def test_chunk_sizes():
+    assert parallel.chunk_sizes(10, 3) == [3, 3, 3, 1]
+    assert parallel.chunk_sizes(9, 3) == [3, 3, 3]
+    assert parallel.chunk_sizes(0, 3) == []
+    with pytest.raises(ValueError):
+        parallel.chunk_sizes(10, 0)
+
+def test_chunk_seeds():
+    assert parallel.chunk_seeds(1, 5) == parallel.chunk_seeds(1, 5)
+    # asking for more chunks doesn't change the earlier ones
+    assert parallel.chunk_seeds(1, 8)[:5] == parallel.chunk_seeds(1, 5)
+    assert len(set(parallel.chunk_seeds(1, 100))) == 100
+    assert parallel.chunk_seeds(1, 5) != parallel.chunk_seeds(2, 5)
+
+def test_same_result_for_any_worker_count():
+    results = [
+        parallel.simulate_parallel(5000, DealerMimicInput(10), seed=7, workers=workers, chunk_rounds=1000)
+        for workers in (1, 2, 3)
+    ]
+    for result in results:
+        assert result.chunks == 5
+        assert result.result.rounds == 5000
+        # everything but the time
+        assert result.result[:5] == results[0].result[:5]
+
+def test_chunks_combine_in_order():
+    result = parallel.simulate_parallel(2500, DealerMimicInput(10), seed=3, workers=1, chunk_rounds=1000)
+
+    expected = engine.SimResult(0, 0, 0, 0, 0, 0.0)
+    for size, seed in zip([1000, 1000, 500], parallel.chunk_seeds(3, 3)):
+        expected = expected.then(engine.simulate(size, DealerMimicInput(10), seed=seed))
+
+    assert result.result[:5] == expected[:5]
+    assert result.busy > 0
+    assert result.efficiency(result.result.rounds_per_second()) == pytest.approx(1.0)
+    assert 0 < result.concurrency() <= 1.0 + 1e-9
+
+def test_then():
+    a = engine.SimResult(10, 100, -30, -50, 5, 1.0)
+    b = engine.SimResult(5, 50, 40, -10, 45, 0.5)
+    assert a.then(b) == engine.SimResult(15, 150, 10, -50, 15, 1.5)
+    assert b.then(a) == engine.SimResult(15, 150, 10, -10, 45, 1.5)
+
+def test_bad_workers():
+    with pytest.raises(ValueError):
+        parallel.simulate_parallel(10, DealerMimicInput(10), workers=0)
@@ -0,0 +1,85 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from blackjack.core import cards, rules
+from blackjack.core.casino import SixFiveRules, TraditionalRules
+from blackjack.core.PayoutOdds import PayoutOdds
+from blackjack.sim import payouts
+
+# one hand per value a hand can settle with, a natural and a three card 21 included
+HANDS = [cards.parse_hand(hs) for hs in (
+    "2C2D", "2C3D", "4C2D", "5C2D", "6C2D", "7C2D", "8C2D", "9C2D", "10C2D", "AC2D",
+    "10C3D", "10C4D", "10C5D", "10C6D", "10C7D", "10C8D", "10C9D", "10CQD", "ACKD", "7C7D7H",
+    "10CQD2H", "10CQD3H", "10CQD4H", "10CQD9H", "10CQDKH",
+)]
+DEALERS = [cards.parse_hand(hs) for hs in ("10C7D", "10C8D", "10C9D", "10CQD", "ACKD", "7C7D7H", "10C6D6H", "10CQDKH")]
+BETS = [0, 1, 2, 3, 5, 7, 10, 11, 25, 101]
+HOUSES = [TraditionalRules, SixFiveRules]
+
+def _update_bank(player, dealer, bet, house):
+    # driver.transition_logic UPDATE_BANK, with the house's payouts
+    if len(player) == 1 and rules.is_natural(player[0]):
+        return rules.bet_hand(player[0], dealer, bet, PayoutOdds.THREE_TWO, house)
+    return rules.winnings(player, dealer, bet)
+
+@pytest.mark.parametrize("house", HOUSES)
+@pytest.mark.parametrize("odds", list(PayoutOdds))
+def test_win_payouts(house, odds):
+    bets = np.arange(1000)
+    assert list(payouts.win_payouts(odds, bets, house)) == [house.win_payout(odds, bet) for bet in range(1000)]
+
+def test_win_payouts_negative():
+    with pytest.raises(ValueError):
+        payouts.win_payouts(PayoutOdds.ONE_ONE, [1, -1])
+
+def test_six_five():
+    assert SixFiveRules.win_payout(PayoutOdds.THREE_TWO, 10) == 12
+    assert SixFiveRules.win_payout(PayoutOdds.THREE_TWO, 7) == 8
+    assert SixFiveRules.win_payout(PayoutOdds.ONE_ONE, 7) == 7
+    assert TraditionalRules.win_payout(PayoutOdds.THREE_TWO, 7) == 10
+
+@pytest.mark.parametrize("house", HOUSES)
+@pytest.mark.parametrize("odds", list(PayoutOdds))
+def test_settle_hands_differential(house, odds):
+    combos = list(itertools.product(HANDS, DEALERS, BETS))
+    result = payouts.settle_hands(
+        [rules.hand_value(player) for player, _, _ in combos],
+        [rules.hand_value(dealer) for _, dealer, _ in combos],
+        [bet for _, _, bet in combos],
+        odds,
+        house,
+    )
+    assert list(result) == [rules.bet_hand(player, dealer, bet, odds, house) for player, dealer, bet in combos]
+
+@pytest.mark.parametrize("bet", range(20))
+def test_split_bets(bet):
+    assert list(payouts.split_bets([bet, bet], [1, 2])) == [round(bet / 1), round(bet / 2)]
+
+@pytest.mark.parametrize("house", HOUSES)
+def test_settle_rounds_differential(house):
+    rounds = [[hand] for hand in HANDS] + [list(pair) for pair in itertools.product(HANDS, repeat=2)]
+    combos = list(itertools.product(rounds, DEALERS, BETS))
+
+    player = np.zeros((len(combos), 2), dtype=np.int64)
+    for i, (hands, _, _) in enumerate(combos):
+        player[i, :len(hands)] = [rules.hand_value(hand) for hand in hands]
+
+    result = payouts.settle_rounds(
+        player,
+        [rules.hand_value(dealer) for _, dealer, _ in combos],
+        [rules.is_natural(hands[0]) for hands, _, _ in combos],
+        [len(hands) for hands, _, _ in combos],
+        [bet for _, _, bet in combos],
+        house,
+    )
+    assert list(result) == [_update_bank(hands, dealer, bet, house) for hands, dealer, bet in combos]
+
+def test_settle_rounds_one_dimensional():
+    # natural against 20 wins 3:2, 20 against 20 pushes, bust loses
+    assert list(payouts.settle_rounds([21, 20, 22], 20, [True, False, False], 1, 10)) == [25, 10, 0]
+
+def test_settle_rounds_too_many_hands():
+    with pytest.raises(ValueError):
+        payouts.settle_rounds([20, 20], 20, False, 2, 10)
@@ -0,0 +1,100 @@
+import io
+import threading
+
+import pytest
+
+from blackjack.core import cards, driver, history, rules
+from blackjack.core.history import HandHistoryWriter, RoundRecord
+from blackjack.core.io.DealerMimicInput import DealerMimicInput
+from blackjack.core.io.NullOutput import NullOutput
+from blackjack.core.io.ReplayInput import ReplayInput
+from blackjack.core.state import PlayerAction
+from blackjack.sim import engine, replay
+from tests.core.helper_houses import EvenMoneyRules
+from tests.core.mocks_io import ChaosInput
+
+@pytest.fixture(scope="module")
+def chaos_log(tmp_path_factory):
+    # ChaosInput splits, doubles and insures, so every kind of decision is in here
+    path = tmp_path_factory.mktemp("history") / "chaos.bjhh"
+    with open(path, "wb") as sink, HandHistoryWriter(sink, buffer_size=4096) as writer:
+        engine.simulate(3000, ChaosInput(0), seed=0, bank=10 ** 6, history=writer)
+    return path
+
+@pytest.mark.parametrize("exact", [False, True])
+def test_replay_file_matches(chaos_log, exact):
+    result = replay.replay_file(chaos_log, exact=exact)
+    assert result.rounds == 3000
+    assert result.mismatched == 0, result.mismatches[0]
+
+def test_iter_history_streams(chaos_log):
+    with open(chaos_log, "rb") as f:
+        expected = history.read_history(f.read())
+    assert list(history.iter_history(chaos_log)) == expected
+
+def test_replay_seeded_shoes():
+    # driver_io's shoes are seeded, so they're made again rather than rebuilt from the hands
+    stop = threading.Event()
+    records = []
+
+    class Collect(HandHistoryWriter):
+        def end_round(self, state):
+            records.append(self.round_record(state))
+            if len(records) == 200:
+                stop.set()
+
+    driver.driver_io(stop, ChaosInput(3), NullOutput, None, None, seed=3, history=Collect(io.BytesIO()))
+    assert all(record.seed is not None for record in records)
+    assert len({record.seed for record in records}) > 1
+
+    result = replay.replay(records)
+    assert result.mismatched == 0, result.mismatches[0]
+
+    # a seed that makes another shoe deals other cards
+    tampered = [record._replace(seed=record.seed + 1) for record in records[:5]]
+    assert replay.replay(tampered).mismatched == 5
+
+def test_replay_finds_changed_records(chaos_log):
+    records = list(history.iter_history(chaos_log))
+    records[10] = records[10]._replace(delta=records[10].delta + 1)
+    records[20] = records[20]._replace(decisions=records[20].decisions + bytes([history.HIT]))
+
+    result = replay.replay(records, keep=1)
+    assert result.mismatched == 2
+    assert len(result.mismatches) == 1
+    mismatch = result.mismatches[0]
+    assert mismatch.index == 10
+    assert mismatch.actual.delta == mismatch.expected.delta - 1
+    assert mismatch.error is None
+
+def test_replay_finds_changed_rules(chaos_log):
+    records = list(history.iter_history(chaos_log))
+    result = replay.replay(records, house=EvenMoneyRules)
+
+    # exactly the rounds with a natural on a single hand that beat the dealer. a dealer's 21 of any kind pushes
+    wins = [
+        i for i, record in enumerate(records)
+        if len(record.player) == 1 and rules.is_natural(list(record.player[0])) and rules.hand_value(list(record.dealer)) != 21
+    ]
+    assert wins
+    assert [mismatch.index for mismatch in result.mismatches] == wins[:100]
+
+def test_dealt_order_split():
+    hand = cards.parse_hand
+    record = RoundRecord(None, 0, 100, 10, 0, bytes([history.SPLIT, history.STAY, history.HIT, history.STAY]),
+                         (tuple(hand("8H 3C")), tuple(hand("8S 2D 9C"))), tuple(hand("10H 7D")))
+    assert replay.dealt_order(record) == hand("8H 8S 10H 7D 3C 2D 9C")
+
+def test_replay_input_rejects_other_questions():
+    inputs = ReplayInput()
+    inputs.start(RoundRecord(None, 0, 100, 10, 0, bytes([history.DOUBLE, history.SPLIT]), (), ()))
+
+    assert inputs.input_bet(None, None, None) == 10
+    with pytest.raises(ValueError):
+        inputs.input_hit(None, None, None)
+
+    inputs.start(RoundRecord(None, 0, 100, 10, 0, bytes([history.SPLIT, history.STAY]), (), ()))
+    assert inputs.input_want_split(None, None, None)
+    assert inputs.input_hit_stay_double(None, None, None) is PlayerAction.STAY
+    with pytest.raises(ValueError):
+        inputs.input_want_insurance(None, None, None)
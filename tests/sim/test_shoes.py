@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+from blackjack.core import cards, constants
+from blackjack.sim import shoes
+
+@pytest.mark.parametrize("num_shoes,num_decks", [
+    (1, 1),
+    (10, 1),
+    (5, 6),
+    (0, 2),
+])
+def test_make_shoes_shape_and_composition(num_shoes, num_decks):
+    batch = shoes.make_shoes(num_shoes, num_decks, seed=0)
+    assert batch.shape == (num_shoes, num_decks * constants.DECK_SIZE)
+    assert batch.dtype == shoes.SHOE_DTYPE
+
+    # every row is a permutation of the ordered shoe
+    for row in batch:
+        assert np.array_equal(np.bincount(row, minlength=constants.DECK_SIZE), np.full(constants.DECK_SIZE, num_decks))
+
+def test_make_shoes_reproducible():
+    assert np.array_equal(shoes.make_shoes(20, 6, seed=123), shoes.make_shoes(20, 6, seed=123))
+    assert not np.array_equal(shoes.make_shoes(20, 6, seed=123), shoes.make_shoes(20, 6, seed=124))
+
+def test_make_shoes_rows_independent():
+    batch = shoes.make_shoes(50, 1, seed=0)
+    assert len({row.tobytes() for row in batch}) == len(batch)
+
+@pytest.mark.parametrize("num_shoes,num_decks", [(-1, 1), (1, 0)])
+def test_make_shoes_invalid(num_shoes, num_decks):
+    with pytest.raises(ValueError):
+        shoes.make_shoes(num_shoes, num_decks)
+
+def test_shoe_batch_deck_order():
+    batch = shoes.ShoeBatch(3, 2, seed=7, penetration=0.75)
+    assert len(batch) == 3
+
+    deck = batch.deck(1)
+    assert isinstance(deck, cards.Shoe)
+    assert deck.cut == 26
+
+    # the first card dealt is column zero
+    hand = []
+    for code in batch.codes[1][:5]:
+        cards.take_card(hand, deck)
+        assert hand[-1] == cards.decode_card(code)
+
+    encoded = batch.encoded(1)
+    assert cards.decode_hand(encoded) == cards.decode_hand(batch.codes[1][::-1].tolist())
+
+def test_shoe_batch_lazy_iteration():
+    batch = shoes.ShoeBatch(4, 1, seed=0)
+    decks = iter(batch)
+    assert list(next(decks)) == list(batch[0])
+    assert list(next(decks)) == list(batch[1])
@@ -0,0 +1,93 @@
+import math
+import pickle
+import random
+import statistics
+
+import pytest
+
+from blackjack.core.io.DealerMimicInput import DealerMimicInput
+from blackjack.sim import engine, parallel
+from blackjack.sim.stats import Converged, RoundStats
+
+def _stats(nets, bet=10):
+    stats = RoundStats()
+    for net in nets:
+        stats.add(net, bet)
+    return stats
+
+def test_welford_matches_statistics():
+    rseed = random.Random(0)
+    nets = [rseed.choice([-20, -10, 0, 10, 15, 20]) for _ in range(1000)]
+    stats = _stats(nets)
+
+    assert stats.rounds == 1000
+    assert stats.wagered == 10_000
+    assert stats.net == sum(nets)
+    assert stats.mean == pytest.approx(statistics.mean(nets))
+    assert stats.variance() == pytest.approx(statistics.variance(nets))
+    assert (stats.wins, stats.losses, stats.pushes) == (sum(n > 0 for n in nets), sum(n < 0 for n in nets), nets.count(0))
+
+    running = [sum(nets[:i + 1]) for i in range(len(nets))]
+    assert stats.low == min(0, min(running))
+    assert stats.high == max(0, max(running))
+
+def test_then_is_one_long_run():
+    rseed = random.Random(1)
+    nets = [rseed.randint(-30, 30) for _ in range(500)]
+    whole = _stats(nets)
+
+    for cut in (0, 1, 250, 499, 500):
+        merged = _stats(nets[:cut]).then(_stats(nets[cut:]))
+        assert merged.rounds == whole.rounds
+        assert (merged.net, merged.wagered, merged.low, merged.high) == (whole.net, whole.wagered, whole.low, whole.high)
+        assert merged.mean == pytest.approx(whole.mean)
+        assert merged.m2 == pytest.approx(whole.m2)
+
+def test_interval():
+    assert RoundStats().half_width() == math.inf
+
+    stats = _stats([10, -10] * 5000)
+    low, high = stats.interval(0.95)
+    assert low < stats.ev_per_unit() == 0.0 < high
+    # a standard deviation of ten over ten thousand rounds, per unit of a bet of ten
+    assert high == pytest.approx(1.96 * 10 / 100 / 10, rel=1e-3)
+    assert stats.interval(0.99)[1] > high
+
+def test_pickles():
+    stats = _stats([5, -10, 0])
+    assert pickle.loads(pickle.dumps(stats)) == stats
+
+def test_converged():
+    stop = Converged(0.01, min_rounds=100)
+    assert not stop(_stats([10, -10] * 10))
+    assert stop(_stats([10, -10] * 50_000))
+    assert not Converged(0.01, min_rounds=10 ** 6)(_stats([10, -10] * 50_000))
+
+def test_simulate_stops_early():
+    stats = RoundStats()
+    result = engine.simulate(10 ** 7, DealerMimicInput(10), seed=2, stats=stats, stop=Converged(0.05, min_rounds=1000), check_every=500)
+
+    assert result.rounds < 10 ** 7
+    assert result.rounds % 500 == 0
+    assert stats.unit_half_width() <= 0.05
+    assert (stats.rounds, stats.wagered, stats.net, stats.low, stats.high) == result[:5]
+
+    # the same rounds as a run of that length
+    assert engine.simulate(result.rounds, DealerMimicInput(10), seed=2)[:5] == result[:5]
+
+def test_simulate_bad_check_every():
+    with pytest.raises(ValueError):
+        engine.simulate(10, DealerMimicInput(10), check_every=0)
+
+def test_parallel_stops_at_the_same_chunk_for_any_worker_count():
+    stop = Converged(0.06, min_rounds=1000)
+    results = [
+        parallel.simulate_parallel(10 ** 6, DealerMimicInput(10), seed=5, workers=workers, chunk_rounds=500, stop=stop)
+        for workers in (1, 2, 3)
+    ]
+    for result in results:
+        assert result.chunks < 2000
+        assert result.result[:5] == results[0].result[:5]
+        assert result.stats == results[0].stats
+    assert stop(results[0].stats)
+    assert not stop(parallel.simulate_parallel((results[0].chunks - 1) * 500, DealerMimicInput(10), seed=5, workers=1, chunk_rounds=500).stats)